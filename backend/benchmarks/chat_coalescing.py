@@ -0,0 +1,262 @@
+"""
+Concurrent chat turns on one conversation: per-conversation locks and Idempotency-Key.
+
+Sends overlapping POST /api/{user_id}/chat requests (fake LLM from
+fake_llm.py, BENCH_LLM_LATENCY seconds per call, default 0.2) and checks that:
+
+    serialized    a double submit without a key runs the two turns one after
+                  the other: the second one's model call sees the first
+                  one's reply, and history_length matches the stored messages
+    coalesced     BENCH_RETRIES (default 3) overlapping requests with one
+                  Idempotency-Key make a single model call; all of them get
+                  the same reply, every one but the first marked
+                  Idempotent-Replayed
+    replayed      a retry after the turn finished is answered without a call
+    mismatch      reusing a key for a different message is a 422
+    failed        after the original request fails, a retry with its key
+                  runs the turn
+    cancelled     likewise after the original request is cancelled mid-turn
+    jobs          POST /chat/jobs twice with one key queues one job
+    jobs auth     the jobs endpoints need the caller's own token: 401
+                  without one, 403 for another user's path, and another
+                  user's job is a 404 under their own path
+    busy          a turn that cannot get the lock within the timeout is a
+                  409 with Retry-After
+
+Cross-node locking (PostgreSQL advisory locks) is used only when DATABASE_URL
+points at PostgreSQL; run it there with two API processes to see turns on
+different nodes wait for each other.
+
+Prints a JSON report and [PASS]/[FAIL] per check; exits 1 on any failure.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python benchmarks/chat_coalescing.py
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
+os.environ.setdefault("CHAT_JOB_WORKERS", "0")
+
+import fake_llm  # noqa: E402
+
+LLM_LATENCY = float(os.environ.get("BENCH_LLM_LATENCY", "0.2"))
+RETRIES = int(os.environ.get("BENCH_RETRIES", "3"))
+
+fake_llm.install(latency_seconds=LLM_LATENCY)
+
+import httpx  # noqa: E402
+from sqlalchemy import func  # noqa: E402
+from sqlmodel import SQLModel, select  # noqa: E402
+
+from app.conversation_locks import conversation_locks  # noqa: E402
+from app.database import async_session, get_engine  # noqa: E402
+from app.db.models import Conversation, Message, User  # noqa: E402
+from app.main import app  # noqa: E402
+from app.middleware.rate_limit import rate_limiter  # noqa: E402
+from app.security import create_access_token  # noqa: E402
+
+# History length the model was given, per model session
+history_sizes: List[int] = []
+_start_chat = fake_llm.FakeGenerativeModel.start_chat
+
+
+def _recording_start_chat(self: Any, history: Optional[List[Dict[str, Any]]] = None) -> Any:
+    history_sizes.append(len(history or []))
+    return _start_chat(self, history)
+
+
+fake_llm.FakeGenerativeModel.start_chat = _recording_start_chat
+
+
+async def seed() -> Tuple[User, User, Conversation]:
+    async with async_session() as session:
+        user, other = (
+            User(email=f"{name}{time.time_ns()}@bench.example.com", username=f"{name}{time.time_ns()}",
+                 password_hash="x" * 60, full_name="Coalescing Bench")
+            for name in ("coalesce", "intruder")
+        )
+        session.add_all([user, other])
+        await session.flush()
+        conversation = Conversation(user_id=user.id, title="Double submits")
+        session.add(conversation)
+        await session.commit()
+    return user, other, conversation
+
+
+async def stored(conversation: Conversation) -> Tuple[int, int]:
+    """(stored messages with content, history_length) of a conversation."""
+    async with async_session() as session:
+        count = (await session.exec(
+            select(func.count()).select_from(Message)
+            .where(Message.conversation_id == conversation.id, Message.content != "")
+        )).one()
+        refreshed = await session.get(Conversation, conversation.id)
+        return count, refreshed.history_length
+
+
+async def main() -> None:
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    user, other, conversation = await seed()
+    auth = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+    other_auth = {"Authorization": f"Bearer {create_access_token({'sub': str(other.id)})}"}
+
+    rate_limiter.requests_per_minute = 10**9
+    url = f"/api/{user.id}/chat"
+    body = {"conversation_id": str(conversation.id)}
+    checks: List[Tuple[str, bool]] = []
+    report: Dict[str, Any] = {"advisory_locks": conversation_locks.advisory and engine.dialect.name == "postgresql"}
+
+    transport = httpx.ASGITransport(app=app)
+    # The endpoint prints debug lines; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            # Double submit without a key: serialized, the second turn sees the first
+            history_sizes.clear()
+            start = time.perf_counter()
+            double = await asyncio.gather(*(
+                client.post(url, json={**body, "message": "hello there"}) for _ in range(2)
+            ))
+            double_seconds = time.perf_counter() - start
+            sizes_double = sorted(history_sizes)
+            messages, history_length = await stored(conversation)
+
+            # Overlapping retries with one key
+            calls = fake_llm.stats["calls"]
+            coalesced = await asyncio.gather(*(
+                client.post(url, json={**body, "message": "what now?"}, headers={"Idempotency-Key": "retry-1"})
+                for _ in range(RETRIES)
+            ))
+            coalesced_calls = fake_llm.stats["calls"] - calls
+
+            calls = fake_llm.stats["calls"]
+            late_retry = await client.post(url, json={**body, "message": "what now?"},
+                                           headers={"Idempotency-Key": "retry-1"})
+            late_calls = fake_llm.stats["calls"] - calls
+            mismatch = await client.post(url, json={**body, "message": "something else"},
+                                         headers={"Idempotency-Key": "retry-1"})
+
+            # A failed original gives its key up
+            fake_llm.faults["error"] = RuntimeError("provider exploded")
+            failed = await client.post(url, json={**body, "message": "try me"}, headers={"Idempotency-Key": "retry-2"})
+            fake_llm.faults["error"] = None
+            after_failure = await client.post(url, json={**body, "message": "try me"},
+                                              headers={"Idempotency-Key": "retry-2"})
+
+            # So does a cancelled one (client gone, shutdown) once the model call started
+            calls = fake_llm.stats["calls"]
+            original = asyncio.create_task(client.post(url, json={**body, "message": "never mind"},
+                                                       headers={"Idempotency-Key": "retry-3"}))
+            while fake_llm.stats["calls"] == calls and not original.done():
+                await asyncio.sleep(0.01)
+            original.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await original
+            after_cancel = await client.post(url, json={**body, "message": "never mind"},
+                                             headers={"Idempotency-Key": "retry-3"})
+
+            jobs = [
+                await client.post(f"{url}/jobs", json={**body, "message": "queued"},
+                                  headers={**auth, "Idempotency-Key": "job-1"})
+                for _ in range(2)
+            ]
+            job_url = f"{url}/jobs/{jobs[0].json().get('job_id')}"
+            jobs_auth = {
+                "post without token": (await client.post(f"{url}/jobs", json={**body, "message": "queued"})).status_code,
+                "post as another user": (await client.post(f"{url}/jobs", json={**body, "message": "queued"},
+                                                           headers=other_auth)).status_code,
+                "get without token": (await client.get(job_url)).status_code,
+                "get as another user": (await client.get(job_url, headers=other_auth)).status_code,
+                "get under own path": (await client.get(
+                    f"/api/{other.id}/chat/jobs/{jobs[0].json().get('job_id')}", headers=other_auth
+                )).status_code,
+                "get as owner": (await client.get(job_url, headers=auth)).status_code,
+            }
+
+            # A lock wait longer than the timeout
+            conversation_locks.timeout_seconds = LLM_LATENCY / 4
+            busy = await asyncio.gather(*(
+                client.post(url, json={**body, "message": f"busy {i}"}) for i in range(2)
+            ))
+            conversation_locks.timeout_seconds = 60
+
+    final_messages, final_history_length = await stored(conversation)
+    await engine.dispose()
+
+    replies = [r.json().get("response") for r in coalesced if r.status_code == 200]
+    replayed = [r.headers.get("Idempotent-Replayed") == "true" for r in coalesced]
+    busy_codes = sorted(r.status_code for r in busy)
+    report["double_submit"] = {
+        "statuses": [r.status_code for r in double],
+        "seconds": round(double_seconds, 3),
+        "history_sizes_seen_by_model": sizes_double,
+        "server_timing": [r.headers.get("Server-Timing") for r in double],
+    }
+    report["idempotent_retries"] = {
+        "requests": RETRIES,
+        "statuses": [r.status_code for r in coalesced],
+        "model_calls": coalesced_calls,
+        "replayed": sum(replayed),
+        "late_retry": {"status": late_retry.status_code, "model_calls": late_calls},
+        "mismatch": mismatch.status_code,
+        "failed_then_retried": [failed.status_code, after_failure.status_code],
+        "cancelled_then_retried": [original.cancelled(), after_cancel.status_code],
+    }
+    report["jobs"] = [r.json().get("job_id") for r in jobs]
+    report["jobs_auth"] = jobs_auth
+    report["busy"] = {"statuses": busy_codes, "retry_after": [r.headers.get("Retry-After") for r in busy]}
+    report["conversation_locks"] = conversation_locks.snapshot()
+    report["stored"] = {"messages": final_messages, "history_length": final_history_length}
+
+    checks.append(("double submit: turns serialized, second sees the first reply",
+                   [r.status_code for r in double] == [200, 200] and sizes_double == [0, 2]
+                   and double_seconds >= 2 * LLM_LATENCY and messages == history_length == 4))
+    checks.append(("retries with one key: a single model call, same reply for all",
+                   all(r.status_code == 200 for r in coalesced) and coalesced_calls == 1
+                   and len(set(replies)) == 1 and sum(replayed) == RETRIES - 1))
+    checks.append(("retry after the turn finished: replayed without a call",
+                   late_retry.status_code == 200 and late_calls == 0
+                   and late_retry.headers.get("Idempotent-Replayed") == "true"
+                   and late_retry.json()["response"] == replies[0]))
+    checks.append(("key reused for another message is a 422", mismatch.status_code == 422))
+    checks.append(("failed original frees its key",
+                   failed.status_code >= 500 and after_failure.status_code == 200
+                   and "Idempotent-Replayed" not in after_failure.headers))
+    checks.append(("cancelled original frees its key",
+                   original.cancelled() and after_cancel.status_code == 200
+                   and "Idempotent-Replayed" not in after_cancel.headers))
+    checks.append(("jobs: one key queues one job",
+                   all(r.status_code == 202 for r in jobs) and jobs[0].json()["job_id"] == jobs[1].json()["job_id"]))
+    checks.append(("jobs: caller's own token required",
+                   jobs_auth == {"post without token": 401, "post as another user": 403, "get without token": 401,
+                                 "get as another user": 403, "get under own path": 404, "get as owner": 200}))
+    checks.append(("lock timeout is a 409 with Retry-After",
+                   busy_codes == [200, 409] and any(r.headers.get("Retry-After") for r in busy if r.status_code == 409)))
+    checks.append(("history_length matches stored messages", final_messages == final_history_length))
+
+    print(json.dumps(report, indent=2))
+    failed_any = False
+    for name, ok in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}")
+        failed_any |= not ok
+    if failed_any:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
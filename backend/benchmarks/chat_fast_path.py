@@ -0,0 +1,181 @@
+"""
+Hit rate and latency of the local chat fast path (app/services/intents.py).
+
+1. Matcher: runs match_intent over a labelled set of messages and checks that
+   every command maps to the expected tool and nothing else matches.
+2. End to end: sends the same message mix through POST /api/{user_id}/chat
+   with the fake LLM from fake_llm.py (BENCH_LLM_LATENCY seconds per model
+   call, default 0.3), once with CHAT_FAST_PATH_ENABLED off and once on,
+   and reports the hit rate and per-turn latency of both runs.
+
+Prints a JSON report and [PASS]/[FAIL] per check; exits 1 on any failure.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python benchmarks/chat_fast_path.py
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+# Every turn should reach the model (or the fast path), not the response cache
+os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
+
+import fake_llm  # noqa: E402
+from latency_stats import summarize  # noqa: E402
+
+LLM_LATENCY = float(os.environ.get("BENCH_LLM_LATENCY", "0.3"))
+fake_llm.install(latency_seconds=LLM_LATENCY)
+
+import httpx  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database import async_session, get_engine  # noqa: E402
+from app.db.models import Task, User  # noqa: E402
+from app.main import app  # noqa: E402
+from app.middleware.rate_limit import rate_limiter  # noqa: E402
+from app.services.intents import match_intent  # noqa: E402
+
+TASK_ID = "3f2b8c1e-9a4d-4e6f-8b7a-1c2d3e4f5a6b"
+
+# (message, expected tool or None when the model must handle it)
+LABELLED: List[Tuple[str, Optional[str]]] = [
+    ("list my tasks", "list_tasks"),
+    ("List my pending tasks.", "list_tasks"),
+    ("show me all my completed tasks", "list_tasks"),
+    ("what are my open todos?", "list_tasks"),
+    ("show tasks that are done", "list_tasks"),
+    ("please list all tasks", "list_tasks"),
+    (f"complete task {TASK_ID}", "complete_task"),
+    (f"Finish {TASK_ID.upper()}", "complete_task"),
+    (f"mark task {TASK_ID} as done", "complete_task"),
+    (f"delete task {TASK_ID}", "delete_task"),
+    ("add task: buy milk", "add_task"),
+    ('create a new task called "Call the bank"', "add_task"),
+    ("hello", None),
+    ("list my tasks due tomorrow", None),
+    ("show my high priority tasks", None),
+    ("add a task to buy milk tomorrow at 5pm", None),
+    ("complete the first task", None),
+    (f"mark task {TASK_ID}", None),
+    (f"delete {TASK_ID}", None),
+    ("what should I work on next?", None),
+    ("list my tasks and then delete the done ones", None),
+    ("can you summarize my tasks?", None),
+]
+
+
+async def run_mix(client: httpx.AsyncClient, user_id: str, messages: List[str]) -> Dict[str, List[float]]:
+    """Send each message in its own conversation; returns latency (ms) by outcome."""
+    latencies: Dict[str, List[float]] = {"fast_path": [], "model": []}
+    for message in messages:
+        start = time.perf_counter()
+        response = await client.post(f"/api/{user_id}/chat", json={"message": message})
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            raise SystemExit(f"[FAIL] {message!r}: {response.status_code} {response.text}")
+        outcome = "fast_path" if "intent;" in response.headers.get("server-timing", "") else "model"
+        latencies[outcome].append(elapsed_ms)
+    return latencies
+
+
+async def main() -> None:
+    checks: List[Tuple[str, bool]] = []
+    report: Dict[str, Dict] = {}
+
+    user_uuid = uuid.uuid4()
+    mismatches = []
+    for message, expected in LABELLED:
+        intent = match_intent(message, user_uuid)
+        if (intent.tool if intent else None) != expected:
+            mismatches.append({"message": message, "expected": expected, "got": intent.tool if intent else None})
+    report["matcher"] = {"messages": len(LABELLED), "mismatches": mismatches}
+    checks.append(("matcher: commands match, everything else falls through", not mismatches))
+
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with async_session() as session:
+        user = User(email=f"fast{time.time_ns()}@bench.example.com", username=f"fast{time.time_ns()}",
+                    password_hash="x" * 60, full_name="Fast Path Bench")
+        session.add(user)
+        await session.flush()
+        tasks = [Task(user_id=user.id, title=f"Bench task {i}") for i in range(10)]
+        session.add_all(tasks)
+        await session.commit()
+        user_id = str(user.id)
+        task_ids = [str(task.id) for task in tasks]
+
+    fake_llm.FakeGenerativeModel.default_user_id = user_id
+    rate_limiter.requests_per_minute = 10**9
+    messages = [
+        "list my pending tasks",
+        f"complete task {task_ids[0]}",
+        "hello there",
+        "show me my tasks",
+        f"complete task {task_ids[1]}",
+        "what should I work on next?",
+    ] * 5
+
+    transport = httpx.ASGITransport(app=app)
+    # The endpoint prints debug lines; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            settings.CHAT_FAST_PATH_ENABLED = False
+            calls_before = fake_llm.stats["calls"]
+            model_only = await run_mix(client, user_id, messages)
+            model_only_calls = fake_llm.stats["calls"] - calls_before
+
+            settings.CHAT_FAST_PATH_ENABLED = True
+            calls_before = fake_llm.stats["calls"]
+            with_fast_path = await run_mix(client, user_id, messages)
+            fast_path_calls = fake_llm.stats["calls"] - calls_before
+            metrics = (await client.get("/api/health/chat")).json()
+    await engine.dispose()
+
+    all_model = model_only["model"]
+    all_fast = with_fast_path["fast_path"] + with_fast_path["model"]
+    report["end_to_end"] = {
+        "turns": len(messages),
+        "llm_latency_s": LLM_LATENCY,
+        "fast_path_off": {"llm_calls": model_only_calls, "turn_ms": summarize(all_model)},
+        "fast_path_on": {
+            "llm_calls": fast_path_calls,
+            "turn_ms": summarize(all_fast),
+            "hit_rate": round(len(with_fast_path["fast_path"]) / len(messages), 3),
+            "fast_path_turn_ms": summarize(with_fast_path["fast_path"]),
+        },
+        "saved_ms_total": round(sum(all_model) - sum(all_fast), 1),
+        # Process-wide counters from GET /api/health/chat (both runs)
+        "metrics": metrics,
+    }
+    expected_hits = sum(match_intent(m, user_uuid) is not None for m in messages)
+    checks.append(("end to end: every command took the fast path", metrics["fast_path_hits"] == expected_hits))
+    checks.append(("end to end: fewer model calls", fast_path_calls < model_only_calls))
+    checks.append(("end to end: fast-path turns finish under one model call",
+                   max(with_fast_path["fast_path"]) < LLM_LATENCY * 1000))
+
+    print(json.dumps(report, indent=2))
+    failed = False
+    for name, ok in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}")
+        failed |= not ok
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Database cost of a chat turn.
+
+Sends BENCH_TURNS chat messages (default 200) through the ASGI app with the
+fake LLM from fake_llm.py (no network, no API key). Each run of
+BENCH_TURNS_PER_CONVERSATION messages (default 5) starts a new
+conversation. The message mix is plain text, "add" (one tool call) and
+"list" (one tool call).
+
+For each turn it reports:
+    statements   SQL statements sent by the endpoint and its tools
+    commits      COMMITs (each one is a round trip to the database)
+    connections  new DBAPI connections (a connect per checkout with NullPool)
+    db_ms        time inside database calls, from the Server-Timing header
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python benchmarks/chat_turn_db.py
+    BENCH_TURNS=500 python benchmarks/chat_turn_db.py
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+
+import fake_llm  # noqa: E402
+from latency_stats import summarize  # noqa: E402
+
+fake_llm.install(latency_seconds=0)
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+from app.database import async_session, get_engine  # noqa: E402
+from app.db.models import User  # noqa: E402
+from app.main import app  # noqa: E402
+from app.middleware.rate_limit import rate_limiter  # noqa: E402
+
+TURNS = int(os.environ.get("BENCH_TURNS", "200"))
+TURNS_PER_CONVERSATION = int(os.environ.get("BENCH_TURNS_PER_CONVERSATION", "5"))
+SERVER_TIMING_DB = re.compile(r"db;dur=([0-9.]+)")
+
+
+async def main() -> None:
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async with async_session() as session:
+        user = User(email=f"chat{time.time_ns()}@bench.example.com", username=f"chat{time.time_ns()}",
+                    password_hash="x" * 60, full_name="Chat Bench")
+        session.add(user)
+        await session.commit()
+        user_id = str(user.id)
+
+    counters = {"statements": 0, "commits": 0, "connections": 0}
+
+    def on_statement(*args):
+        counters["statements"] += 1
+
+    def on_commit(conn):
+        counters["commits"] += 1
+
+    def on_connect(dbapi_connection, connection_record):
+        counters["connections"] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_statement)
+    event.listen(engine.sync_engine, "commit", on_commit)
+    event.listen(engine.sync_engine.pool, "connect", on_connect)
+
+    rate_limiter.requests_per_minute = 10**9
+    per_turn: Dict[str, List[float]] = {"statements": [], "commits": [], "connections": [], "db_ms": [], "total_ms": []}
+    messages = [
+        "hello there",
+        f"add 'bench task' (user {user_id})",
+        f"list my tasks (user {user_id})",
+    ]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        conversation_id = None
+        for turn in range(TURNS):
+            if turn % TURNS_PER_CONVERSATION == 0:
+                conversation_id = None
+            before = dict(counters)
+            start = time.perf_counter()
+            # The endpoint prints debug lines; keep them out of the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                response = await client.post(
+                    f"/api/{user_id}/chat",
+                    json={"conversation_id": conversation_id, "message": messages[turn % len(messages)]},
+                )
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                raise SystemExit(f"[FAIL] turn {turn}: {response.status_code} {response.text}")
+            conversation_id = response.json()["conversation_id"]
+
+            for key in ("statements", "commits", "connections"):
+                per_turn[key].append(counters[key] - before[key])
+            match = SERVER_TIMING_DB.search(response.headers.get("server-timing", ""))
+            per_turn["db_ms"].append(float(match.group(1)) if match else 0.0)
+            per_turn["total_ms"].append(elapsed_ms)
+
+    print(json.dumps({
+        "dialect": engine.dialect.name,
+        "turns": TURNS,
+        "turns_per_conversation": TURNS_PER_CONVERSATION,
+        **{key: summarize(values, digits=3) for key, values in per_turn.items()},
+    }, indent=2))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
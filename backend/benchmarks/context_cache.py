@@ -0,0 +1,168 @@
+"""
+Prompt tokens and latency saved by provider-side context caching.
+
+Runs the same BENCH_TURNS-turn conversation (default 12) through
+POST /api/{user_id}/chat twice with the fake LLM from fake_llm.py, once
+without and once with the context cache (app/llm_context_cache.py). The
+fake provider counts prompt tokens the way Gemini's usage_metadata does
+and adds BENCH_LATENCY_PER_1K_TOKENS seconds (default 0.05) per thousand
+uncached prompt tokens to each call.
+
+Reports per-turn prompt, cached and uncached tokens and latency, and checks:
+    - the cache is created once the prefix is big enough, then reused
+    - uncached prompt tokens and latency go down, answers are unchanged
+    - the cache's name, expiry and coverage are stored on the conversation
+    - a cache dropped by the provider is rebuilt without failing the turn
+
+Prints a JSON report and [PASS]/[FAIL] per check; exits 1 on any failure.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python benchmarks/context_cache.py
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+# Small thresholds so the fake's prompts qualify within a few turns
+os.environ.setdefault("CONTEXT_CACHE_MIN_TOKENS", "1024")
+os.environ.setdefault("CONTEXT_CACHE_REFRESH_TOKENS", "1024")
+# Every turn should reach the model, not the response cache
+os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
+
+import fake_llm  # noqa: E402
+
+fake_llm.install(latency_seconds=0.05)
+fake_llm.FakeGenerativeModel.latency_per_1k_tokens = float(os.environ.get("BENCH_LATENCY_PER_1K_TOKENS", "0.05"))
+
+import httpx  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+from app.database import async_session, get_engine  # noqa: E402
+from app.db.models import Conversation, User  # noqa: E402
+from app.llm_context_cache import context_cache  # noqa: E402
+from app.main import app  # noqa: E402
+from app.middleware.rate_limit import rate_limiter  # noqa: E402
+
+TURNS = int(os.environ.get("BENCH_TURNS", "12"))
+FILLER = "Here is some more background on the project I am planning this week. " * 6
+
+
+async def run_conversation(client: httpx.AsyncClient, user_id: str) -> Tuple[str, List[Dict], List[str]]:
+    """Send TURNS messages in one conversation; returns (conversation id, per-turn stats, replies)."""
+    conversation_id = None
+    turns: List[Dict] = []
+    replies: List[str] = []
+    for turn in range(TURNS):
+        before = dict(fake_llm.stats)
+        start = time.perf_counter()
+        response = await client.post(
+            f"/api/{user_id}/chat",
+            json={"conversation_id": conversation_id, "message": f"Turn {turn}: {FILLER}"},
+        )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            raise SystemExit(f"[FAIL] turn {turn}: {response.status_code} {response.text}")
+        conversation_id = response.json()["conversation_id"]
+        replies.append(response.json()["response"])
+        prompt = fake_llm.stats["prompt_tokens"] - before["prompt_tokens"]
+        cached = fake_llm.stats["cached_tokens"] - before["cached_tokens"]
+        turns.append({"prompt_tokens": prompt, "cached_tokens": cached, "uncached_tokens": prompt - cached,
+                      "ms": round(elapsed_ms, 1)})
+    return conversation_id, turns, replies
+
+
+def totals(turns: List[Dict]) -> Dict:
+    return {
+        "prompt_tokens": sum(t["prompt_tokens"] for t in turns),
+        "uncached_tokens": sum(t["uncached_tokens"] for t in turns),
+        "mean_ms": round(statistics.mean(t["ms"] for t in turns), 1),
+        "last_turn_ms": turns[-1]["ms"],
+    }
+
+
+async def main() -> None:
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with async_session() as session:
+        user = User(email=f"ctx{time.time_ns()}@bench.example.com", username=f"ctx{time.time_ns()}",
+                    password_hash="x" * 60, full_name="Context Cache Bench")
+        session.add(user)
+        await session.commit()
+        user_id = str(user.id)
+
+    rate_limiter.requests_per_minute = 10**9
+    checks: List[Tuple[str, bool]] = []
+    report: Dict[str, Dict] = {}
+
+    transport = httpx.ASGITransport(app=app)
+    # The endpoint prints debug lines; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            context_cache.enabled = False
+            _, uncached_turns, uncached_replies = await run_conversation(client, user_id)
+
+            context_cache.enabled = True
+            conversation_id, cached_turns, cached_replies = await run_conversation(client, user_id)
+            async with async_session() as session:
+                conversation = await session.get(Conversation, UUID(conversation_id))
+
+            # The provider drops the cache early: the next turn must rebuild it
+            fake_llm.FakeCachedContent._store.clear()
+            created_before = context_cache.created
+            rebuild = await client.post(
+                f"/api/{user_id}/chat", json={"conversation_id": conversation_id, "message": f"One more. {FILLER}"}
+            )
+            metrics = (await client.get("/api/health/llm")).json()["context_cache"]
+    await engine.dispose()
+
+    off, on = totals(uncached_turns), totals(cached_turns)
+    report["without_cache"] = {"turns": uncached_turns, "totals": off}
+    report["with_cache"] = {"turns": cached_turns, "totals": on}
+    report["saved"] = {
+        "uncached_tokens": off["uncached_tokens"] - on["uncached_tokens"],
+        "uncached_tokens_pct": round(100 * (1 - on["uncached_tokens"] / off["uncached_tokens"]), 1),
+        "mean_ms": round(off["mean_ms"] - on["mean_ms"], 1),
+        "last_turn_ms": round(off["last_turn_ms"] - on["last_turn_ms"], 1),
+    }
+    report["conversation"] = {
+        "context_cache_name": conversation.context_cache_name,
+        "context_cache_expires_at": conversation.context_cache_expires_at.isoformat() if conversation.context_cache_expires_at else None,
+        "context_cache_messages": conversation.context_cache_messages,
+    }
+    report["metrics"] = metrics
+
+    checks.append(("cache created and reused", metrics["created"] >= 1 and metrics["reused"] >= 1))
+    checks.append(("fewer uncached prompt tokens", on["uncached_tokens"] < off["uncached_tokens"] * 0.7))
+    checks.append(("lower latency on long conversations", on["last_turn_ms"] < off["last_turn_ms"]))
+    checks.append(("answers unchanged", cached_replies == uncached_replies))
+    checks.append(("cache tracked on the conversation",
+                   conversation.context_cache_name is not None and conversation.context_cache_messages > 0
+                   and conversation.context_cache_expires_at is not None))
+    checks.append(("dropped cache is rebuilt", rebuild.status_code == 200 and context_cache.created == created_before + 1))
+
+    print(json.dumps(report, indent=2))
+    failed = False
+    for name, ok in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}")
+        failed |= not ok
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,188 @@
+"""
+Keyset pagination of GET /api/conversations and GET /api/conversations/{id}/messages.
+
+Seeds one user with BENCH_CONVERSATIONS conversations (default 150) and one
+long conversation of BENCH_MESSAGES messages (default 500, with some
+identical timestamps), then pages through both endpoints and checks that:
+
+    complete      every row is returned exactly once, in (timestamp, id)
+                  descending order, ties included
+    errors        a malformed cursor or ID is a 400, another user's
+                  conversation a 404
+    activity      a chat turn (fake LLM from fake_llm.py) moves its
+                  conversation to the top through last_message_at
+
+Also reports the database time of the first page of messages against
+loading the whole thread.
+
+Prints a JSON report and [PASS]/[FAIL] per check; exits 1 on any failure.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python benchmarks/conversation_pages.py
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
+
+import fake_llm  # noqa: E402
+
+fake_llm.install(latency_seconds=0.01)
+
+import httpx  # noqa: E402
+from sqlmodel import SQLModel, select  # noqa: E402
+
+from app.database import async_session, get_engine  # noqa: E402
+from app.db.models import Conversation, Message, User  # noqa: E402
+from app.main import app  # noqa: E402
+from app.middleware.rate_limit import rate_limiter  # noqa: E402
+from app.security import create_access_token  # noqa: E402
+from app.services.conversation import list_messages  # noqa: E402
+
+CONVERSATIONS = int(os.environ.get("BENCH_CONVERSATIONS", "150"))
+MESSAGES = int(os.environ.get("BENCH_MESSAGES", "500"))
+
+
+async def seed() -> Tuple[User, User, List[Conversation], Conversation, List[Message]]:
+    now = datetime.utcnow()
+    async with async_session() as session:
+        owner, other = (
+            User(email=f"pages{i}{time.time_ns()}@bench.example.com", username=f"pages{i}{time.time_ns()}",
+                 password_hash="x" * 60, full_name="Pages Bench")
+            for i in range(2)
+        )
+        session.add_all([owner, other])
+        await session.flush()
+
+        conversations = [
+            Conversation(user_id=owner.id, title=f"Conversation {i}", last_message_at=now - timedelta(minutes=i // 3))
+            for i in range(CONVERSATIONS)
+        ]
+        session.add_all(conversations)
+        thread = conversations[-1]
+        # Pairs of messages share a timestamp, so pages must break ties by id
+        messages = [
+            Message(conversation_id=thread.id, user_id=owner.id, role="user" if i % 2 == 0 else "assistant",
+                    content=f"Message {i}", created_at=now - timedelta(days=1) + timedelta(seconds=i // 2))
+            for i in range(MESSAGES)
+        ]
+        session.add_all(messages)
+        foreign = Conversation(user_id=other.id, title="Not yours")
+        session.add(foreign)
+        await session.commit()
+    return owner, other, conversations, foreign, messages
+
+
+async def page_through(client: httpx.AsyncClient, url: str, headers: Dict[str, str], limit: int) -> Tuple[List[Dict], int]:
+    items: List[Dict[str, Any]] = []
+    cursor: Optional[str] = None
+    pages = 0
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(url, params=params, headers=headers)
+        if response.status_code != 200:
+            raise SystemExit(f"[FAIL] {url}: {response.status_code} {response.text}")
+        body = response.json()
+        items.extend(body["items"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if not cursor:
+            return items, pages
+
+
+async def main() -> None:
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    owner, other, conversations, foreign, messages = await seed()
+    thread = conversations[-1]
+
+    fake_llm.FakeGenerativeModel.default_user_id = str(owner.id)
+    rate_limiter.requests_per_minute = 10**9
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(owner.id)})}"}
+    checks: List[Tuple[str, bool]] = []
+    report: Dict[str, Any] = {}
+
+    expected_conversations = [
+        str(c.id) for c in sorted(conversations, key=lambda c: (c.last_message_at, c.id), reverse=True)
+    ]
+    expected_messages = [str(m.id) for m in sorted(messages, key=lambda m: (m.created_at, m.id), reverse=True)]
+
+    transport = httpx.ASGITransport(app=app)
+    # The endpoint prints debug lines; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            listed, conversation_pages = await page_through(client, "/api/conversations", headers, 20)
+            first_page = await client.get(f"/api/conversations/{thread.id}/messages", params={"limit": 50}, headers=headers)
+            thread_items, message_pages = await page_through(
+                client, f"/api/conversations/{thread.id}/messages", headers, 50
+            )
+
+            bad_cursor = await client.get("/api/conversations", params={"cursor": "not-a-cursor"}, headers=headers)
+            bad_id = await client.get("/api/conversations/nope/messages", headers=headers)
+            not_yours = await client.get(f"/api/conversations/{foreign.id}/messages", headers=headers)
+            anonymous = await client.get("/api/conversations")
+
+            turn = await client.post(
+                f"/api/{owner.id}/chat", json={"conversation_id": str(thread.id), "message": "Still there?"}
+            )
+            after_turn = (await client.get("/api/conversations", params={"limit": 1}, headers=headers)).json()
+
+    # One page against the whole thread (as replaying history used to load it)
+    async with async_session() as session:
+        start = time.perf_counter()
+        await list_messages(session, thread.id, owner.id, limit=50)
+        first_page_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        result = await session.exec(
+            select(Message).where(Message.conversation_id == thread.id).order_by(Message.created_at)
+        )
+        full_thread = result.all()
+        full_thread_ms = (time.perf_counter() - start) * 1000
+    await engine.dispose()
+
+    report["conversations"] = {"rows": len(listed), "pages": conversation_pages}
+    report["messages"] = {"rows": len(thread_items), "pages": message_pages}
+    report["first_message_page_query_ms"] = round(first_page_ms, 2)
+    report["full_thread_query_ms"] = round(full_thread_ms, 2)
+    report["full_thread_rows"] = len(full_thread)
+    report["errors"] = {"bad_cursor": bad_cursor.status_code, "bad_id": bad_id.status_code,
+                        "not_yours": not_yours.status_code, "anonymous": anonymous.status_code}
+
+    checks.append(("conversations: every row once, most recently active first",
+                   [c["id"] for c in listed] == expected_conversations))
+    checks.append(("messages: every row once, newest first, ties broken by id",
+                   [m["id"] for m in thread_items] == expected_messages))
+    checks.append(("first page holds only the page", first_page.status_code == 200 and len(first_page.json()["items"]) == 50))
+    checks.append(("malformed cursor or ID is a 400", bad_cursor.status_code == 400 and bad_id.status_code == 400))
+    checks.append(("other users' conversations are a 404", not_yours.status_code == 404))
+    checks.append(("listing requires authentication", anonymous.status_code in (401, 403)))
+    checks.append(("a chat turn moves its conversation to the top",
+                   turn.status_code == 200 and after_turn["items"][0]["id"] == str(thread.id)
+                   and datetime.fromisoformat(after_turn["items"][0]["last_message_at"]) > conversations[0].last_message_at))
+
+    print(json.dumps(report, indent=2))
+    failed = False
+    for name, ok in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}")
+        failed |= not ok
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,243 @@
+"""
+Query plan regression check for the task/message indexes.
+
+Runs every service query the API issues, captures the SQL that SQLAlchemy
+actually emits, and EXPLAINs it with the default planner settings to assert
+that the expected index is used. Exits with status 1 if any query falls
+back to a sequential scan.
+
+On PostgreSQL, a failing query is EXPLAINed once more with
+enable_seqscan = off as a diagnostic: if that plan uses the index, the
+planner preferred a scan for this data (too few rows seeded, stale
+statistics); if not, the index cannot serve the query at all.
+
+Usage:
+    DATABASE_URL=postgresql://... python benchmarks/explain_indexes.py
+    DATABASE_URL=sqlite+aiosqlite:///./explain.db python benchmarks/explain_indexes.py
+"""
+
+import asyncio
+import importlib.util
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, List, Set, Tuple
+
+# Add src to path
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from sqlalchemy import event, text
+from sqlmodel import SQLModel
+
+from app.database import async_session, engine
+from app.db.models import Conversation, Message, Task, TaskPriority, TaskStatus, User
+from app.mcp.tools import list_tasks as mcp_list_tasks
+from app.services.chat import load_history_window
+from app.services.conversation import list_conversations, list_messages
+from app.services.task import get_user_tasks
+
+MIGRATIONS_DIR = SRC_DIR / "app" / "migrations"
+SEED_USERS = 20
+SEED_TASKS_PER_USER = 200
+SEED_MESSAGES = 200
+SEED_CONVERSATIONS = 200
+# Conversations of the first user that get SEED_MESSAGES messages each, so the
+# history and message-page queries select a small share of the table
+SEED_CONVERSATIONS_WITH_MESSAGES = 25
+
+
+def load_index_migrations() -> list:
+    """Load the numbered index migration modules in order."""
+    modules = []
+    for path in sorted(MIGRATIONS_DIR.glob("[0-9][0-9][0-9]_*.py")):
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        modules.append(module)
+    return modules
+
+
+async def prepare_database() -> Tuple[User, Conversation]:
+    """Create schema, apply index migrations and seed enough rows for the planner."""
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        for migration in load_index_migrations():
+            await conn.run_sync(migration.upgrade)
+
+    now = datetime.utcnow()
+    async with async_session() as session:
+        users = [
+            User(
+                email=f"explain{i}@example.com",
+                username=f"explain{i}",
+                password_hash="x" * 60,
+                full_name=f"Explain {i}",
+            )
+            for i in range(SEED_USERS)
+        ]
+        session.add_all(users)
+        await session.flush()
+
+        for user in users:
+            for j in range(SEED_TASKS_PER_USER):
+                session.add(Task(
+                    user_id=user.id,
+                    title=f"Task {j}",
+                    status=TaskStatus.PENDING if j % 4 == 0 else TaskStatus.COMPLETED,
+                    priority=list(TaskPriority)[j % 3],
+                    due_date=now + timedelta(days=j % 30),
+                    created_at=now - timedelta(minutes=j),
+                ))
+
+        conversation = Conversation(user_id=users[0].id, title="explain")
+        session.add(conversation)
+        for user in users:
+            for j in range(SEED_CONVERSATIONS):
+                session.add(Conversation(
+                    user_id=user.id,
+                    title=f"Conversation {j}",
+                    last_message_at=now - timedelta(minutes=j),
+                ))
+        others = [
+            Conversation(user_id=users[0].id, title=f"Busy {i}")
+            for i in range(SEED_CONVERSATIONS_WITH_MESSAGES - 1)
+        ]
+        session.add_all(others)
+        await session.flush()
+        for talk in [conversation] + others:
+            for j in range(SEED_MESSAGES):
+                session.add(Message(
+                    conversation_id=talk.id,
+                    user_id=users[0].id,
+                    role="user" if j % 2 == 0 else "assistant",
+                    content=f"message {j}",
+                    created_at=now - timedelta(seconds=j),
+                ))
+        await session.commit()
+
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+
+    return users[0], conversation
+
+
+async def capture_statements(run: Callable[[], Awaitable]) -> List[Tuple[str, object]]:
+    """Run a coroutine and return the (statement, parameters) pairs it executed."""
+    captured: List[Tuple[str, object]] = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        await run()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+    return captured
+
+
+async def explain(statement: str, parameters, seqscan: bool = True) -> str:
+    """Return the textual query plan for a captured statement.
+
+    Args:
+        statement: SQL as emitted by SQLAlchemy
+        parameters: Its bound parameters
+        seqscan: Leave PostgreSQL's enable_seqscan on (the planner default);
+            off only for the diagnostic plan
+    """
+    is_postgres = engine.dialect.name == "postgresql"
+    prefix = "EXPLAIN " if is_postgres else "EXPLAIN QUERY PLAN "
+
+    def run(sync_conn):
+        if is_postgres and not seqscan:
+            # Local to this connection's transaction, which is rolled back
+            sync_conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        rows = sync_conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+        return "\n".join(" ".join(str(col) for col in row) for row in rows)
+
+    async with engine.connect() as conn:
+        return await conn.run_sync(run)
+
+
+async def run_checks() -> int:
+    """EXPLAIN each service query and compare against the expected indexes."""
+    user, conversation = await prepare_database()
+    due_before = (datetime.utcnow() + timedelta(days=7)).date().isoformat()
+
+    async def list_page():
+        async with async_session() as session:
+            await get_user_tasks(session, user.id, limit=10)
+
+    async def list_pending():
+        async with async_session() as session:
+            await get_user_tasks(session, user.id, limit=10, status_filter=TaskStatus.PENDING)
+
+    async def list_high_priority():
+        async with async_session() as session:
+            await get_user_tasks(session, user.id, limit=10, priority_filter=TaskPriority.HIGH)
+
+    async def history():
+        # The window loaded by run_chat_turn on a history cache miss
+        async with async_session() as session:
+            await load_history_window(session, conversation)
+
+    async def conversations_page():
+        async with async_session() as session:
+            _, cursor = await list_conversations(session, user.id, limit=20)
+            await list_conversations(session, user.id, limit=20, cursor=cursor)
+
+    async def messages_page():
+        async with async_session() as session:
+            _, cursor = await list_messages(session, conversation.id, user.id, limit=50)
+            await list_messages(session, conversation.id, user.id, limit=50, cursor=cursor)
+
+    checks: List[Tuple[str, Callable[[], Awaitable], Set[str]]] = [
+        ("tasks list page", list_page, {"idx_tasks_user_created_covering"}),
+        ("tasks list pending", list_pending, {
+            "idx_tasks_user_pending_created", "idx_tasks_user_status",
+        }),
+        ("tasks list priority", list_high_priority, {
+            "idx_tasks_user_priority", "idx_tasks_user_created_covering",
+        }),
+        ("mcp list_tasks", lambda: mcp_list_tasks(str(user.id)), {
+            "idx_tasks_user_created_covering",
+        }),
+        ("mcp list_tasks pending due", lambda: mcp_list_tasks(
+            str(user.id), status="pending", due_before=due_before,
+        ), {
+            "idx_tasks_user_pending_due", "idx_tasks_user_pending_created",
+            "idx_tasks_user_status",
+        }),
+        ("chat history", history, {"idx_messages_conversation_created"}),
+        ("conversation list page", conversations_page, {"idx_conversations_user_last_message"}),
+        ("conversation messages page", messages_page, {"idx_messages_conversation_created"}),
+    ]
+
+    failures = 0
+    for name, run, expected in checks:
+        statements = await capture_statements(run)
+        # The last SELECT issued is the query under test
+        statement, parameters = statements[-1]
+        plan = await explain(statement, parameters)
+        used = sorted(index for index in expected if index in plan)
+        if used:
+            print(f"[PASS]: {name} -> {', '.join(used)}")
+            continue
+
+        failures += 1
+        print(f"[FAIL]: {name} did not use any of {sorted(expected)}")
+        print(f"     {plan.replace(chr(10), chr(10) + '     ')}")
+        if engine.dialect.name == "postgresql":
+            forced = await explain(statement, parameters, seqscan=False)
+            usable = sorted(index for index in expected if index in forced)
+            verdict = f"uses {', '.join(usable)}" if usable else "still no expected index"
+            print(f"     diagnostic, enable_seqscan = off: {verdict}")
+
+    await engine.dispose()
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(run_checks()) else 0)
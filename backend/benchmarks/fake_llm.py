@@ -0,0 +1,231 @@
+"""
+Fake google.generativeai module for load tests.
+
+install() puts a stand-in for `google.generativeai` into sys.modules so the
+chat endpoint runs end to end (history load, message writes, MCP tool calls)
+without network access or an API key. Each model call sleeps for a fixed
+latency to stand in for the provider round trip.
+
+The fake model looks at the latest user message:
+- "add ..."              -> calls add_task with the quoted title
+- "list ..." / "show ..." -> calls list_tasks
+- "complete <task uuid>"  -> calls complete_task (needs default_user_id)
+- otherwise               -> replies with text
+Tool calls need a user ID: load-test messages include "(user <uuid>)", or
+set FakeGenerativeModel.default_user_id.
+
+Set `faults["error"]` to an exception to make every model call raise it
+(a degraded provider); `stats` tracks calls and peak concurrency.
+
+Token accounting: every call counts its prompt (tool declarations, cached
+prefix, history and the new message; ~4 characters per token) into
+`stats["prompt_tokens"]`, the part served from a cached prefix into
+`stats["cached_tokens"]`, and reports both in `response.usage_metadata`
+like the real API. `caching.CachedContent` and
+`GenerativeModel.from_cached_content` stand in for provider-side context
+caching. With `FakeGenerativeModel.latency_per_1k_tokens` set, each call
+also takes longer per uncached prompt token.
+"""
+
+import asyncio
+import itertools
+import re
+import sys
+import time
+import types
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+UUID_PATTERN = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+TITLE_PATTERN = re.compile(r"'([^']+)'")
+
+stats = {"calls": 0, "in_flight": 0, "max_in_flight": 0, "prompt_tokens": 0, "cached_tokens": 0, "caches_created": 0}
+faults: Dict[str, Optional[Exception]] = {"error": None}
+
+
+def _tokens(value: Any) -> int:
+    """Rough token count of a prompt piece (~4 characters per token)."""
+    return (len(value if isinstance(value, str) else repr(value)) + 3) // 4
+
+
+def _response(function_call: Optional[SimpleNamespace] = None, text: str = "", usage: Optional[SimpleNamespace] = None) -> SimpleNamespace:
+    part = SimpleNamespace(function_call=function_call, text=text)
+    content = SimpleNamespace(parts=[part])
+    return SimpleNamespace(candidates=[SimpleNamespace(content=content)], text=text, usage_metadata=usage)
+
+
+class FakeNotFound(Exception):
+    """Like google.api_core.exceptions.NotFound."""
+
+    code = 404
+
+
+class FakeCachedContent:
+    """Stand-in for genai.caching.CachedContent."""
+
+    _store: Dict[str, "FakeCachedContent"] = {}
+    _ids = itertools.count(1)
+
+    def __init__(self, name: str, model: str, token_count: int, expires_at: float):
+        self.name = name
+        self.model = model
+        self.token_count = token_count
+        self.expires_at = expires_at
+
+    @classmethod
+    def create(cls, model: str, *, contents: Any = None, tools: Any = None, ttl: Any = None, **kwargs: Any) -> "FakeCachedContent":
+        stats["caches_created"] += 1
+        ttl_seconds = ttl.total_seconds() if ttl is not None else 3600
+        cached = cls(
+            name=f"cachedContents/fake-{next(cls._ids)}",
+            model=model,
+            token_count=_tokens(tools) + sum(_tokens(item) for item in contents or []),
+            expires_at=time.monotonic() + ttl_seconds,
+        )
+        cls._store[cached.name] = cached
+        return cached
+
+    @classmethod
+    def get(cls, name: str) -> "FakeCachedContent":
+        cached = cls._store.get(name)
+        if cached is None or cached.expires_at <= time.monotonic():
+            raise FakeNotFound(f"CachedContent not found: {name}")
+        return cached
+
+
+class FakeChatSession:
+    """Stand-in for genai.ChatSession."""
+
+    def __init__(
+        self,
+        latency_seconds: float,
+        history: List[Dict[str, Any]],
+        default_user_id: Optional[str] = None,
+        tool_tokens: int = 0,
+        cached: Optional[FakeCachedContent] = None,
+        latency_per_1k_tokens: float = 0.0,
+    ):
+        self.latency_seconds = latency_seconds
+        self.history = list(history)
+        self.default_user_id = default_user_id
+        self.tool_tokens = tool_tokens
+        self.cached = cached
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+
+    async def send_message_async(self, content: Any) -> SimpleNamespace:
+        cached_tokens = self.cached.token_count if self.cached else 0
+        uncached_tokens = self.tool_tokens + sum(_tokens(item) for item in self.history) + _tokens(content)
+        usage = SimpleNamespace(
+            prompt_token_count=cached_tokens + uncached_tokens,
+            cached_content_token_count=cached_tokens,
+        )
+        stats["calls"] += 1
+        stats["prompt_tokens"] += usage.prompt_token_count
+        stats["cached_tokens"] += cached_tokens
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(self.latency_seconds + self.latency_per_1k_tokens * uncached_tokens / 1000)
+        finally:
+            stats["in_flight"] -= 1
+        if faults["error"] is not None:
+            raise faults["error"]
+
+        if not isinstance(content, str):
+            # A function response: acknowledge the tool result
+            self.history.append({"role": "user", "parts": [repr(content)]})
+            self.history.append({"role": "model", "parts": ["Done."]})
+            return _response(text="Done.", usage=usage)
+
+        self.history.append({"role": "user", "parts": [content]})
+        reply = self._reply(content)
+        reply.usage_metadata = usage
+        part = reply.candidates[0].content.parts[0]
+        self.history.append({"role": "model", "parts": [repr(part.function_call) if part.function_call else part.text]})
+        return reply
+
+    def _reply(self, content: str) -> SimpleNamespace:
+        uuid_match = UUID_PATTERN.search(content)
+        lowered = content.lower()
+        if self.default_user_id and uuid_match and lowered.startswith("complete"):
+            args = {"user_id": self.default_user_id, "task_id": uuid_match.group(0)}
+            return _response(function_call=SimpleNamespace(name="complete_task", args=args))
+        user_id = uuid_match.group(0) if uuid_match else self.default_user_id
+        if user_id and lowered.startswith("add"):
+            title = TITLE_PATTERN.search(content)
+            args = {"user_id": user_id, "title": title.group(1) if title else "Untitled"}
+            return _response(function_call=SimpleNamespace(name="add_task", args=args))
+        if user_id and lowered.startswith(("list", "show")):
+            args = {"user_id": user_id, "status": "pending", "limit": 10}
+            return _response(function_call=SimpleNamespace(name="list_tasks", args=args))
+        return _response(text=f"You said: {content[:80]}")
+
+
+class FakeGenerativeModel:
+    """Stand-in for genai.GenerativeModel."""
+
+    latency_seconds = 0.1
+    latency_per_1k_tokens = 0.0
+    default_user_id: Optional[str] = None
+
+    def __init__(self, model_name: str, tools: Any = None, **kwargs: Any):
+        self.model_name = model_name
+        self.tools = tools
+        self.cached: Optional[FakeCachedContent] = None
+
+    @classmethod
+    def from_cached_content(cls, cached_content: Any, **kwargs: Any) -> "FakeGenerativeModel":
+        if isinstance(cached_content, str):
+            cached_content = FakeCachedContent.get(cached_content)
+        model = cls(cached_content.model)
+        model.cached = cached_content
+        return model
+
+    def start_chat(self, history: Optional[List[Dict[str, Any]]] = None) -> FakeChatSession:
+        return FakeChatSession(
+            self.latency_seconds,
+            history or [],
+            self.default_user_id,
+            tool_tokens=_tokens(self.tools) if self.tools else 0,
+            cached=self.cached,
+            latency_per_1k_tokens=self.latency_per_1k_tokens,
+        )
+
+
+def _proto(**fields: Any) -> SimpleNamespace:
+    return SimpleNamespace(**fields)
+
+
+def install(latency_seconds: float = 0.1) -> types.ModuleType:
+    """Register the fake as `google.generativeai` and return it.
+
+    Args:
+        latency_seconds: Simulated provider latency per model call
+
+    Returns:
+        The fake module
+    """
+    FakeGenerativeModel.latency_seconds = latency_seconds
+    module = types.ModuleType("google.generativeai")
+    module.configure = lambda **kwargs: None
+    module.list_models = lambda: [
+        SimpleNamespace(name="models/gemini-1.5-flash", supported_generation_methods=["generateContent"])
+    ]
+    module.GenerativeModel = FakeGenerativeModel
+    module.caching = SimpleNamespace(CachedContent=FakeCachedContent)
+    module.protos = SimpleNamespace(
+        Tool=_proto,
+        FunctionDeclaration=_proto,
+        Content=_proto,
+        Part=_proto,
+        FunctionResponse=_proto,
+    )
+
+    sys.modules["google.generativeai"] = module
+    google = sys.modules.get("google")
+    if google is None:
+        google = types.ModuleType("google")
+        google.__path__ = []
+        sys.modules["google"] = google
+    google.generativeai = module
+    return module
@@ -0,0 +1,231 @@
+"""
+Per-conversation history cache (app/history_cache.py): hits, window and staleness.
+
+Runs the same BENCH_TURNS-turn conversation (default 15) through
+POST /api/{user_id}/chat with the fake LLM from fake_llm.py twice, with the
+history cache on and off, and checks that:
+
+    hits          every turn after the first reuses the cached history and
+                  sends no SELECT on messages
+    same history  the model receives the same history either way, capped at
+                  HISTORY_WINDOW_MESSAGES (10 here)
+    stale         a turn stored by another worker (a direct write that bumps
+                  history_length) makes the next turn reload the history
+    concurrent    two overlapping turns in one conversation run one after the
+                  other (conversation lock), leave history_length equal to
+                  the stored messages with content and keep the cache current
+    memory cap    a standalone cache stays under max_bytes by evicting the
+                  least recently used conversations
+
+Prints a JSON report and [PASS]/[FAIL] per check; exits 1 on any failure.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python benchmarks/history_cache.py
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+os.environ.setdefault("HISTORY_WINDOW_MESSAGES", "10")
+# Every turn should reach the model, not the response cache
+os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
+
+import fake_llm  # noqa: E402
+
+fake_llm.install(latency_seconds=0.05)
+
+import httpx  # noqa: E402
+from sqlalchemy import event, func, update  # noqa: E402
+from sqlmodel import SQLModel, select  # noqa: E402
+
+from app.database import async_session, get_engine  # noqa: E402
+from app.db.models import Conversation, Message, User  # noqa: E402
+from app.history_cache import HistoryCache, history_cache, history_entry  # noqa: E402
+from app.main import app  # noqa: E402
+from app.middleware.rate_limit import rate_limiter  # noqa: E402
+
+TURNS = int(os.environ.get("BENCH_TURNS", "15"))
+
+# History handed to the model by each start_chat call
+seen_histories: List[List[Dict[str, Any]]] = []
+_start_chat = fake_llm.FakeGenerativeModel.start_chat
+
+
+def recording_start_chat(self, history: Optional[List[Dict[str, Any]]] = None):
+    seen_histories.append(list(history or []))
+    return _start_chat(self, history)
+
+
+fake_llm.FakeGenerativeModel.start_chat = recording_start_chat
+
+counters = {"history_selects": 0}
+
+
+def on_statement(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith("SELECT") and "FROM messages" in statement:
+        counters["history_selects"] += 1
+
+
+class Turn:
+    def __init__(self, response: httpx.Response, history_selects: int):
+        self.status = response.status_code
+        self.body = response.json() if response.status_code == 200 else {}
+        timing = response.headers.get("server-timing", "")
+        self.cached = 'history;desc="cached"' in timing
+        self.db_ms = float(timing.split("db;dur=")[1].split(",")[0]) if "db;dur=" in timing else 0.0
+        self.history_selects = history_selects
+        self.history = seen_histories[-1] if seen_histories else []
+
+    def report(self) -> Dict:
+        return {"status": self.status, "cached": self.cached, "db_ms": self.db_ms,
+                "history_selects": self.history_selects, "history_sent": len(self.history)}
+
+
+async def send(client: httpx.AsyncClient, user_id: str, message: str, conversation_id: Optional[str]) -> Turn:
+    selects_before = counters["history_selects"]
+    response = await client.post(f"/api/{user_id}/chat", json={"message": message, "conversation_id": conversation_id})
+    return Turn(response, counters["history_selects"] - selects_before)
+
+
+async def run_conversation(client: httpx.AsyncClient, user_id: str) -> Tuple[str, List[Turn]]:
+    conversation_id = None
+    turns: List[Turn] = []
+    for i in range(TURNS):
+        turn = await send(client, user_id, f"Turn {i}: tell me something", conversation_id)
+        if turn.status != 200:
+            raise SystemExit(f"[FAIL] turn {i}: {turn.status}")
+        conversation_id = turn.body["conversation_id"]
+        turns.append(turn)
+    return conversation_id, turns
+
+
+async def stored_lengths(conversation_id: str) -> Tuple[int, int]:
+    """(history_length, messages with content) of a conversation."""
+    async with async_session() as session:
+        conversation = await session.get(Conversation, UUID(conversation_id))
+        result = await session.exec(
+            select(func.count()).select_from(Message)
+            .where(Message.conversation_id == conversation.id, Message.content != "")
+        )
+        return conversation.history_length, result.one()
+
+
+async def write_elsewhere(conversation_id: str, user_id: str) -> None:
+    """Store a turn the way another worker would, bypassing this worker's cache."""
+    async with async_session() as session:
+        conv_id = UUID(conversation_id)
+        session.add(Message(conversation_id=conv_id, user_id=UUID(user_id), role="user", content="Written elsewhere"))
+        session.add(Message(conversation_id=conv_id, user_id=UUID(user_id), role="assistant", content="Noted elsewhere"))
+        await session.execute(
+            update(Conversation).where(Conversation.id == conv_id)
+            .values(history_length=Conversation.history_length + 2)
+        )
+        await session.commit()
+
+
+def mean(values: List[float]) -> float:
+    return round(statistics.mean(values), 2) if values else 0.0
+
+
+async def main() -> None:
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with async_session() as session:
+        user = User(email=f"hist{time.time_ns()}@bench.example.com", username=f"hist{time.time_ns()}",
+                    password_hash="x" * 60, full_name="History Cache Bench")
+        session.add(user)
+        await session.commit()
+        user_id = str(user.id)
+    event.listen(engine.sync_engine, "before_cursor_execute", on_statement)
+
+    rate_limiter.requests_per_minute = 10**9
+    checks: List[Tuple[str, bool]] = []
+    report: Dict[str, Any] = {}
+    window = history_cache.window
+
+    transport = httpx.ASGITransport(app=app)
+    # The endpoint prints debug lines; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            max_conversations = history_cache.max_conversations
+            history_cache.max_conversations = 0
+            _, uncached = await run_conversation(client, user_id)
+
+            history_cache.max_conversations = max_conversations
+            conversation_id, cached = await run_conversation(client, user_id)
+
+            stale_before = history_cache.stale
+            await write_elsewhere(conversation_id, user_id)
+            after_write = await send(client, user_id, "What did I write elsewhere?", conversation_id)
+
+            # Two overlapping turns: the second waits for the first's conversation lock
+            await asyncio.gather(
+                send(client, user_id, "First of two at once", conversation_id),
+                send(client, user_id, "Second of two at once", conversation_id),
+            )
+            after_concurrent = await send(client, user_id, "And now?", conversation_id)
+            settled = await send(client, user_id, "And after that?", conversation_id)
+            history_length, stored = await stored_lengths(conversation_id)
+
+            metrics = (await client.get("/api/health/chat")).json()["history_cache"]
+    await engine.dispose()
+
+    report["without_cache"] = {"turns": [t.report() for t in uncached], "mean_db_ms": mean([t.db_ms for t in uncached[1:]])}
+    report["with_cache"] = {"turns": [t.report() for t in cached], "mean_db_ms": mean([t.db_ms for t in cached[1:]])}
+    report["after_write_elsewhere"] = after_write.report()
+    report["after_concurrent"] = {"next": after_concurrent.report(), "settled": settled.report(),
+                                  "history_length": history_length, "stored_messages": stored}
+
+    checks.append(("later turns use the cached history",
+                   all(t.cached for t in cached[1:]) and not any(t.cached for t in uncached)))
+    checks.append(("no history query on cache hits",
+                   all(t.history_selects == 0 for t in cached[1:])
+                   and all(t.history_selects == 1 for t in uncached[1:])))
+    checks.append(("model sees the same history with and without the cache",
+                   [t.history for t in cached] == [t.history for t in uncached]))
+    checks.append(("history capped at the window",
+                   max(len(t.history) for t in cached) == window == len(cached[-1].history)))
+    checks.append(("turn from another worker is picked up",
+                   not after_write.cached and history_cache.stale == stale_before + 1
+                   and history_entry("user", "Written elsewhere") in after_write.history))
+    checks.append(("overlapping turns keep history_length exact",
+                   history_length == stored and after_concurrent.cached and settled.cached))
+
+    # Memory cap, on a standalone cache: ~13 KB per conversation, 50 KB cap
+    capped = HistoryCache(max_conversations=100, max_bytes=50_000, window=10)
+    conversations = [uuid.uuid4() for _ in range(20)]
+    for conv_id in conversations:
+        capped.put(conv_id, 10, [history_entry("user", "x" * 1000) for _ in range(10)])
+    report["memory_cap"] = capped.snapshot()
+    checks.append(("memory cap evicts least recently used",
+                   capped.snapshot()["bytes"] <= 50_000 and capped.evictions > 0
+                   and capped.get(conversations[0], 10) is None and capped.get(conversations[-1], 10) is not None))
+
+    report["metrics"] = metrics
+    print(json.dumps(report, indent=2))
+    failed = False
+    for name, ok in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}")
+        failed |= not ok
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,311 @@
+"""
+Microbenchmarks of the per-request hot path, checked against a stored baseline.
+
+Times the code that runs on every request with fixed fixtures (no network,
+an in-memory SQLite database for get_current_user):
+
+    extract_token          dependencies._extract_token (cookie)
+    verify_token_cached    security.verify_token, cache hit
+    verify_token_uncached  security.verify_token, signature check
+    get_current_user       dependencies.get_current_user (one user lookup)
+    rate_limiter           RateLimiter.is_allowed
+    cache_headers          the Cache-Control middleware in main.create_app
+    task_read_validate     TaskRead.model_validate on a Task row
+    clean_schema           chat.clean_schema on a tool input schema
+
+Benchmarks run in ROUNDS interleaved rounds of ~ROUND_SECONDS each, and
+every round also times a fixed pure-Python calibration loop. A pass yields
+each benchmark's median ratio to that loop, so comparisons hold across
+machines of different speed and ride out bursts of load on shared CI
+runners. Whole passes still drift by 20% or more (CPU frequency, a noisy
+neighbour for a second), so the script runs PASSES passes and keeps each
+benchmark's best one; noise only ever makes a pass slower. The baseline
+stores that best ratio, and the fastest round is reported in ns per call
+for reference.
+
+Usage:
+    python benchmarks/hot_path.py                    # compare, exit 1 on regression
+    python benchmarks/hot_path.py --update-baseline  # rewrite baselines/hot_path.json
+    python benchmarks/hot_path.py --tolerance 0.5 --only verify_token_cached
+    python benchmarks/hot_path.py --passes 5         # more passes on a noisy machine
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from uuid import uuid4
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from app.services.chat import clean_schema
+from app.db.models import Task, TaskPriority, TaskStatus, User
+from app.dependencies import _extract_token, get_current_user
+from app.main import app
+from app.middleware.rate_limit import RateLimiter
+from app.rate_limit_store import InMemoryRateLimitStore
+from app.revocation import revocation_list
+from app.schemas import TaskRead
+from app.security import create_access_token, verify_token
+from app.token_cache import verified_token_cache
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "hot_path.json"
+DEFAULT_TOLERANCE = 0.30
+PASSES = 3
+ROUNDS = 15
+ROUND_SECONDS = 0.02
+
+# Representative MCP tool input schema (shape of FastMCP's list_tasks schema)
+TOOL_SCHEMA = {
+    "type": "object",
+    "title": "list_tasksArguments",
+    "properties": {
+        "user_id": {"type": "string", "title": "User Id"},
+        "status": {"type": "string", "title": "Status", "default": "all"},
+        "priority": {"type": "string", "title": "Priority", "default": "all"},
+        "due_before": {"type": "string", "title": "Due Before", "default": ""},
+        "limit": {"type": "integer", "title": "Limit", "default": 20},
+        "tags": {"type": "array", "title": "Tags", "items": {"type": "string", "title": "Tag"}},
+    },
+    "required": ["user_id"],
+    "additionalProperties": False,
+}
+
+Benchmark = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+def calibration() -> int:
+    """Fixed pure-Python workload used to normalize timings across machines."""
+    total = 0
+    for i in range(200):
+        total += len(str(i * i))
+    return total
+
+
+def make_request(path: str, token: Optional[str] = None) -> Request:
+    """Bare ASGI request, optionally carrying the access_token cookie."""
+    headers = [(b"host", b"test")]
+    if token:
+        headers.append((b"cookie", f"access_token={token}".encode("latin-1")))
+    return Request({"type": "http", "method": "GET", "path": path, "headers": headers, "query_string": b""})
+
+
+def find_cache_header_middleware() -> Callable:
+    """The add_cache_headers dispatch function registered by create_app."""
+    for middleware in app.user_middleware:
+        dispatch = middleware.kwargs.get("dispatch")
+        if getattr(dispatch, "__name__", "") == "add_cache_headers":
+            return dispatch
+    raise SystemExit("add_cache_headers middleware not found in app.user_middleware")
+
+
+class Timer:
+    """Runs one benchmark for a given number of iterations."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, func: Benchmark):
+        self.loop = loop
+        self.func = func
+        self.is_async = asyncio.iscoroutinefunction(func)
+        self.iterations = 1
+
+    async def _run_async(self, n: int) -> float:
+        func = self.func
+        start = time.perf_counter()
+        for _ in range(n):
+            await func()
+        return time.perf_counter() - start
+
+    def run(self, n: int) -> float:
+        """Total seconds for n calls."""
+        if self.is_async:
+            return self.loop.run_until_complete(self._run_async(n))
+        func = self.func
+        start = time.perf_counter()
+        for _ in range(n):
+            func()
+        return time.perf_counter() - start
+
+    def calibrate(self) -> None:
+        """Pick an iteration count so one round takes about ROUND_SECONDS."""
+        iterations = 1
+        while (elapsed := self.run(iterations)) < ROUND_SECONDS / 10:
+            iterations *= 10
+        self.iterations = max(1, int(iterations * ROUND_SECONDS / max(elapsed, 1e-9)))
+
+    def round(self) -> float:
+        """Seconds per call for one round."""
+        return self.run(self.iterations) / self.iterations
+
+
+def measure(loop: asyncio.AbstractEventLoop, benchmarks: Dict[str, Benchmark]) -> Dict[str, Dict[str, float]]:
+    """Time all benchmarks in interleaved rounds.
+
+    Every round times the calibration loop and then each benchmark, so a
+    burst of load on the machine affects the calibration of the same round.
+    Returns the fastest round in ns per call and the median of per-round
+    ratios to the calibration loop.
+    """
+    calibration_timer = Timer(loop, calibration)
+    timers = {name: Timer(loop, func) for name, func in benchmarks.items()}
+    for timer in (calibration_timer, *timers.values()):
+        timer.calibrate()
+
+    seconds: Dict[str, list] = {name: [] for name in timers}
+    ratios: Dict[str, list] = {name: [] for name in timers}
+    for _ in range(ROUNDS):
+        reference = calibration_timer.round()
+        for name, timer in timers.items():
+            elapsed = timer.round()
+            seconds[name].append(elapsed)
+            ratios[name].append(elapsed / reference)
+
+    return {
+        name: {
+            "ns_per_call": round(min(seconds[name]) * 1e9, 1),
+            "normalized": round(statistics.median(ratios[name]), 5),
+        }
+        for name in timers
+    }
+
+
+def best_pass(passes: List[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """Each benchmark's fastest result over several measure() passes."""
+    return {
+        name: {key: min(results[name][key] for results in passes) for key in ("ns_per_call", "normalized")}
+        for name in passes[0]
+    }
+
+
+async def build_fixtures() -> Tuple[Dict[str, Benchmark], Callable[[], Awaitable[None]]]:
+    """Create the fixtures; return the benchmarks by name and a cleanup coroutine."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    session = AsyncSession(engine, expire_on_commit=False)
+    user = User(email="bench@example.com", username="bench", password_hash="x" * 60, full_name="Bench")
+    session.add(user)
+    await session.commit()
+    await revocation_list.sync(session)
+
+    token = create_access_token({"sub": str(user.id)})
+    cookie_request = make_request("/api/tasks", token)
+    uncached_token = create_access_token({"sub": str(uuid4())})
+
+    rate_limiter = RateLimiter(requests_per_minute=10**12, store=InMemoryRateLimitStore())
+    cache_headers = find_cache_header_middleware()
+    api_request = make_request("/api/tasks")
+
+    async def call_next(request: Request) -> JSONResponse:
+        return JSONResponse({"ok": True})
+
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    task = Task(
+        user_id=user.id,
+        title="Write quarterly report",
+        description="Collect numbers from finance and draft the summary",
+        status=TaskStatus.PENDING,
+        priority=TaskPriority.HIGH,
+        due_date=now,
+        created_at=now,
+        updated_at=now,
+    )
+
+    def verify_uncached() -> None:
+        verified_token_cache.max_size = 0
+        try:
+            verify_token(uncached_token)
+        finally:
+            verified_token_cache.max_size = 10000
+
+    async def current_user() -> None:
+        await get_current_user(token=token, session=session)
+
+    async def rate_limit() -> None:
+        await rate_limiter.is_allowed("203.0.113.7")
+
+    async def cache_header_middleware() -> None:
+        await cache_headers(api_request, call_next)
+
+    async def cleanup() -> None:
+        await session.close()
+        await engine.dispose()
+
+    return {
+        "extract_token": lambda: _extract_token(cookie_request, None),
+        "verify_token_cached": lambda: verify_token(token),
+        "verify_token_uncached": verify_uncached,
+        "get_current_user": current_user,
+        "rate_limiter": rate_limit,
+        "cache_headers": cache_header_middleware,
+        "task_read_validate": lambda: TaskRead.model_validate(task),
+        "clean_schema": lambda: clean_schema(TOOL_SCHEMA),
+    }, cleanup
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown vs baseline as a fraction (default 0.30)")
+    parser.add_argument("--only", action="append", default=[], help="Run only these benchmarks")
+    parser.add_argument("--passes", type=int, default=PASSES,
+                        help=f"Measurement passes; the best one counts (default {PASSES})")
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    benchmarks, cleanup = loop.run_until_complete(build_fixtures())
+    if args.only:
+        benchmarks = {name: benchmarks[name] for name in args.only}
+
+    # Several benchmarked functions print debug lines; keep them out of the timings
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = best_pass([measure(loop, benchmarks) for _ in range(max(1, args.passes))])
+    loop.run_until_complete(cleanup())
+    loop.close()
+
+    if args.update_baseline:
+        BASELINE_PATH.parent.mkdir(exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps({"benchmarks": results}, indent=2) + "\n")
+        print(json.dumps(results, indent=2))
+        print(f"Baseline written to {BASELINE_PATH}")
+        return
+
+    baseline = json.loads(BASELINE_PATH.read_text())["benchmarks"] if BASELINE_PATH.exists() else {}
+    failed = False
+    print(f"{'benchmark':24} {'ns/call':>12} {'baseline':>12} {'change':>8}")
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"{name:24} {result['ns_per_call']:>12.1f} {'-':>12} {'new':>8}")
+            continue
+        change = result["normalized"] / reference["normalized"] - 1
+        # Express the baseline in this machine's speed
+        expected_ns = result["ns_per_call"] / (1 + change)
+        status = "FAIL" if change > args.tolerance else "PASS"
+        failed |= status == "FAIL"
+        print(f"{name:24} {result['ns_per_call']:>12.1f} {expected_ns:>12.1f} {change:>+8.1%} [{status}]")
+
+    if failed:
+        print(f"[FAIL] slower than baseline by more than {args.tolerance:.0%}")
+        sys.exit(1)
+    print("[PASS] hot path within tolerance of baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Import-time budget check for serverless cold starts.
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters, reports
+the cumulative import time of app.main (best of N runs) and the slowest
+modules, and exits with status 1 if:
+- the import exceeds the budget, or
+- a module that must stay lazy (Gemini SDK, MCP server) is imported eagerly.
+
+Usage:
+    python benchmarks/import_time.py
+    IMPORT_TIME_BUDGET_MS=800 IMPORT_TIME_RUNS=5 python benchmarks/import_time.py
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1500"))
+RUNS = int(os.environ.get("IMPORT_TIME_RUNS", "3"))
+TARGET_MODULE = "app.main"
+
+# Only needed by /api/{user_id}/chat; importing them eagerly costs ~1 s
+MUST_BE_LAZY = ["google.generativeai", "mcp.server.fastmcp"]
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure_once() -> Dict[str, Tuple[int, int]]:
+    """Import the app in a fresh interpreter.
+
+    Returns:
+        Mapping of module name to (self_us, cumulative_us)
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(SRC_DIR)
+    env.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {TARGET_MODULE}"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr)
+        raise SystemExit(f"Importing {TARGET_MODULE} failed")
+
+    modules: Dict[str, Tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main() -> int:
+    """Run the benchmark and enforce the budget."""
+    runs: List[Dict[str, Tuple[int, int]]] = [measure_once() for _ in range(RUNS)]
+    best = min(runs, key=lambda modules: modules[TARGET_MODULE][1])
+    total_ms = best[TARGET_MODULE][1] / 1000
+
+    print(f"{TARGET_MODULE}: {total_ms:.1f} ms (best of {RUNS}, budget {BUDGET_MS:.0f} ms)")
+    print("Slowest modules (self time):")
+    for name, (self_us, _) in sorted(best.items(), key=lambda item: -item[1][0])[:10]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    eager = [name for name in MUST_BE_LAZY if name in best]
+    if eager:
+        failed = True
+        print(f"[FAIL]: imported eagerly: {', '.join(eager)}")
+    if total_ms > BUDGET_MS:
+        failed = True
+        print(f"[FAIL]: {TARGET_MODULE} import exceeds budget by {total_ms - BUDGET_MS:.1f} ms")
+    if not failed:
+        print("[PASS]: import time within budget")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
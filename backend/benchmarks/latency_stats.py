@@ -0,0 +1,63 @@
+"""
+Percentile summaries shared by the benchmarks.
+
+Every percentile is a nearest-rank one: the smallest sample that at least
+q of all samples are less than or equal to. It is always an observed value,
+and p50 <= p95 <= p99 for any input.
+"""
+
+import math
+import statistics
+from typing import Dict, Sequence
+
+
+def nearest_rank(ordered: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of sorted samples.
+
+    Args:
+        ordered: Samples in ascending order (at least one)
+        q: Quantile between 0 and 1 (0.95 for p95)
+
+    Returns:
+        The sample at rank ceil(q * n)
+    """
+    n = len(ordered)
+    return ordered[min(n - 1, max(0, math.ceil(q * n) - 1))]
+
+
+def percentiles(samples: Sequence[float]) -> Dict[str, float]:
+    """Summarize latency samples (seconds) in milliseconds.
+
+    Args:
+        samples: Latencies in seconds
+
+    Returns:
+        p50_ms, p95_ms, p99_ms and mean_ms (all 0.0 without samples)
+    """
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(nearest_rank(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(nearest_rank(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(nearest_rank(ordered, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+def summarize(samples: Sequence[float], digits: int = 2) -> Dict[str, float]:
+    """Mean, p50 and p95 of samples, in their own unit.
+
+    Args:
+        samples: Values (at least one), e.g. milliseconds or statement counts
+        digits: Decimal places to round to
+
+    Returns:
+        mean, p50 and p95
+    """
+    ordered = sorted(samples)
+    return {
+        "mean": round(statistics.fmean(ordered), digits),
+        "p50": round(nearest_rank(ordered, 0.50), digits),
+        "p95": round(nearest_rank(ordered, 0.95), digits),
+    }
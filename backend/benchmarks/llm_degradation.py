@@ -0,0 +1,145 @@
+"""
+Chat behaviour while the LLM provider is saturated, slow or failing.
+
+Drives POST /api/{user_id}/chat through the ASGI app with the fake LLM from
+fake_llm.py and checks the LLM guard (app/llm_guard.py):
+
+    burst     BENCH_BURST concurrent turns (default 40) never put more than
+              LLM_MAX_CONCURRENCY calls in flight, and all succeed
+    slow      provider latency above the call deadline: turns fail with 503,
+              the breaker opens, and later turns fail fast without calling
+              the provider
+    recovery  after the breaker's reset time a healthy provider closes it
+
+Prints a JSON report and [PASS]/[FAIL] per check; exits 1 on any failure.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python benchmarks/llm_degradation.py
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+os.environ.setdefault("LLM_MAX_CONCURRENCY", "4")
+os.environ.setdefault("LLM_QUEUE_TIMEOUT_SECONDS", "30")
+os.environ.setdefault("LLM_CALL_TIMEOUT_SECONDS", "0.5")
+os.environ.setdefault("LLM_BREAKER_FAILURE_THRESHOLD", "3")
+os.environ.setdefault("LLM_BREAKER_RESET_SECONDS", "1")
+# Every turn should reach the model, not the response cache
+os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
+
+import fake_llm  # noqa: E402
+
+fake_llm.install(latency_seconds=0.1)
+
+import httpx  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database import async_session, get_engine  # noqa: E402
+from app.db.models import User  # noqa: E402
+from app.llm_guard import llm_guard  # noqa: E402
+from app.main import app  # noqa: E402
+from app.middleware.rate_limit import rate_limiter  # noqa: E402
+
+BURST = int(os.environ.get("BENCH_BURST", "40"))
+
+
+async def chat(client: httpx.AsyncClient, user_id: str) -> Tuple[int, float, str]:
+    """One chat turn; returns (status, seconds, Retry-After)."""
+    start = time.perf_counter()
+    response = await client.post(f"/api/{user_id}/chat", json={"message": "hello"})
+    return response.status_code, time.perf_counter() - start, response.headers.get("retry-after", "")
+
+
+async def run_scenarios(transport: httpx.ASGITransport, user_id: str,
+                        checks: List[Tuple[str, bool]], report: Dict[str, Dict]) -> None:
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Burst: concurrency stays capped, everything eventually succeeds
+        start = time.perf_counter()
+        results = await asyncio.gather(*(chat(client, user_id) for _ in range(BURST)))
+        report["burst"] = {
+            "turns": BURST,
+            "ok": sum(status == 200 for status, _, _ in results),
+            "max_in_flight": fake_llm.stats["max_in_flight"],
+            "limit": settings.LLM_MAX_CONCURRENCY,
+            "wall_s": round(time.perf_counter() - start, 3),
+        }
+        checks.append(("burst: all turns succeed", report["burst"]["ok"] == BURST))
+        checks.append(("burst: in-flight calls capped", fake_llm.stats["max_in_flight"] <= settings.LLM_MAX_CONCURRENCY))
+
+        # Slow provider: deadlines trip the breaker, then requests fail fast
+        fake_llm.FakeGenerativeModel.latency_seconds = settings.LLM_CALL_TIMEOUT_SECONDS * 4
+        timed_out = [await chat(client, user_id) for _ in range(settings.LLM_BREAKER_FAILURE_THRESHOLD)]
+        calls_before = fake_llm.stats["calls"]
+        fast = [await chat(client, user_id) for _ in range(10)]
+        report["slow"] = {
+            "timed_out_statuses": [status for status, _, _ in timed_out],
+            "breaker_state": llm_guard.breaker.state,
+            "fail_fast_statuses": sorted({status for status, _, _ in fast}),
+            "fail_fast_max_ms": round(max(seconds for _, seconds, _ in fast) * 1000, 2),
+            "provider_calls_while_open": fake_llm.stats["calls"] - calls_before,
+            "retry_after": fast[0][2],
+        }
+        checks.append(("slow: deadline exceeded returns 503", all(s == 503 for s, _, _ in timed_out)))
+        checks.append(("slow: breaker opens", llm_guard.breaker.state == "open"))
+        checks.append(("slow: open breaker fails fast with 503", report["slow"]["fail_fast_statuses"] == [503]
+                       and report["slow"]["fail_fast_max_ms"] < settings.LLM_CALL_TIMEOUT_SECONDS * 1000 / 2))
+        checks.append(("slow: no provider calls while open", report["slow"]["provider_calls_while_open"] == 0))
+        checks.append(("slow: Retry-After header set", report["slow"]["retry_after"].isdigit()))
+
+        # Recovery: after the reset time one probe succeeds and closes the breaker
+        fake_llm.FakeGenerativeModel.latency_seconds = 0.01
+        await asyncio.sleep(settings.LLM_BREAKER_RESET_SECONDS + 0.1)
+        status, _, _ = await chat(client, user_id)
+        report["recovery"] = {"status": status, "breaker_state": llm_guard.breaker.state}
+        checks.append(("recovery: probe succeeds and closes breaker", status == 200 and llm_guard.breaker.state == "closed"))
+
+        report["metrics"] = (await client.get("/api/health/llm")).json()
+
+
+async def main() -> None:
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with async_session() as session:
+        user = User(email=f"llm{time.time_ns()}@bench.example.com", username=f"llm{time.time_ns()}",
+                    password_hash="x" * 60, full_name="LLM Bench")
+        session.add(user)
+        await session.commit()
+        user_id = str(user.id)
+
+    rate_limiter.requests_per_minute = 10**9
+    checks: List[Tuple[str, bool]] = []
+    report: Dict[str, Dict] = {}
+
+    transport = httpx.ASGITransport(app=app)
+    # The endpoint prints debug lines; keep them out of the report. Redirect once
+    # around all requests: redirect_stdout is not safe across concurrent tasks.
+    with contextlib.redirect_stdout(io.StringIO()):
+        await run_scenarios(transport, user_id, checks, report)
+
+    await engine.dispose()
+    print(json.dumps(report, indent=2))
+    failed = False
+    for name, ok in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}")
+        failed |= not ok
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,257 @@
+"""
+Load-test harness: seeded dataset + realistic request mix, in process.
+
+Seeds (or reuses) a dataset with benchmarks/seed_data.py, then runs
+BENCH_CONCURRENCY virtual users against the ASGI app through httpx's
+in-process transport. Each virtual user logs in as a seeded account (own
+cookie jar, own client IP) and issues requests drawn from a weighted mix of
+register, login, list, create, patch, delete and chat until BENCH_REQUESTS
+have completed. Chat runs against benchmarks/fake_llm.py, so no API key or
+network is needed.
+
+Prints (and optionally writes to BENCH_OUTPUT) a JSON report with overall
+throughput and per-route count, errors, throughput and p50/p95/p99, plus the
+git commit, so runs can be compared between commits.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python benchmarks/load_test.py
+    BENCH_CONCURRENCY=32 BENCH_REQUESTS=5000 BENCH_OUTPUT=before.json python benchmarks/load_test.py
+    BENCH_MIX="list=60,create=20,chat=20" python benchmarks/load_test.py
+
+Environment:
+    BENCH_USERS, BENCH_TASKS_PER_USER, BENCH_CONVERSATIONS_PER_USER  dataset size
+    BENCH_CONCURRENCY     virtual users in flight (default 10)
+    BENCH_REQUESTS        requests to issue after warm-up (default 2000)
+    BENCH_MIX             route weights, "name=weight,..." (default DEFAULT_MIX)
+    BENCH_LLM_LATENCY_MS  fake LLM latency per model call (default 100)
+    BENCH_SEED            RNG seed for the dataset and the request sequence
+    BENCH_OUTPUT          optional path for the JSON report
+"""
+
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import httpx
+
+from app.config import settings
+from app.database import get_engine
+from app.main import app
+from app.middleware.rate_limit import rate_limiter
+
+import fake_llm
+from latency_stats import percentiles
+from seed_data import SEED_PASSWORD, SeededUser, seed
+
+DEFAULT_MIX = {
+    "register": 2,
+    "login": 5,
+    "list": 45,
+    "create": 15,
+    "patch": 15,
+    "delete": 5,
+    "chat": 13,
+}
+
+USERS = int(os.environ.get("BENCH_USERS", "50"))
+TASKS_PER_USER = int(os.environ.get("BENCH_TASKS_PER_USER", "20"))
+CONVERSATIONS_PER_USER = int(os.environ.get("BENCH_CONVERSATIONS_PER_USER", "3"))
+CONCURRENCY = int(os.environ.get("BENCH_CONCURRENCY", "10"))
+REQUESTS = int(os.environ.get("BENCH_REQUESTS", "2000"))
+LLM_LATENCY_MS = float(os.environ.get("BENCH_LLM_LATENCY_MS", "100"))
+SEED = int(os.environ.get("BENCH_SEED", "1"))
+OUTPUT = os.environ.get("BENCH_OUTPUT", "")
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    """Parse "name=weight,..." into a mix dict (unknown names are rejected)."""
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown route in BENCH_MIX: {name}")
+        mix[name] = int(weight)
+    return mix
+
+
+def git_commit() -> Optional[str]:
+    """Current commit of the working tree, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class VirtualUser:
+    """One logged-in client issuing requests from the mix."""
+
+    def __init__(self, index: int, account: SeededUser, rng: random.Random):
+        self.index = index
+        self.account = account
+        self.rng = rng
+        self.task_ids = list(account.task_ids)
+        self.transport = httpx.ASGITransport(app=app, client=(f"10.1.{index // 250}.{index % 250 + 1}", 50000))
+        self.client = httpx.AsyncClient(transport=self.transport, base_url="https://test")
+
+    async def login(self) -> httpx.Response:
+        return await self.client.post(
+            "/api/auth/login", json={"email": self.account.email, "password": SEED_PASSWORD}
+        )
+
+    async def register(self) -> httpx.Response:
+        # Separate client so the new account's cookies don't replace ours
+        async with httpx.AsyncClient(transport=self.transport, base_url="https://test") as client:
+            return await client.post("/api/auth/register", json={
+                "email": f"loadtest-new-{time.time_ns()}-{self.index}@example.com",
+                "password": SEED_PASSWORD,
+                "full_name": "Load Test Signup",
+            })
+
+    async def list(self) -> httpx.Response:
+        params = {"limit": 20}
+        if self.rng.random() < 0.5:
+            params["status_filter"] = "pending"
+        return await self.client.get("/api/tasks", params=params)
+
+    async def create(self) -> httpx.Response:
+        response = await self.client.post("/api/tasks", json={
+            "title": f"Load test task {self.rng.randint(0, 10**6)}",
+            "priority": self.rng.choice(["low", "medium", "high"]),
+        })
+        if response.status_code == 201:
+            self.task_ids.append(response.json()["id"])
+        return response
+
+    async def patch(self) -> httpx.Response:
+        if not self.task_ids:
+            return await self.create()
+        task_id = self.rng.choice(self.task_ids)
+        return await self.client.patch(
+            f"/api/tasks/{task_id}", json={"status": self.rng.choice(["pending", "completed"])}
+        )
+
+    async def delete(self) -> httpx.Response:
+        if not self.task_ids:
+            return await self.create()
+        task_id = self.task_ids.pop(self.rng.randrange(len(self.task_ids)))
+        return await self.client.delete(f"/api/tasks/{task_id}")
+
+    async def chat(self) -> httpx.Response:
+        user_id = self.account.id
+        message = self.rng.choice([
+            f"Add a task 'Load test chat {self.rng.randint(0, 10**6)}' (user {user_id})",
+            f"List my pending tasks (user {user_id})",
+            "What should I focus on today?",
+        ])
+        conversation_id = None
+        if self.account.conversation_ids and self.rng.random() < 0.7:
+            conversation_id = str(self.rng.choice(self.account.conversation_ids))
+        return await self.client.post(
+            f"/api/{user_id}/chat", json={"conversation_id": conversation_id, "message": message}
+        )
+
+
+async def main() -> None:
+    mix = parse_mix(os.environ.get("BENCH_MIX", ""))
+    routes, weights = list(mix), list(mix.values())
+
+    accounts = await seed(USERS, TASKS_PER_USER, CONVERSATIONS_PER_USER, rng_seed=SEED)
+    fake_llm.install(latency_seconds=LLM_LATENCY_MS / 1000)
+    settings.GEMINI_API_KEY = settings.GEMINI_API_KEY or "fake-key-for-load-test"
+    os.environ.setdefault("GEMINI_API_KEY", settings.GEMINI_API_KEY)
+    # Virtual users issue far more than 100 requests/minute each
+    rate_limiter.requests_per_minute = 10**9
+
+    rng = random.Random(SEED)
+    vusers = [
+        VirtualUser(i, accounts[i % len(accounts)], random.Random(rng.random()))
+        for i in range(CONCURRENCY)
+    ]
+    for vuser in vusers:
+        response = await vuser.login()
+        if response.status_code != 200:
+            raise SystemExit(f"Warm-up login failed: {response.status_code} {response.text[:200]}")
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    first_errors: Dict[str, str] = {}
+    remaining = REQUESTS
+
+    async def worker(vuser: VirtualUser) -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            route = vuser.rng.choices(routes, weights)[0]
+            start = time.perf_counter()
+            response = await getattr(vuser, route)()
+            latencies[route].append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors[route] += 1
+                first_errors.setdefault(route, f"{response.status_code} {response.text[:200]}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(vuser) for vuser in vusers))
+    elapsed = time.perf_counter() - start
+
+    for vuser in vusers:
+        await vuser.client.aclose()
+
+    report = {
+        "commit": git_commit(),
+        "dialect": get_engine().dialect.name,
+        "config": {
+            "users": USERS,
+            "tasks_per_user": TASKS_PER_USER,
+            "conversations_per_user": CONVERSATIONS_PER_USER,
+            "concurrency": CONCURRENCY,
+            "requests": REQUESTS,
+            "llm_latency_ms": LLM_LATENCY_MS,
+            "seed": SEED,
+            "mix": mix,
+        },
+        "total": {
+            "requests": sum(len(samples) for samples in latencies.values()),
+            "errors": sum(errors.values()),
+            "duration_s": round(elapsed, 3),
+            "throughput_rps": round(sum(len(s) for s in latencies.values()) / elapsed, 1),
+        },
+        "routes": {
+            route: {
+                "count": len(samples),
+                "errors": errors[route],
+                "throughput_rps": round(len(samples) / elapsed, 1),
+                **percentiles(samples),
+            }
+            for route, samples in sorted(latencies.items())
+        },
+        "llm_calls": fake_llm.stats["calls"],
+    }
+    if first_errors:
+        report["first_errors"] = first_errors
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if OUTPUT:
+        Path(OUTPUT).write_text(output + "\n")
+
+    await get_engine().dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
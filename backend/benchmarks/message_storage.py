@@ -0,0 +1,293 @@
+"""
+Message storage: compact tool_calls, the messages_archive cold table and history loads.
+
+Seeds BENCH_CONVERSATIONS conversations (default 2000) of
+BENCH_MESSAGES_PER_CONVERSATION messages (default 50, so 100k messages;
+every fourth message is an assistant reply with tool calls). Nine in ten
+conversations were last active BENCH_IDLE_DAYS ago (default 200), the rest
+today. Then archives the idle ones with archive_inactive_conversations and
+checks that:
+
+    compact       tool_calls as stored now (stored_tool_calls, compact JSON)
+                  are smaller than the old form (full args, ", " separators,
+                  "..." after every result)
+    archive       every message of an idle conversation moved to
+                  messages_archive and none of an active one did
+    hot table     the messages table (with its indexes) shrank
+    history       loading the history window of active conversations is not
+                  slower after archiving
+    listing       GET /api/conversations/{id}/messages still pages through an
+                  archived conversation
+    restore       a chat turn (fake LLM from fake_llm.py) in an archived
+                  conversation moves its messages back and appends the turn
+
+Table sizes come from dbstat on SQLite and pg_total_relation_size on
+PostgreSQL. For the 10M-message measurement, run against PostgreSQL (where
+tool_calls is JSONB and, from PostgreSQL 14, lz4-compressed) with
+BENCH_CONVERSATIONS=200000; seeding takes a while.
+
+Prints a JSON report and [PASS]/[FAIL] per check; exits 1 on any failure.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python benchmarks/message_storage.py
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
+os.environ.setdefault("HISTORY_CACHE_SIZE", "0")
+os.environ.setdefault("CHAT_FAST_PATH_ENABLED", "false")
+
+import fake_llm  # noqa: E402
+
+fake_llm.install(latency_seconds=0.01)
+
+import httpx  # noqa: E402
+from sqlalchemy import func, insert, text  # noqa: E402
+from sqlmodel import SQLModel, select  # noqa: E402
+
+from app.database import async_session, get_engine  # noqa: E402
+from app.db.models import Conversation, Message, MessageArchive, User  # noqa: E402
+from app.main import app  # noqa: E402
+from app.middleware.rate_limit import rate_limiter  # noqa: E402
+from app.security import create_access_token  # noqa: E402
+from app.services.chat import load_history_window, stored_tool_calls  # noqa: E402
+from app.services.conversation import archive_inactive_conversations  # noqa: E402
+
+CONVERSATIONS = int(os.environ.get("BENCH_CONVERSATIONS", "2000"))
+MESSAGES_PER_CONVERSATION = int(os.environ.get("BENCH_MESSAGES_PER_CONVERSATION", "50"))
+IDLE_DAYS = int(os.environ.get("BENCH_IDLE_DAYS", "200"))
+HISTORY_SAMPLES = int(os.environ.get("BENCH_HISTORY_SAMPLES", "200"))
+HISTORY_ROUNDS = 3
+INSERT_CHUNK = 5000
+
+
+def executed_call(user_id: uuid.UUID, i: int) -> Dict[str, Any]:
+    """A tool call as the chat turn returns it (full result, user_id in args)."""
+    tasks = [
+        {"id": str(uuid.UUID(int=i * 16 + n)), "title": f"Task {i}-{n}", "status": "pending", "priority": "medium"}
+        for n in range(3 + i % 5)
+    ]
+    return {
+        "tool": "list_tasks",
+        "args": {"user_id": str(user_id), "status": "pending"},
+        "result": json.dumps({"tasks": tasks, "count": len(tasks)}),
+    }
+
+
+def legacy_tool_calls(calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """tool_calls as stored before stored_tool_calls."""
+    return [{"tool": t["tool"], "args": t["args"], "result": t["result"][:200] + "..."} for t in calls]
+
+
+async def seed(now: datetime) -> Tuple[User, List[Conversation], Dict[str, int]]:
+    idle_at = now - timedelta(days=IDLE_DAYS)
+    sizes = {"legacy_tool_calls_bytes": 0, "compact_tool_calls_bytes": 0}
+    async with async_session() as session:
+        user = User(email=f"storage{time.time_ns()}@bench.example.com", username=f"storage{time.time_ns()}",
+                    password_hash="x" * 60, full_name="Storage Bench")
+        session.add(user)
+        await session.flush()
+
+        conversations = [
+            Conversation(user_id=user.id, title=f"Conversation {i}", history_length=MESSAGES_PER_CONVERSATION,
+                         last_message_at=now if i % 10 == 0 else idle_at)
+            for i in range(CONVERSATIONS)
+        ]
+        session.add_all(conversations)
+        await session.flush()
+
+        connection = await session.connection()
+        rows: List[Dict[str, Any]] = []
+        for c, conversation in enumerate(conversations):
+            start = conversation.last_message_at - timedelta(minutes=MESSAGES_PER_CONVERSATION)
+            for m in range(MESSAGES_PER_CONVERSATION):
+                tool_calls = None
+                if m % 4 == 3:
+                    calls = [executed_call(user.id, c * MESSAGES_PER_CONVERSATION + m)]
+                    tool_calls = stored_tool_calls(calls, user.id)
+                    sizes["legacy_tool_calls_bytes"] += len(json.dumps(legacy_tool_calls(calls)))
+                    sizes["compact_tool_calls_bytes"] += len(json.dumps(tool_calls, separators=(",", ":")))
+                created_at = start + timedelta(minutes=m)
+                rows.append({
+                    "id": uuid.uuid4(), "created_at": created_at, "updated_at": created_at,
+                    "conversation_id": conversation.id, "user_id": user.id,
+                    "role": "user" if m % 2 == 0 else "assistant",
+                    "content": f"Message {m} of conversation {c}: " + "lorem ipsum " * random.randint(2, 20),
+                    "tool_calls": tool_calls,
+                })
+                if len(rows) >= INSERT_CHUNK:
+                    await connection.execute(insert(Message), rows)
+                    rows = []
+        if rows:
+            await connection.execute(insert(Message), rows)
+        await session.commit()
+    return user, conversations, sizes
+
+
+async def table_bytes(table: str) -> int:
+    """On-disk size of a table with its indexes."""
+    async with get_engine().connect() as conn:
+        if conn.dialect.name == "postgresql":
+            return (await conn.execute(text(f"SELECT pg_total_relation_size('{table}')"))).scalar_one()
+        result = await conn.execute(
+            text("SELECT SUM(pgsize) FROM dbstat WHERE name = :table OR name IN "
+                 "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table)"),
+            {"table": table},
+        )
+        return result.scalar_one() or 0
+
+
+async def history_load_ms(conversations: List[Conversation]) -> float:
+    """Time of the chat turn's history window query (services.chat.load_history_window).
+
+    Best of HISTORY_ROUNDS medians, so a burst of machine noise during one
+    round does not decide the comparison.
+    """
+    medians = []
+    async with async_session() as session:
+        for _ in range(HISTORY_ROUNDS):
+            timings = []
+            for i in range(HISTORY_SAMPLES):
+                conversation = conversations[i % len(conversations)]
+                start = time.perf_counter()
+                await load_history_window(session, conversation)
+                timings.append((time.perf_counter() - start) * 1000)
+            medians.append(statistics.median(timings))
+    return min(medians)
+
+
+async def message_counts(conversation_id: Optional[uuid.UUID] = None) -> Tuple[int, int]:
+    """(live, archived) message rows, optionally of one conversation."""
+    counts = []
+    async with async_session() as session:
+        for model in (Message, MessageArchive):
+            statement = select(func.count()).select_from(model)
+            if conversation_id:
+                statement = statement.where(model.conversation_id == conversation_id)
+            counts.append((await session.exec(statement)).one())
+    return counts[0], counts[1]
+
+
+async def main() -> None:
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    now = datetime.utcnow()
+    start = time.perf_counter()
+    user, conversations, sizes = await seed(now)
+    seed_seconds = time.perf_counter() - start
+    active = [c for c in conversations if c.last_message_at == now]
+    idle = [c for c in conversations if c.last_message_at != now]
+    total = CONVERSATIONS * MESSAGES_PER_CONVERSATION
+
+    checks: List[Tuple[str, bool]] = []
+    report: Dict[str, Any] = {"messages": total, "conversations": CONVERSATIONS, "seed_seconds": round(seed_seconds, 1)}
+    report.update(sizes)
+
+    # Warm up, then time the active conversations' history with every message live
+    await history_load_ms(active)
+    before_ms = await history_load_ms(active)
+    before_bytes = await table_bytes("messages")
+
+    start = time.perf_counter()
+    archived = 0
+    async with async_session() as session:
+        while True:
+            batch = await archive_inactive_conversations(session, IDLE_DAYS - 1, batch_size=500)
+            archived += batch
+            if batch < 500:
+                break
+    archive_seconds = time.perf_counter() - start
+
+    after_bytes = await table_bytes("messages")
+    await history_load_ms(active)
+    after_ms = await history_load_ms(active)
+    live, cold = await message_counts()
+
+    report["archive"] = {"conversations": archived, "seconds": round(archive_seconds, 2),
+                         "live_messages": live, "archived_messages": cold}
+    report["messages_table_bytes"] = {"before": before_bytes, "after": after_bytes,
+                                      "archive": await table_bytes("messages_archive")}
+    report["history_window_median_ms"] = {"before": round(before_ms, 3), "after": round(after_ms, 3)}
+
+    archived_conversation = idle[0]
+    fake_llm.FakeGenerativeModel.default_user_id = str(user.id)
+    rate_limiter.requests_per_minute = 10**9
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+    transport = httpx.ASGITransport(app=app)
+    # The endpoints print debug lines; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            listed: List[Dict[str, Any]] = []
+            cursor = None
+            while True:
+                params = {"limit": 20, **({"cursor": cursor} if cursor else {})}
+                page = (await client.get(f"/api/conversations/{archived_conversation.id}/messages",
+                                         params=params, headers=headers)).json()
+                listed.extend(page["items"])
+                cursor = page["next_cursor"]
+                if not cursor:
+                    break
+            turn = await client.post(
+                f"/api/{user.id}/chat",
+                json={"conversation_id": str(archived_conversation.id), "message": "list my pending tasks"},
+            )
+
+    async with async_session() as session:
+        restored = await session.get(Conversation, archived_conversation.id)
+        stored = (await session.exec(
+            select(Message).where(Message.conversation_id == archived_conversation.id, Message.tool_calls.is_not(None))
+            .order_by(Message.created_at.desc()).limit(1)
+        )).first()
+    restored_live, restored_cold = await message_counts(archived_conversation.id)
+    await engine.dispose()
+
+    report["restore"] = {"status": turn.status_code, "live_messages": restored_live, "archived_messages": restored_cold,
+                         "stored_tool_calls": stored.tool_calls if stored else None}
+
+    checks.append(("compact tool_calls are smaller than the old form",
+                   sizes["compact_tool_calls_bytes"] < sizes["legacy_tool_calls_bytes"]))
+    checks.append(("idle conversations archived, active ones untouched",
+                   archived == len(idle) and live == len(active) * MESSAGES_PER_CONVERSATION
+                   and cold == len(idle) * MESSAGES_PER_CONVERSATION))
+    checks.append(("hot messages table shrank", after_bytes < before_bytes))
+    # Best median of HISTORY_ROUNDS x HISTORY_SAMPLES queries; allow for timer noise on tiny values
+    checks.append(("history window no slower after archiving", after_ms <= before_ms * 1.5 + 0.05))
+    checks.append(("archived conversation still lists every message",
+                   len(listed) == MESSAGES_PER_CONVERSATION and len({m["id"] for m in listed}) == len(listed)))
+    checks.append(("a chat turn restores an archived conversation",
+                   turn.status_code == 200 and restored.archived_at is None and restored_cold == 0
+                   and restored_live == MESSAGES_PER_CONVERSATION + 2
+                   and restored.history_length == MESSAGES_PER_CONVERSATION + 2))
+    checks.append(("tool calls are stored without the owner's user_id",
+                   bool(stored) and all("user_id" not in call["args"] for call in stored.tool_calls)))
+
+    print(json.dumps(report, indent=2, default=str))
+    failed = False
+    for name, ok in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}")
+        failed |= not ok
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+Refresh-token storage benchmark: full JWT text vs SHA-256 digest.
+
+Inserts N refresh tokens (one commit each, like login/refresh do) into a
+table keyed by the raw JWT (the old schema) and into refresh_tokens keyed by
+token_hash (the current schema), then reports insert latency percentiles and
+the on-disk size of the unique index.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python benchmarks/refresh_tokens.py
+    DATABASE_URL=postgresql://... BENCH_TOKENS=20000 python benchmarks/refresh_tokens.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, delete, text
+from sqlmodel import SQLModel
+
+from app.database import async_session, get_engine
+from app.db.models import RefreshToken, User
+from app.security import create_refresh_token, hash_token
+
+from latency_stats import percentiles
+
+TOKENS = int(os.environ.get("BENCH_TOKENS", "5000"))
+
+legacy_metadata = MetaData()
+legacy_refresh_tokens = Table(
+    "bench_legacy_refresh_tokens",
+    legacy_metadata,
+    Column("token", String, unique=True, index=True, nullable=False),
+    Column("expires_at", DateTime, nullable=False),
+)
+
+
+async def index_size_bytes(index_name: str) -> int:
+    """On-disk size of an index."""
+    engine = get_engine()
+    async with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            result = await conn.execute(
+                text("SELECT pg_relation_size(CAST(:name AS regclass))"), {"name": index_name}
+            )
+        else:
+            result = await conn.execute(
+                text("SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name = :name"),
+                {"name": index_name},
+            )
+        return int(result.scalar())
+
+
+async def bench_legacy(tokens: List[str]) -> List[float]:
+    """Insert raw JWTs into the legacy-shaped table."""
+    samples = []
+    async with async_session() as session:
+        for token in tokens:
+            start = time.perf_counter()
+            await session.execute(
+                legacy_refresh_tokens.insert().values(token=token, expires_at=RefreshToken().expires_at)
+            )
+            await session.commit()
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def bench_digest(user: User, tokens: List[str]) -> List[float]:
+    """Insert digests into refresh_tokens (hashing included in the timing)."""
+    samples = []
+    async with async_session() as session:
+        for token in tokens:
+            start = time.perf_counter()
+            session.add(RefreshToken(user_id=user.id, token_hash=hash_token(token)))
+            await session.commit()
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def main() -> None:
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(legacy_metadata.drop_all)
+        await conn.run_sync(legacy_metadata.create_all)
+
+    async with async_session() as session:
+        user = User(
+            email=f"bench-{time.time_ns()}@example.com",
+            username=f"bench{time.time_ns()}",
+            password_hash="x" * 60,
+            full_name="Bench",
+        )
+        session.add(user)
+        await session.commit()
+
+    tokens = [create_refresh_token(user.id) for _ in range(TOKENS)]
+
+    legacy = await bench_legacy(tokens)
+    digest = await bench_digest(user, tokens)
+
+    report = {
+        "dialect": engine.dialect.name,
+        "tokens": TOKENS,
+        "token_length": len(tokens[0]),
+        "legacy_jwt_text": {
+            "insert": percentiles(legacy),
+            "index_bytes": await index_size_bytes("ix_bench_legacy_refresh_tokens_token"),
+        },
+        "sha256_digest": {
+            "insert": percentiles(digest),
+            "index_bytes": await index_size_bytes("ix_refresh_tokens_token_hash"),
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+    async with engine.begin() as conn:
+        await conn.run_sync(legacy_metadata.drop_all)
+        await conn.execute(delete(RefreshToken).where(RefreshToken.user_id == user.id))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,171 @@
+"""
+Registration benchmark: many users with the same email local part.
+
+Registers BENCH_USERS accounts (default 10000) as bench@1.example.com,
+bench@2.example.com, ... through services.auth.register_user, so every
+registration after the first has to find a free benchN username. Reports
+per-registration latency and SQL statements per registration, and runs the
+previous allocation loop (one SELECT per taken candidate) over a smaller
+prefix for comparison.
+
+Also checks username allocation next to awkward existing usernames: zero-
+padded and mixed-length numeric suffixes, a non-ASCII digit ("²") and a
+non-numeric suffix. Prints [PASS]/[FAIL] per case; exits 1 on any failure.
+
+bcrypt is swapped for a constant hash for the duration of the run: its cost
+is fixed per registration and would otherwise dominate the numbers.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python benchmarks/register_users.py
+    BENCH_USERS=10000 BENCH_LEGACY_USERS=1000 python benchmarks/register_users.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sqlalchemy import delete, event
+from sqlmodel import SQLModel, select
+
+from app.database import async_session, get_engine
+from app.db.models import User
+from app.services import auth as auth_service
+
+from latency_stats import percentiles
+
+USERS = int(os.environ.get("BENCH_USERS", "10000"))
+LEGACY_USERS = int(os.environ.get("BENCH_LEGACY_USERS", "500"))
+
+
+async def legacy_register(session, email: str) -> User:
+    """The previous register_user: email SELECT, then one SELECT per taken username."""
+    result = await session.execute(select(User).where(User.email == email))
+    if result.scalars().first():
+        raise ValueError(f"Email {email} is already registered")
+
+    username = email.split("@")[0]
+    counter = 1
+    base_username = username
+    while True:
+        result = await session.execute(select(User).where(User.username == username))
+        if not result.scalars().first():
+            break
+        username = f"{base_username}{counter}"
+        counter += 1
+
+    user = User(email=email, username=username, password_hash="x" * 60, full_name="Bench")
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
+
+
+async def run(local_part: str, count: int, register) -> Dict:
+    """Register `count` users sharing `local_part`; return latency and query stats."""
+    queries = [0]
+
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        queries[0] += 1
+
+    engine = get_engine()
+    event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+    samples = []
+    tail_queries = 0
+    try:
+        async with async_session() as session:
+            for i in range(count):
+                before = queries[0]
+                start = time.perf_counter()
+                await register(session, f"{local_part}@{i}.example.com")
+                samples.append(time.perf_counter() - start)
+                tail_queries = queries[0] - before
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_query)
+
+    return {
+        "users": count,
+        "total_s": round(sum(samples), 3),
+        **percentiles(samples),
+        "queries_per_registration": round(queries[0] / count, 2),
+        "queries_last_registration": tail_queries,
+    }
+
+
+# Existing usernames (after the prefix) -> expected allocations for two new registrations
+ALLOCATION_CASES = [
+    (["", "007", "8"], ["9", "10"]),
+    (["", "0010", "8", "\u00b2", "x99"], ["11", "12"]),
+    (["", "0", "00"], ["1", "2"]),
+    (["", "abc"], ["1", "2"]),
+]
+
+
+async def allocation_cases(run_id: int) -> List[tuple]:
+    """Register two users next to each case's existing usernames; compare the usernames they get."""
+    checks = []
+    async with async_session() as session:
+        for i, (existing, expected) in enumerate(ALLOCATION_CASES):
+            prefix = f"alloc{run_id}x{i}"
+            session.add_all(
+                User(email=f"{prefix}{suffix}@seed.example.com", username=f"{prefix}{suffix}",
+                     password_hash="x" * 60, full_name="Bench")
+                for suffix in existing
+            )
+            await session.commit()
+            allocated = []
+            for n in range(len(expected)):
+                user = await auth_service.register_user(session, f"{prefix}@{n}.example.com", "password", "Bench")
+                allocated.append(user.username[len(prefix):])
+            checks.append((f"existing {existing!r} -> {allocated!r}", allocated == expected))
+    return checks
+
+
+async def main() -> None:
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    run_id = time.time_ns()
+    current_prefix = f"bench{run_id}"
+    legacy_prefix = f"legacy{run_id}"
+
+    original_hash_password = auth_service.hash_password
+    auth_service.hash_password = lambda password: "x" * 60
+    try:
+        current = await run(
+            current_prefix,
+            USERS,
+            lambda session, email: auth_service.register_user(session, email, "password", "Bench"),
+        )
+        legacy = await run(legacy_prefix, LEGACY_USERS, legacy_register)
+        checks = await allocation_cases(run_id)
+    finally:
+        auth_service.hash_password = original_hash_password
+
+    print(json.dumps(
+        {"dialect": engine.dialect.name, "single_query": current, "legacy_loop": legacy},
+        indent=2,
+    ))
+
+    async with engine.begin() as conn:
+        for prefix in (current_prefix, legacy_prefix, f"alloc{run_id}"):
+            await conn.execute(delete(User).where(User.username.startswith(prefix)))
+    await engine.dispose()
+
+    failed = False
+    for name, ok in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}")
+        failed |= not ok
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,182 @@
+"""
+Chat response cache (app/response_cache.py): hits, invalidation and eviction.
+
+Sends read-only questions through POST /api/{user_id}/chat with the fake
+LLM from fake_llm.py (BENCH_LLM_LATENCY seconds per model call, default
+0.3) and checks that:
+
+    repeat        the same question (any case/punctuation) is answered from
+                  the cache without model calls
+    rest          a task change through services.task (the REST routes'
+                  code path) invalidates the user's answers
+    other worker  a task change committed elsewhere (a bare UPDATE of
+                  users.tasks_version, no in-process call) invalidates them:
+                  every worker reads the version from the database
+    mcp           a task change through an MCP tool invalidates them too
+    history       questions inside an existing conversation bypass the cache
+    ttl / lru     entries expire and the cache stays within max_size
+
+Prints a JSON report and [PASS]/[FAIL] per check; exits 1 on any failure.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python benchmarks/response_cache.py
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+
+import fake_llm  # noqa: E402
+
+LLM_LATENCY = float(os.environ.get("BENCH_LLM_LATENCY", "0.3"))
+fake_llm.install(latency_seconds=LLM_LATENCY)
+
+import httpx  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+from app.database import async_session, get_engine  # noqa: E402
+from app.db.models import Task, TaskStatus, User  # noqa: E402
+from app.main import app  # noqa: E402
+from app.middleware.rate_limit import rate_limiter  # noqa: E402
+from app.response_cache import ResponseCache, response_cache  # noqa: E402
+from app.schemas.chat import ChatResponse  # noqa: E402
+from app.services.task import update_task  # noqa: E402
+
+QUESTION = "show me what is still pending"
+
+
+class Turn:
+    def __init__(self, response: httpx.Response, seconds: float, llm_calls: int):
+        self.status = response.status_code
+        self.body = response.json() if response.status_code == 200 else {}
+        self.cached = 'cache;desc="hit"' in response.headers.get("server-timing", "")
+        self.ms = round(seconds * 1000, 2)
+        self.llm_calls = llm_calls
+
+    def report(self) -> Dict:
+        return {"status": self.status, "cached": self.cached, "ms": self.ms, "llm_calls": self.llm_calls}
+
+
+async def ask(client: httpx.AsyncClient, user_id: str, message: str, conversation_id: Optional[str] = None) -> Turn:
+    calls_before = fake_llm.stats["calls"]
+    start = time.perf_counter()
+    response = await client.post(f"/api/{user_id}/chat", json={"message": message, "conversation_id": conversation_id})
+    return Turn(response, time.perf_counter() - start, fake_llm.stats["calls"] - calls_before)
+
+
+async def main() -> None:
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with async_session() as session:
+        user = User(email=f"cache{time.time_ns()}@bench.example.com", username=f"cache{time.time_ns()}",
+                    password_hash="x" * 60, full_name="Cache Bench")
+        session.add(user)
+        await session.flush()
+        tasks = [Task(user_id=user.id, title=f"Cache task {i}") for i in range(3)]
+        session.add_all(tasks)
+        await session.commit()
+        user_uuid = user.id
+        user_id = str(user.id)
+        task_ids = [task.id for task in tasks]
+
+    fake_llm.FakeGenerativeModel.default_user_id = user_id
+    rate_limiter.requests_per_minute = 10**9
+    checks: List[Tuple[str, bool]] = []
+    report: Dict[str, Dict] = {}
+
+    transport = httpx.ASGITransport(app=app)
+    # The endpoint prints debug lines; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            first = await ask(client, user_id, QUESTION)
+            repeat = await ask(client, user_id, QUESTION)
+            variant = await ask(client, user_id, "  Show me what is STILL pending?! ")
+
+            async with async_session() as session:
+                await update_task(session, task_ids[0], user_uuid, {"status": TaskStatus.COMPLETED})
+            after_rest = await ask(client, user_id, QUESTION)
+
+            # Another worker's task write: only the stored version changes
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text("UPDATE users SET tasks_version = tasks_version + 1 WHERE id = :id"),
+                    {"id": user_uuid.hex if engine.dialect.name == "sqlite" else user_uuid},
+                )
+            after_other_worker = await ask(client, user_id, QUESTION)
+
+            tool_turn = await ask(client, user_id, f"complete task {task_ids[1]}")
+            # Expiry is fixed when an entry is stored: shorten the TTL for the next one
+            response_cache.ttl_seconds = 0.2
+            after_mcp = await ask(client, user_id, QUESTION)
+
+            in_conversation = await ask(client, user_id, QUESTION, first.body.get("conversation_id"))
+
+            await asyncio.sleep(0.3)
+            after_ttl = await ask(client, user_id, QUESTION)
+
+            metrics = (await client.get("/api/health/chat")).json()
+    await engine.dispose()
+
+    turns = {
+        "first": first, "repeat": repeat, "variant": variant, "after_rest_update": after_rest,
+        "after_other_worker_update": after_other_worker,
+        "mcp_complete": tool_turn, "after_mcp_update": after_mcp, "in_conversation": in_conversation,
+        "after_ttl": after_ttl,
+    }
+    report["turns"] = {name: turn.report() for name, turn in turns.items()}
+    checks.append(("all turns succeed", all(turn.status == 200 for turn in turns.values())))
+    checks.append(("first ask runs the model", not first.cached and first.llm_calls > 0))
+    checks.append(("repeat served from cache without model calls",
+                   repeat.cached and variant.cached and repeat.llm_calls == variant.llm_calls == 0))
+    checks.append(("cached answer matches the model's", repeat.body.get("response") == first.body.get("response")))
+    checks.append(("cached turn keeps its own conversation",
+                   repeat.body.get("conversation_id") not in ("", first.body.get("conversation_id"))))
+    checks.append(("REST task update invalidates", not after_rest.cached and after_rest.llm_calls > 0))
+    checks.append(("task update in another worker invalidates",
+                   not after_other_worker.cached and after_other_worker.llm_calls > 0))
+    checks.append(("MCP task update invalidates", not after_mcp.cached and after_mcp.llm_calls > 0))
+    checks.append(("answer reflects the new task state",
+                   after_mcp.body.get("tool_calls", [{}])[0].get("result", "").count("Cache task") == 1))
+    checks.append(("turns with history bypass the cache", not in_conversation.cached))
+    checks.append(("entries expire after the TTL", not after_ttl.cached))
+
+    # LRU bound, on a standalone cache
+    lru = ResponseCache(max_size=3, ttl_seconds=60)
+    owner = uuid.uuid4()
+    for i in range(5):
+        lru.put(lru.key_for(owner, 0, f"question {i}"), ChatResponse(conversation_id="c", response=f"answer {i}"))
+    oldest_evicted = lru.get(lru.key_for(owner, 0, "question 0")) is None
+    newest_kept = lru.get(lru.key_for(owner, 0, "question 4")) is not None
+    report["lru"] = lru.snapshot()
+    checks.append(("LRU keeps at most max_size entries", report["lru"]["size"] == 3 and oldest_evicted and newest_kept))
+
+    # Warm model turn (the first one also pays for imports) vs cache hits
+    report["saved_ms_per_hit"] = round(after_rest.ms - (repeat.ms + variant.ms) / 2, 1)
+    report["metrics"] = metrics
+
+    print(json.dumps(report, indent=2))
+    failed = False
+    for name, ok in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}")
+        failed |= not ok
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
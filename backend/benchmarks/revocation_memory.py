@@ -0,0 +1,134 @@
+"""
+Memory and lookup cost of the in-memory revocation list.
+
+Fills a RevocationList with N random token digests and reports resident
+memory per million revoked tokens (Bloom filter + exact set + expiry
+buckets), plus lookup latency for revoked and non-revoked tokens.
+
+Then prunes and compacts the list at a time when 3/4 of the tokens have
+expired and checks that their digests are gone, the rest are still revoked
+and the Bloom filter was rebuilt at a smaller size, while lookups kept being
+answered during the rebuild. Prints [PASS]/[FAIL] per check;
+exits 1 on any failure.
+
+Usage:
+    python benchmarks/revocation_memory.py
+    BENCH_REVOKED=1000000 python benchmarks/revocation_memory.py
+"""
+
+import asyncio
+import json
+import os
+import secrets
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from app.revocation import RevocationList
+
+REVOKED = int(os.environ.get("BENCH_REVOKED", "1000000"))
+LOOKUPS = int(os.environ.get("BENCH_LOOKUPS", "200000"))
+
+
+def lookup_ns(revocations: RevocationList, digests: list) -> float:
+    """Average is_revoked() time in nanoseconds."""
+    start = time.perf_counter_ns()
+    for digest in digests:
+        revocations.is_revoked(digest)
+    return (time.perf_counter_ns() - start) / len(digests)
+
+
+async def compact_while_looking_up(revocations: RevocationList, digests: list) -> tuple:
+    """compact() while lookups run on the event loop; returns (rebuilt, lookups done meanwhile)."""
+    lookups = 0
+    task = asyncio.create_task(revocations.compact())
+    while not task.done():
+        for digest in digests:
+            revocations.is_revoked(digest)
+        lookups += len(digests)
+        await asyncio.sleep(0)
+    return task.result(), lookups
+
+
+def main() -> None:
+    digests = [secrets.token_hex(32) for _ in range(REVOKED)]
+    # Access tokens revoked over the last 15 minutes of a 30 minute lifetime
+    now = time.time()
+    expiries = [now + 900 + 900 * i / REVOKED for i in range(REVOKED)]
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    # Start small so the measurement includes the filter growth path
+    revocations = RevocationList(capacity=100000)
+    for digest, expires_at in zip(digests, expiries):
+        revocations.add(digest, expires_at)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    misses = [secrets.token_hex(32) for _ in range(LOOKUPS)]
+    hits = digests[:LOOKUPS]
+    false_positives = sum(
+        1 for digest in misses
+        if all(
+            revocations._bits[p >> 3] & (1 << (p & 7))
+            for p in revocations._positions(bytes.fromhex(digest))
+        )
+    )
+
+    per_million = used / REVOKED * 1_000_000
+    filter_bytes, capacity = revocations.filter_bytes, revocations.capacity
+    lookup_miss = round(lookup_ns(revocations, misses))
+    lookup_hit = round(lookup_ns(revocations, hits))
+
+    # Later, when the first 3/4 of the tokens have expired
+    later = expiries[REVOKED * 3 // 4]
+    start = time.perf_counter()
+    pruned = revocations.prune(now=later)
+    prune_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    rebuilt, lookups_during_rebuild = asyncio.run(compact_while_looking_up(revocations, misses[:100]))
+    compact_ms = (time.perf_counter() - start) * 1000
+    # prune() drops whole expiry buckets, so tokens from the last minute before `later` may remain
+    expired = [d for d, e in zip(digests, expiries) if e < later - 60]
+    live = [d for d, e in zip(digests, expiries) if e >= later]
+    print(json.dumps({
+        "revoked_tokens": REVOKED,
+        "total_bytes": used,
+        "bytes_per_token": round(used / REVOKED, 1),
+        "mib_per_million_tokens": round(per_million / (1024 * 1024), 1),
+        "bloom_filter_bytes": filter_bytes,
+        "bloom_capacity": capacity,
+        "bloom_false_positive_rate": round(false_positives / LOOKUPS, 5),
+        "lookup_miss_ns": lookup_miss,
+        "lookup_hit_ns": lookup_hit,
+        "prune": {
+            "pruned": pruned,
+            "remaining": len(revocations),
+            "prune_ms": round(prune_ms, 1),
+            "compact_ms": round(compact_ms, 1),
+            "lookups_during_compact": lookups_during_rebuild,
+            "bloom_filter_bytes": revocations.filter_bytes,
+            "bloom_capacity": revocations.capacity,
+        },
+    }, indent=2))
+
+    checks = [
+        ("expired digests dropped", not any(revocations.is_revoked(digest) for digest in expired)),
+        ("digests of live tokens still revoked", all(revocations.is_revoked(digest) for digest in live)),
+        ("Bloom filter rebuilt smaller", rebuilt and revocations.filter_bytes < filter_bytes),
+        ("lookups answered while the filter was rebuilt", lookups_during_rebuild > 0),
+    ]
+    failed = False
+    for name, ok in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}")
+        failed |= not ok
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
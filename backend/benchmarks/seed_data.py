@@ -0,0 +1,207 @@
+"""
+Seeded dataset generator for load tests.
+
+Creates N users x M tasks x K conversations (each with a few messages)
+with deterministic content and timestamps spread over the last 90 days.
+All users share one password (SEED_PASSWORD) so load tests can log in; it
+is hashed once.
+
+Seeding is skipped when the first user of the requested dataset already
+exists, so repeated runs against the same database reuse it.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python benchmarks/seed_data.py
+    BENCH_USERS=200 BENCH_TASKS_PER_USER=50 BENCH_CONVERSATIONS_PER_USER=5 python benchmarks/seed_data.py
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List
+from uuid import UUID
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sqlmodel import SQLModel, select
+
+from app.database import async_session, get_engine
+from app.db.models import Conversation, Message, Task, TaskPriority, TaskStatus, User
+from app.security import hash_password
+
+SEED_PASSWORD = "LoadTest-Passw0rd!"
+# Rows added per commit while seeding
+BATCH_SIZE = 1000
+
+TASK_WORDS = [
+    "review", "write", "call", "email", "plan", "fix", "buy", "book", "prepare",
+    "report", "budget", "meeting", "groceries", "dentist", "invoice", "slides",
+]
+
+
+@dataclass
+class SeededUser:
+    """A seeded account and the IDs a load test needs to act on it."""
+
+    id: UUID
+    email: str
+    task_ids: List[UUID] = field(default_factory=list)
+    conversation_ids: List[UUID] = field(default_factory=list)
+
+
+def seeded_email(index: int, prefix: str = "loadtest") -> str:
+    """Email of the index-th seeded user."""
+    return f"{prefix}-{index}@example.com"
+
+
+async def seed(
+    users: int,
+    tasks_per_user: int,
+    conversations_per_user: int,
+    messages_per_conversation: int = 6,
+    rng_seed: int = 1,
+    prefix: str = "loadtest",
+) -> List[SeededUser]:
+    """Create (or reuse) the dataset and return the seeded users.
+
+    Args:
+        users: Number of users
+        tasks_per_user: Tasks per user
+        conversations_per_user: Conversations per user
+        messages_per_conversation: Messages per conversation (alternating roles)
+        rng_seed: Seed for titles, priorities, statuses and timestamps
+        prefix: Email/username prefix identifying the dataset
+
+    Returns:
+        Seeded users with their task and conversation IDs
+    """
+    async with get_engine().begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async with async_session() as session:
+        result = await session.execute(select(User.id).where(User.email == seeded_email(0, prefix)))
+        if result.first() is None:
+            await _create(
+                session, users, tasks_per_user, conversations_per_user,
+                messages_per_conversation, rng_seed, prefix,
+            )
+        return await _load(session, users, prefix)
+
+
+async def _create(
+    session,
+    users: int,
+    tasks_per_user: int,
+    conversations_per_user: int,
+    messages_per_conversation: int,
+    rng_seed: int,
+    prefix: str,
+) -> None:
+    rng = random.Random(rng_seed)
+    password_hash = hash_password(SEED_PASSWORD)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    pending: List[SQLModel] = []
+
+    async def flush(force: bool = False) -> None:
+        if pending and (force or len(pending) >= BATCH_SIZE):
+            session.add_all(pending)
+            await session.commit()
+            pending.clear()
+
+    for i in range(users):
+        created = now - timedelta(days=90, seconds=-i)
+        user = User(
+            email=seeded_email(i, prefix),
+            username=f"{prefix}{i}",
+            password_hash=password_hash,
+            full_name=f"Load Test {i}",
+            created_at=created,
+            updated_at=created,
+        )
+        user_id = user.id
+        # Commit each user before its rows so foreign keys resolve on Postgres
+        pending.append(user)
+        await flush(force=True)
+
+        for _ in range(tasks_per_user):
+            created = now - timedelta(seconds=rng.randint(0, 90 * 86400))
+            completed = rng.random() < 0.4
+            pending.append(Task(
+                user_id=user_id,
+                title=" ".join(rng.choices(TASK_WORDS, k=3)).capitalize(),
+                description=rng.choice([None, "Seeded by benchmarks/seed_data.py"]),
+                status=TaskStatus.COMPLETED if completed else TaskStatus.PENDING,
+                priority=rng.choice(list(TaskPriority)),
+                due_date=created + timedelta(days=rng.randint(1, 30)) if rng.random() < 0.5 else None,
+                completed_at=created + timedelta(hours=1) if completed else None,
+                created_at=created,
+                updated_at=created,
+            ))
+            await flush()
+
+        for _ in range(conversations_per_user):
+            started = now - timedelta(seconds=rng.randint(3600, 30 * 86400))
+            conversation = Conversation(
+                user_id=user_id, title="Seeded conversation", created_at=started, updated_at=started
+            )
+            pending.append(conversation)
+            for m in range(messages_per_conversation):
+                at = started + timedelta(seconds=30 * m)
+                pending.append(Message(
+                    conversation_id=conversation.id,
+                    user_id=user_id,
+                    role="user" if m % 2 == 0 else "assistant",
+                    content=f"Seeded message {m}: " + " ".join(rng.choices(TASK_WORDS, k=8)),
+                    created_at=at,
+                    updated_at=at,
+                ))
+            await flush()
+
+    await flush(force=True)
+
+
+async def _load(session, users: int, prefix: str) -> List[SeededUser]:
+    emails = [seeded_email(i, prefix) for i in range(users)]
+    result = await session.execute(select(User.id, User.email).where(User.email.in_(emails)))
+    by_id: Dict[UUID, SeededUser] = {
+        user_id: SeededUser(id=user_id, email=email) for user_id, email in result.all()
+    }
+
+    result = await session.execute(select(Task.user_id, Task.id).where(Task.user_id.in_(by_id)))
+    for user_id, task_id in result.all():
+        by_id[user_id].task_ids.append(task_id)
+
+    result = await session.execute(
+        select(Conversation.user_id, Conversation.id).where(Conversation.user_id.in_(by_id))
+    )
+    for user_id, conversation_id in result.all():
+        by_id[user_id].conversation_ids.append(conversation_id)
+
+    order = {email: i for i, email in enumerate(emails)}
+    return sorted(by_id.values(), key=lambda user: order[user.email])
+
+
+async def main() -> None:
+    users = int(os.environ.get("BENCH_USERS", "50"))
+    tasks_per_user = int(os.environ.get("BENCH_TASKS_PER_USER", "20"))
+    conversations_per_user = int(os.environ.get("BENCH_CONVERSATIONS_PER_USER", "3"))
+
+    start = time.perf_counter()
+    seeded = await seed(users, tasks_per_user, conversations_per_user)
+    print(json.dumps({
+        "users": len(seeded),
+        "tasks": sum(len(user.task_ids) for user in seeded),
+        "conversations": sum(len(user.conversation_ids) for user in seeded),
+        "seconds": round(time.perf_counter() - start, 2),
+    }, indent=2))
+    await get_engine().dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,221 @@
+"""
+Open-loop load test of GET /api/auth/verify.
+
+Fires requests at a fixed arrival rate (default 1000 RPS), independent of
+how fast responses come back, so queueing shows up in the latency numbers.
+Latency is measured from each request's scheduled start. Traffic is a mix of
+anonymous visitors (no cookie) and logged-in users spread over many client
+IPs, like page loads from real visitors.
+
+By default requests are delivered straight to the ASGI app in this process
+(no HTTP client overhead) and SQL statements are counted per request. Set
+BENCH_BASE_URL to drive a running server instead (e.g. uvicorn --workers 4);
+query counts are then not available.
+
+Usage:
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python benchmarks/verify_load.py
+    BENCH_RPS=1000 BENCH_SECONDS=10 BENCH_ANONYMOUS_RATIO=0.5 python benchmarks/verify_load.py
+    BENCH_BASE_URL=http://localhost:8000 python benchmarks/verify_load.py
+
+Exits 1 if any request fails or an anonymous request touches the database.
+A shortfall against the target rate is reported as a warning: it measures
+the machine and the middleware stack, not the endpoint.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import httpx
+from sqlalchemy import event
+from sqlmodel import SQLModel
+
+from app.database import async_session, get_engine
+from app.db.models import User
+from app.main import app
+from app.security import create_access_token
+from app.user_cache import user_cache
+
+from latency_stats import percentiles
+
+RPS = int(os.environ.get("BENCH_RPS", "1000"))
+SECONDS = float(os.environ.get("BENCH_SECONDS", "5"))
+ANONYMOUS_RATIO = float(os.environ.get("BENCH_ANONYMOUS_RATIO", "0.5"))
+USERS = int(os.environ.get("BENCH_USERS", "200"))
+BASE_URL = os.environ.get("BENCH_BASE_URL", "")
+# Distinct simulated visitors; keeps each under the per-IP rate limit
+CLIENT_IPS = 1000
+# Achieved rate below this fraction of the target is reported
+RATE_TOLERANCE = 0.05
+
+# Which kind of request is running in the current task (for query attribution)
+current_kind: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_kind", default=None)
+
+
+async def seed_users() -> List[str]:
+    """Create USERS active users and return an access token for each."""
+    async with get_engine().begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    run_id = time.time_ns()
+    users = [
+        User(
+            email=f"verify-bench-{run_id}-{i}@example.com",
+            username=f"vb{run_id}{i}",
+            password_hash="x" * 60,
+            full_name="Bench",
+        )
+        for i in range(USERS)
+    ]
+    async with async_session() as session:
+        session.add_all(users)
+        await session.commit()
+        return [create_access_token({"sub": str(user.id)}) for user in users]
+
+
+async def asgi_get(path: str, client_ip: str, cookie: Optional[str]) -> Tuple[int, bytes]:
+    """Deliver one GET request straight to the ASGI app."""
+    headers = [(b"host", b"test")]
+    if cookie:
+        headers.append((b"cookie", f"access_token={cookie}".encode("latin-1")))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "https",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "client": (client_ip, 50000),
+        "server": ("test", 443),
+    }
+    request_sent = False
+    finished = asyncio.Event()
+    status_code = 0
+    chunks: List[bytes] = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        finished.set()
+    return status_code, b"".join(chunks)
+
+
+async def main() -> None:
+    tokens = await seed_users()
+    user_cache.clear()
+
+    query_counts = {"anonymous": 0, "authenticated": 0}
+
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        kind = current_kind.get()
+        if kind:
+            query_counts[kind] += 1
+
+    engine = get_engine()
+    event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+
+    latencies: Dict[str, List[float]] = {"anonymous": [], "authenticated": []}
+    errors: List[str] = []
+    total = int(RPS * SECONDS)
+    interval = 1.0 / RPS
+    anonymous_every = round(1 / ANONYMOUS_RATIO) if ANONYMOUS_RATIO > 0 else 0
+
+    client = httpx.AsyncClient(base_url=BASE_URL, limits=httpx.Limits(max_connections=200)) if BASE_URL else None
+
+    async def fire(i: int, scheduled: float) -> None:
+        anonymous = bool(anonymous_every) and i % anonymous_every == 0
+        kind = "anonymous" if anonymous else "authenticated"
+        cookie = None if anonymous else tokens[i % len(tokens)]
+        client_ip = f"10.0.{(i % CLIENT_IPS) // 256}.{i % 256}"
+        current_kind.set(kind)
+
+        if client is not None:
+            response = await client.get(
+                "/api/auth/verify",
+                headers={"Cookie": f"access_token={cookie}"} if cookie else None,
+            )
+            status_code, body = response.status_code, response.content
+        else:
+            status_code, body = await asgi_get("/api/auth/verify", client_ip, cookie)
+
+        latencies[kind].append(time.perf_counter() - scheduled)
+        authenticated = status_code == 200 and json.loads(body).get("authenticated")
+        if status_code != 200 or authenticated is anonymous:
+            errors.append(f"{kind}: {status_code} {body[:80]!r}")
+
+    start = time.perf_counter()
+    tasks = []
+    for i in range(total):
+        scheduled = start + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(fire(i, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    event.remove(engine.sync_engine, "before_cursor_execute", count_query)
+    if client is not None:
+        await client.aclose()
+
+    achieved_rps = total / elapsed
+    report = {
+        "target": BASE_URL or "in-process",
+        "dialect": engine.dialect.name,
+        "target_rps": RPS,
+        "achieved_rps": round(achieved_rps, 1),
+        "requests": total,
+        "errors": len(errors),
+        "all": percentiles(latencies["anonymous"] + latencies["authenticated"]),
+    }
+    for kind, samples in latencies.items():
+        report[kind] = {"requests": len(samples), **percentiles(samples)}
+        if not BASE_URL and samples:
+            report[kind]["queries_per_request"] = round(query_counts[kind] / len(samples), 4)
+    print(json.dumps(report, indent=2))
+
+    failed = False
+    if errors:
+        print(f"[FAIL] {len(errors)} failed requests, first: {errors[0]}")
+        failed = True
+    if report["anonymous"].get("queries_per_request"):
+        print("[FAIL] anonymous requests touched the database")
+        failed = True
+    if achieved_rps < RPS * (1 - RATE_TOLERANCE):
+        print(f"[WARN] achieved {achieved_rps:.0f} RPS, target {RPS}")
+    if not failed:
+        print("[PASS] /api/auth/verify load test")
+
+    await engine.dispose()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
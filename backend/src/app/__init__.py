@@ -1,5 +1,12 @@
 """Hackathon Todo API application package."""
 
-from .main import app, create_app
-
 __all__ = ["app", "create_app"]
+
+
+def __getattr__(name: str):
+    """Import the FastAPI app on first access so `import app.<module>` stays cheap."""
+    if name in __all__:
+        from . import main
+
+        return getattr(main, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
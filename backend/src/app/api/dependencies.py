@@ -5,7 +5,7 @@ from typing import Optional
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ..dependencies import get_current_user as get_current_user_dependency
-from ..dependencies import _extract_token
+from ..dependencies import _extract_token, get_current_user_cached
 from ..database import get_session
 from ..db.models import User
 
@@ -0,0 +1,95 @@
+"""Admin-only operational API routes."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from ...config import settings
+from ...loop_monitor import loop_monitor
+from ...profiling import is_admin_email, profile_worker
+from ...schemas.user import UserRead
+from ..dependencies import get_current_user_cached
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+async def require_admin(current_user: UserRead = Depends(get_current_user_cached)) -> UserRead:
+    """Allow only users listed in ADMIN_EMAILS.
+
+    The user comes from the user cache rather than a request-scoped session,
+    so a long profile does not keep a database connection checked out.
+
+    Args:
+        current_user: Currently authenticated user
+
+    Returns:
+        The admin user
+
+    Raises:
+        HTTPException: 403 if not an admin
+    """
+    if not is_admin_email(current_user.email):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
+
+async def require_profiling_admin(current_user: UserRead = Depends(get_current_user_cached)) -> UserRead:
+    """Allow only admins, and only while PROFILING_ENABLED is set.
+
+    Args:
+        current_user: Currently authenticated user
+
+    Returns:
+        The admin user
+
+    Raises:
+        HTTPException: 404 if profiling is disabled, 403 if not an admin
+    """
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return await require_admin(current_user)
+
+
+@router.get("/loop")
+def loop_stalls(admin: UserRead = Depends(require_admin)) -> dict:
+    """Event-loop lag metrics of this worker, with the last stall's stack.
+
+    The stack is captured only while DEBUG is set (see loop_monitor).
+
+    Args:
+        admin: Admin user
+
+    Returns:
+        The /api/health/loop metrics plus last_stall_stack
+    """
+    return loop_monitor.snapshot(include_stack=True)
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10, gt=0, le=120, description="Profiling duration"),
+    interval_ms: float = Query(None, gt=0, le=1000, description="Sampling interval"),
+    admin: UserRead = Depends(require_profiling_admin),
+) -> PlainTextResponse:
+    """Sample every thread of the worker serving this request.
+
+    Only the worker that receives the request is profiled; with several
+    workers, repeat the call to reach the others.
+
+    Args:
+        seconds: Profiling duration
+        interval_ms: Sampling interval (default PROFILING_SAMPLE_INTERVAL_MS)
+        admin: Admin user
+
+    Returns:
+        Collapsed stacks (flamegraph.pl / speedscope format)
+
+    Raises:
+        HTTPException: 409 if a profile is already running on this worker
+    """
+    interval_seconds = (interval_ms or settings.PROFILING_SAMPLE_INTERVAL_MS) / 1000
+    try:
+        collapsed = await profile_worker(seconds, interval_seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+
+    return PlainTextResponse(collapsed, headers={"Cache-Control": "no-store"})
@@ -9,12 +9,16 @@ from ...services.auth import (
     authenticate_user,
     create_tokens,
     register_user,
-    validate_email_unique,
+    revoke_tokens,
+    rotate_refresh_token,
 )
 from ..dependencies import get_current_user
+from ...dependencies import _extract_token
 from ...db.models import User
 from ...config import settings
+from ...login_throttle import login_throttle
 from ...middleware.auth import verify_token_from_cookie
+from ...user_cache import get_active_user
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -84,14 +88,7 @@ async def register(
     """
     print(f"[DEBUG] Register endpoint hit for email: {request.email}")
     try:
-        # Validate email is unique
-        if not await validate_email_unique(session, request.email):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered",
-            )
-
-        # Create user
+        # Create user (duplicate emails are rejected by the unique index)
         user = await register_user(
             session,
             email=request.email,
@@ -132,6 +129,7 @@ async def register(
 @router.post("/login", response_model=TokenResponse)
 async def login(
     request: LoginRequest,
+    http_request: Request,
     response: Response,
     session: AsyncSession = Depends(get_session),
 ) -> TokenResponse:
@@ -139,6 +137,7 @@ async def login(
 
     Args:
         request: Login request with email and password
+        http_request: FastAPI Request (client IP for throttling)
         response: FastAPI Response to set cookies
         session: Database session
 
@@ -146,17 +145,29 @@ async def login(
         TokenResponse with access_token, refresh_token, and user info
 
     Raises:
-        HTTPException: 401 if credentials are invalid
+        HTTPException: 401 if credentials are invalid, 429 while throttled
     """
+    # Reject throttled attempts before any database or bcrypt work
+    client_ip = http_request.client.host if http_request.client else "unknown"
+    retry_after = await login_throttle.retry_after(request.email, client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts. Please try again later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
     try:
         # Authenticate user
         user = await authenticate_user(session, request.email, request.password)
         if not user:
+            await login_throttle.record_failure(request.email, client_ip)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        await login_throttle.record_success(request.email)
 
         # Create tokens
         access_token, refresh_token = await create_tokens(session, user.id)
@@ -219,7 +230,7 @@ async def refresh_token(
         )
 
     try:
-        from ...security import verify_token, create_access_token
+        from ...security import verify_token
 
         payload = verify_token(refresh_token_value)
         if payload.get("type") != "refresh":
@@ -245,9 +256,15 @@ async def refresh_token(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        # Create new tokens
-        new_access_token = create_access_token({"sub": str(user.id)})
-        new_refresh_token = (await create_tokens(session, user.id))[1]
+        # Rotate: the presented refresh token stops working in the same statement
+        tokens = await rotate_refresh_token(session, user.id, refresh_token_value)
+        if not tokens:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token has been revoked or already used",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        new_access_token, new_refresh_token = tokens
 
         # Set new cookies
         set_auth_cookies(response, new_access_token, new_refresh_token)
@@ -267,37 +284,49 @@ async def refresh_token(
 
 @router.post("/logout", status_code=status.HTTP_200_OK)
 async def logout(
+    request: Request,
     response: Response,
     current_user: User = Depends(get_current_user),
+    token: str = Depends(_extract_token),
+    session: AsyncSession = Depends(get_session),
 ) -> dict:
-    """Logout user by clearing authentication cookies (Task 02-020).
+    """Logout user by revoking the session's tokens and clearing cookies (Task 02-020).
 
     Args:
+        request: FastAPI Request (contains the refresh token cookie)
         response: FastAPI Response to clear cookies
         current_user: Currently authenticated user (validates auth)
+        token: Access token used for this request
+        session: Database session
 
     Returns:
         Success message
     """
+    # Revoke tokens so a copied access token stops working before it expires
+    await revoke_tokens(
+        session,
+        current_user.id,
+        access_token=token,
+        refresh_token=request.cookies.get("refresh_token"),
+    )
+
     # Clear authentication cookies
     clear_auth_cookies(response)
     return {"message": "Successfully logged out"}
 
 
 @router.get("/verify")
-async def verify_session(
-    request: Request,
-    session: AsyncSession = Depends(get_session),
-) -> dict:
+async def verify_session(request: Request) -> dict:
     """Verify current session from HTTP-only cookie (Task 02-050).
 
-    This endpoint is called on app load to verify the user's session
-    is still valid. It extracts the access token from cookies and
-    verifies it with the database.
+    This endpoint is called on every frontend page load, so it avoids the
+    database where it can:
+    - No access_token cookie: answered immediately, no session is opened.
+    - Valid token: the user comes from the per-worker user cache; a session
+      is opened only on a cache miss.
 
     Args:
         request: FastAPI Request (contains cookies)
-        session: Database session
 
     Returns:
         Dict with:
@@ -306,33 +335,40 @@ async def verify_session(
 
     Security:
         - Token extracted from HTTP-only cookie (not accessible by JS)
-        - Token verified server-side
-        - Database lookup confirms user still exists and is active
+        - Token signature, expiry and revocation verified server-side
+        - User existence/active status confirmed against the database at
+          most USER_CACHE_TTL_SECONDS ago
     """
+    anonymous = {"authenticated": False, "user": None}
+
+    # Anonymous visitors: nothing to verify
+    if not request.cookies.get("access_token"):
+        return anonymous
+
     # Verify token from cookie
     payload = await verify_token_from_cookie(request)
     if not payload:
-        return {"authenticated": False, "user": None}
+        return anonymous
 
-    # Get user from database
     try:
         user_id = payload.get("sub")
         if not user_id:
-            return {"authenticated": False, "user": None}
+            return anonymous
 
         from uuid import UUID
         user_uuid = UUID(user_id)
-        user = await session.get(User, user_uuid)
-        if not user or not user.is_active:
-            return {"authenticated": False, "user": None}
+
+        user_read = await get_active_user(user_uuid)
+        if user_read is None:
+            return anonymous
 
         return {
             "authenticated": True,
-            "user": UserRead.model_validate(user),
+            "user": user_read,
         }
     except Exception as e:
         print(f"[ERROR] Session verification failed: {str(e)}")
-        return {"authenticated": False, "user": None}
+        return anonymous
 
 
 @router.get("/me", response_model=UserRead)
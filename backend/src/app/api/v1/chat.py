@@ -1,263 +1,275 @@
-import json
+import asyncio
 import logging
+import math
+import sys
 import traceback
-from typing import Any, Dict, List, Optional
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
-from sqlmodel import select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 
-from app.database import get_session, AsyncSession
-from app.db.models import Conversation, Message, User
-from app.mcp.tools import mcp
+from app.chat_jobs import IdempotencyConflictError, chat_job_queue, ensure_same_request
 from app.config import settings
-
-import google.generativeai as genai
-from google.generativeai.types import content_types
-from collections.abc import Iterable
+from app.conversation_locks import ConversationBusyError
+from app.database import get_session, AsyncSession
+from app.db.models import ChatJob, ChatJobStatus
+from app.dependencies import get_current_user_cached
+from app.llm_guard import LLMUnavailableError
+from app.schemas.chat import ChatJobRead, ChatRequest, ChatResponse
+from app.schemas.user import UserRead
+from app.services.chat import ChatTurnTimings, run_chat_turn
+from app.user_cache import get_active_user
 
 router = APIRouter()
 logger = logging.getLogger("app")
 
-class ChatRequest(BaseModel):
-    conversation_id: Optional[str] = None
-    message: str
 
-class ChatResponse(BaseModel):
-    conversation_id: str
-    response: str
-    tool_calls: List[Dict[str, Any]] = []
+def _parse_user_id(user_id: str) -> UUID:
+    try:
+        return UUID(user_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid user_id format")
+
+
+def _authorize(user_id: str, current_user: UserRead) -> UUID:
+    """Parse the path user_id and require it to be the caller's own."""
+    user_uuid = _parse_user_id(user_id)
+    if user_uuid != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Chat jobs of another user")
+    return user_uuid
+
 
-def clean_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+def _job_read(job: ChatJob) -> ChatJobRead:
+    return ChatJobRead(
+        job_id=job.id,
+        status=job.status,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        result=ChatResponse(**job.result) if job.result else None,
+        error=job.error,
+    )
+
+
+async def _replay(job: ChatJob, request: ChatRequest, http_response: Response) -> ChatResponse:
+    """Answer a retried request with the result of the turn its first attempt started.
+
+    Args:
+        job: Job recorded by the first attempt
+        request: The retried request
+        http_response: Response whose headers mark the replay
+
+    Returns:
+        The original turn's response
+
+    Raises:
+        IdempotencyConflictError: If the key belongs to another request, or the
+            original turn failed or is still running after IDEMPOTENCY_WAIT_SECONDS
     """
-    Clean JSON schema recursively for Gemini compatibility using an Allow-List.
-    Only keeps fields that are strictly supported by Gemini Function Declarations.
+    ensure_same_request(job, request.message, request.conversation_id)
+    job = await chat_job_queue.wait(
+        job.id, job.user_id, settings.IDEMPOTENCY_WAIT_SECONDS, settings.CHAT_JOB_POLL_SECONDS
+    )
+    if job is not None and job.status == ChatJobStatus.SUCCEEDED:
+        http_response.headers["Idempotent-Replayed"] = "true"
+        return ChatResponse(**job.result)
+    if job is None or job.status == ChatJobStatus.FAILED:
+        # A failed turn gives its key up, so sending the request again runs it
+        raise IdempotencyConflictError(f"The original request failed: {job.error if job else 'unknown job'}")
+    raise IdempotencyConflictError(
+        "The original request is still running", retry_after=math.ceil(settings.CHAT_JOB_POLL_SECONDS)
+    )
+
+
+async def _fail_job(job: ChatJob, error: Optional[BaseException]) -> None:
+    """Mark an idempotent turn that did not finish as failed, freeing its key.
+
+    Shielded so that it completes while the request is being cancelled.
+    Errors are logged rather than raised, to keep the turn's own exception.
     """
-    if not isinstance(schema, dict):
-        return schema
-        
-    cleaned = {}
-    
-    # Allowed fields for Gemini Schema
-    allowed_fields = {
-        'type', 'format', 'description', 'nullable', 
-        'enum', 'properties', 'required', 'items'
-    }
-    
-    for key, value in schema.items():
-        if key in allowed_fields:
-            # Special handling for 'type'
-            if key == 'type':
-                if isinstance(value, str):
-                    cleaned[key] = value.upper()
-                else:
-                    cleaned[key] = value
-            # Recursion for nested schemas
-            elif key == 'properties' and isinstance(value, dict):
-                cleaned[key] = {k: clean_schema(v) for k, v in value.items()}
-            elif key == 'items' and isinstance(value, dict):
-                cleaned[key] = clean_schema(value)
-            else:
-                cleaned[key] = value
-                
-    return cleaned
+    reason = f"{type(error).__name__}: {error}" if error else "Chat turn did not finish"
+    try:
+        await asyncio.shield(chat_job_queue.fail(job.id, reason))
+    except Exception as e:
+        logger.warning(f"Recording failed chat turn {job.id} failed: {e}")
+
 
 @router.post("/{user_id}/chat", response_model=ChatResponse)
 async def chat_endpoint(
     user_id: str,
     request: ChatRequest,
-    session: AsyncSession = Depends(get_session)
+    http_response: Response,
+    session: AsyncSession = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
 ):
+    """Run a chat turn and return the reply.
+
+    With an Idempotency-Key header, a retry of the request (same key, message
+    and conversation), on any node, waits for the turn the first attempt
+    started and returns its reply (marked Idempotent-Replayed) instead of
+    running the turn again. Concurrent turns in one conversation run one at
+    a time.
+
+    Args:
+        user_id: ID of the user sending the message
+        request: Message and optional conversation ID
+        idempotency_key: Idempotency-Key header
+
+    Returns:
+        The assistant reply and executed tool calls
+
+    Raises:
+        HTTPException: 409 if the conversation stays busy or the original
+            request (same key) failed or is still running, 422 if the key
+            was used for a different request, 503 if the model is unavailable
+    """
+    job: Optional[ChatJob] = None
     try:
         # 1. Validate User
-        try:
-            user_uuid = UUID(user_id)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid user_id format")
+        user_uuid = _parse_user_id(user_id)
 
-        user = await session.get(User, user_uuid)
-        if not user:
-            raise HTTPException(status_code=404, detail=f"User {user_id} not found")
+        if idempotency_key:
+            if await get_active_user(user_uuid) is None:
+                raise LookupError(f"User {user_id} not found")
+            job, created = await chat_job_queue.start(
+                user_uuid, request.message, request.conversation_id, idempotency_key
+            )
+            if not created:
+                return await _replay(job, request, http_response)
 
-        # 2. Get/Create Conversation
-        conversation = None
-        if request.conversation_id:
-            try:
-                conv_id = UUID(request.conversation_id)
-                conversation = await session.get(Conversation, conv_id)
-                if conversation and conversation.user_id != user_uuid:
-                    conversation = None
-            except ValueError: pass
-        
-        if not conversation:
-            conversation = Conversation(user_id=user_uuid, title=request.message[:50])
-            session.add(conversation)
-            await session.commit()
-            await session.refresh(conversation)
-
-        # 3. Fetch History explicitly
-        statement = select(Message).where(Message.conversation_id == conversation.id).order_by(Message.created_at)
-        result = await session.execute(statement)
-        db_messages = result.scalars().all()
-
-        # 4. Prepare History for Gemini
-        gemini_history = []
-        for msg in db_messages:
-            role = "user" if msg.role == "user" else "model"
-            if msg.content: 
-                gemini_history.append({"role": role, "parts": [msg.content]})
-
-        # Append current user message (will be added to history by chat session)
-        current_msg_content = request.message
-
-        # 5. Save User Message
-        session.add(Message(conversation_id=conversation.id, user_id=user_uuid, role="user", content=current_msg_content))
-        await session.commit()
-
-        # 6. Configure Gemini
-        if not settings.gemini_api_key:
-            raise ValueError("GEMINI_API_KEY is not set in environment variables.")
-        
-        genai.configure(api_key=settings.gemini_api_key)
-        
-        # --- AUTO DETECT MODEL ---
-        # List available models and pick the best one
-        available_models = []
+        timings = ChatTurnTimings()
+        response: Optional[ChatResponse] = None
         try:
-            for m in genai.list_models():
-                if 'generateContent' in m.supported_generation_methods:
-                    available_models.append(m.name)
-        except Exception as e:
-            logger.error(f"Failed to list models: {e}")
-            # Fallback list if listing fails
-            available_models = ['models/gemini-1.5-flash', 'models/gemini-pro']
-
-        # Priority order
-        priorities = [
-            'models/gemini-1.5-flash', 
-            'models/gemini-1.5-pro',
-            'models/gemini-1.5-flash-001',
-            'models/gemini-1.0-pro', 
-            'models/gemini-pro'
-        ]
-        
-        selected_model_name = None
-        for p in priorities:
-            if p in available_models:
-                selected_model_name = p
-                break
-        
-        if not selected_model_name and available_models:
-            selected_model_name = available_models[0]
-            
-        if not selected_model_name:
-            raise ValueError(f"No suitable Gemini models found. Available: {available_models}")
-
-        # Convert MCP tools to Gemini Tool Config
-        mcp_tools_list = await mcp.list_tools()
-        
-        model = genai.GenerativeModel(
-            model_name=selected_model_name,
-            tools=[
-                genai.protos.Tool(function_declarations=[
-                    genai.protos.FunctionDeclaration(
-                        name=t.name,
-                        description=t.description,
-                        parameters=clean_schema(t.inputSchema) 
-                    ) for t in mcp_tools_list
-                ])
-            ]
+            response = await run_chat_turn(session, user_uuid, request.message, request.conversation_id, timings)
+        finally:
+            # Also on cancellation (client gone, shutdown): a job left running
+            # would answer retries of the key with 409 until its lease ran out
+            if job and response is None:
+                await _fail_job(job, sys.exc_info()[1])
+        if job:
+            try:
+                await chat_job_queue.complete(job.id, response.model_dump())
+            except Exception as e:
+                # The turn is stored; retries fail once the job's lease runs out
+                logger.warning(f"Recording chat turn {job.id} failed: {e}")
+
+        http_response.headers["Server-Timing"] = timings.server_timing()
+        logger.info(f"Chat turn: {timings}")
+        return response
+
+    except LLMUnavailableError as e:
+        # Fail fast and tell the client when to come back
+        logger.warning(f"Chat Endpoint Unavailable: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
         )
 
-        chat = model.start_chat(history=gemini_history)
-        
-        # Send message
-        response = await chat.send_message_async(current_msg_content)
-        
-        final_text = ""
-        executed_tool_calls = []
-
-        # Loop max 5 times for multi-turn tool use
-        for _ in range(5):
-            if not response.candidates or not response.candidates[0].content.parts:
-                 break
-                 
-            part = response.candidates[0].content.parts[0]
-            
-            if part.function_call:
-                # Tool Call detected
-                fc = part.function_call
-                tool_name = fc.name
-                tool_args = dict(fc.args)
-                
-                # Execute Tool (MCP)
-                tool_result_str = ""
-                try:
-                    result = await mcp.call_tool(tool_name, arguments=tool_args)
-                    
-                    if hasattr(result, 'content') and isinstance(result.content, list):
-                        for c in result.content:
-                             tool_result_str += getattr(c, 'text', str(c))
-                    elif isinstance(result, str):
-                        tool_result_str = result
-                    else:
-                        tool_result_str = str(result)
-                        
-                except Exception as e:
-                    tool_result_str = f"Error executing tool {tool_name}: {str(e)}"
-                
-                executed_tool_calls.append({
-                    "tool": tool_name,
-                    "args": tool_args,
-                    "result": tool_result_str
-                })
-                
-                # Send result back to Gemini
-                response = await chat.send_message_async(
-                    genai.protos.Content(
-                        parts=[genai.protos.Part(
-                            function_response=genai.protos.FunctionResponse(
-                                name=tool_name,
-                                response={'result': tool_result_str}
-                            )
-                        )]
-                    )
-                )
-            else:
-                # Text response
-                final_text = response.text
-                break
-
-        # 7. Save Assistant Message
-        if final_text or executed_tool_calls:
-            session.add(Message(
-                conversation_id=conversation.id,
-                user_id=user_uuid,
-                role="assistant",
-                content=final_text or "Processed tool calls.",
-                tool_calls=[{"tool": t["tool"], "args": t["args"], "result": t["result"][:200] + "..."} for t in executed_tool_calls] if executed_tool_calls else None
-            ))
-            await session.commit()
-
-        return ChatResponse(
-            conversation_id=str(conversation.id),
-            response=final_text or "Completed actions.",
-            tool_calls=executed_tool_calls
+    except ConversationBusyError as e:
+        logger.warning(f"Chat Endpoint Busy: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    except IdempotencyConflictError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)} if e.retry_after else None,
         )
 
     except Exception as e:
         error_trace = traceback.format_exc()
         logger.error(f"Chat Endpoint Failed: {e}\n{error_trace}")
-        
+
         status_code = 500
-        if "GEMINI_API_KEY" in str(e) or "API_KEY" in str(e):
+        if isinstance(e, HTTPException):
+            status_code = e.status_code
+        elif isinstance(e, LookupError):
+            status_code = 404
+        elif "GEMINI_API_KEY" in str(e) or "API_KEY" in str(e):
             status_code = 503
-        
+
         # Include Exception Type for easier debugging
         error_type = type(e).__name__
-        
+
         raise HTTPException(
-            status_code=status_code, 
+            status_code=status_code,
             detail=f"Backend Error [{error_type}]: {str(e)}"
         )
+
+
+@router.post("/{user_id}/chat/jobs", response_model=ChatJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_chat_job(
+    user_id: str,
+    request: ChatRequest,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    current_user: UserRead = Depends(get_current_user_cached),
+) -> ChatJobRead:
+    """Queue a chat turn and return immediately.
+
+    The turn runs on a chat job worker; poll GET /{user_id}/chat/jobs/{job_id}
+    for the result. Use this instead of POST /{user_id}/chat when long tool
+    loops would outlast the platform's request timeout.
+
+    Args:
+        user_id: ID of the user sending the message
+        request: Message and optional conversation ID
+        idempotency_key: Idempotency-Key header; a retry returns the job
+            queued by the first attempt
+        current_user: Authenticated user; must be user_id
+
+    Returns:
+        The queued job
+
+    Raises:
+        HTTPException: 400 if user_id is invalid, 401 without a valid token,
+            403 if user_id is not the caller, 422 if the key was used for a
+            different request
+    """
+    user_uuid = _authorize(user_id, current_user)
+
+    job = await chat_job_queue.enqueue(user_uuid, request.message, request.conversation_id, idempotency_key)
+    try:
+        ensure_same_request(job, request.message, request.conversation_id)
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return _job_read(job)
+
+
+@router.get("/{user_id}/chat/jobs/{job_id}", response_model=ChatJobRead)
+async def get_chat_job(
+    user_id: str,
+    job_id: UUID,
+    wait: float = Query(0, ge=0, description="Seconds to wait for the job to finish (long poll)"),
+    current_user: UserRead = Depends(get_current_user_cached),
+) -> ChatJobRead:
+    """Return a chat job's status and, once finished, its result.
+
+    With `wait`, the request is held until the job finishes or the wait
+    (capped at CHAT_JOB_MAX_WAIT_SECONDS) runs out. Results stay available
+    after the job finishes, so a client that lost its connection can ask again.
+    The caller is authenticated from the user cache, so no database session
+    is held while waiting.
+
+    Args:
+        user_id: ID of the user who queued the job
+        job_id: Job ID returned when queueing
+        wait: Long-poll duration in seconds
+        current_user: Authenticated user; must be user_id
+
+    Returns:
+        Job status and result
+
+    Raises:
+        HTTPException: 401 without a valid token, 403 if user_id is not the
+            caller, 404 if the caller has no such job
+    """
+    user_uuid = _authorize(user_id, current_user)
+    timeout = min(wait, settings.CHAT_JOB_MAX_WAIT_SECONDS)
+    job: Optional[ChatJob] = await chat_job_queue.wait(job_id, user_uuid, timeout, settings.CHAT_JOB_POLL_SECONDS)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Chat job not found")
+    return _job_read(job)
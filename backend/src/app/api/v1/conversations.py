@@ -0,0 +1,105 @@
+"""Chat history API routes: a user's conversations and their messages."""
+
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ...database import get_session
+from ...db.models import User
+from ...schemas import ConversationListResponse, ConversationRead, MessageListResponse, MessageRead
+from ...services.conversation import list_conversations, list_messages
+from ..dependencies import get_current_user
+
+router = APIRouter(prefix="/conversations", tags=["conversations"])
+
+
+@router.get("", response_model=ConversationListResponse)
+async def get_conversations(
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+) -> ConversationListResponse:
+    """List the current user's conversations, most recently active first.
+
+    Args:
+        current_user: Currently authenticated user
+        session: Database session
+        limit: Maximum items to return
+        cursor: Keyset cursor from the previous page
+
+    Returns:
+        ConversationListResponse with one page of conversations
+
+    Raises:
+        HTTPException: 400 if the cursor is invalid
+    """
+    try:
+        conversations, next_cursor = await list_conversations(session, current_user.id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+
+    return ConversationListResponse(
+        items=[ConversationRead.model_validate(c) for c in conversations],
+        next_cursor=next_cursor,
+        limit=limit,
+    )
+
+
+@router.get("/{conversation_id}/messages", response_model=MessageListResponse)
+async def get_conversation_messages(
+    conversation_id: str,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    limit: int = Query(50, ge=1, le=200, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+) -> MessageListResponse:
+    """Page through a conversation's messages, newest first.
+
+    Args:
+        conversation_id: UUID of the conversation
+        current_user: Currently authenticated user
+        session: Database session
+        limit: Maximum items to return
+        cursor: Keyset cursor from the previous page
+
+    Returns:
+        MessageListResponse with one page of messages
+
+    Raises:
+        HTTPException: 400 if conversation_id or the cursor is invalid,
+            404 if not found or unauthorized
+    """
+    try:
+        conversation_uuid = UUID(conversation_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid conversation ID format",
+        )
+
+    try:
+        page = await list_messages(session, conversation_uuid, current_user.id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+
+    if page is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found",
+        )
+
+    messages, next_cursor = page
+    return MessageListResponse(
+        items=[MessageRead.model_validate(m) for m in messages],
+        next_cursor=next_cursor,
+        limit=limit,
+    )
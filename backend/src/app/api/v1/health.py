@@ -5,6 +5,13 @@ from sqlalchemy import text
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ...database import get_session
+from ...conversation_locks import conversation_locks
+from ...history_cache import history_cache
+from ...llm_context_cache import context_cache
+from ...llm_guard import llm_guard
+from ...loop_monitor import loop_monitor
+from ...response_cache import response_cache
+from ...services.intents import intent_stats
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -35,3 +42,45 @@ async def health_check_db(session: AsyncSession = Depends(get_session)) -> dict:
             "database": "disconnected",
             "error": str(e),
         }
+
+
+@router.get("/loop")
+def health_check_loop() -> dict:
+    """Event-loop lag metrics (enable with LOOP_MONITOR_ENABLED).
+
+    Stacks captured during stalls are only served to admins, at
+    GET /api/admin/loop.
+
+    Returns:
+        Lag samples, last/max/mean lag in ms and number of stalls
+    """
+    return loop_monitor.snapshot()
+
+
+@router.get("/llm")
+def health_check_llm() -> dict:
+    """LLM concurrency limiter, circuit breaker and context cache metrics.
+
+    Returns:
+        Queue depth, in-flight calls, breaker state and call/rejection
+        counters, plus provider-side context cache counters
+    """
+    return {**llm_guard.snapshot(), "context_cache": context_cache.snapshot()}
+
+
+@router.get("/chat")
+def health_check_chat() -> dict:
+    """Chat metrics for turns answered without the model.
+
+    Returns:
+        Fast-path turns, hit rate, mean times and estimated model time saved,
+        plus response cache size, hits and hit rate, history cache
+        size, hits, stale entries and evictions, and conversation lock waits
+        and timeouts
+    """
+    return {
+        **intent_stats.snapshot(),
+        "response_cache": response_cache.snapshot(),
+        "history_cache": history_cache.snapshot(),
+        "conversation_locks": conversation_locks.snapshot(),
+    }
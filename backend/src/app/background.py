@@ -0,0 +1,144 @@
+"""Periodic background jobs started from the application lifespan."""
+
+import asyncio
+import logging
+from typing import List
+
+from .config import settings
+
+logger = logging.getLogger("app")
+
+
+async def prune_refresh_tokens_periodically(interval_seconds: int, batch_size: int) -> None:
+    """Delete expired refresh tokens and revocations every `interval_seconds`.
+
+    Sleeps first so that cold starts do not open a database connection.
+
+    Args:
+        interval_seconds: Delay between pruning runs
+        batch_size: Rows deleted per statement
+    """
+    from .database import async_session
+    from .services.auth import prune_expired_refresh_tokens, prune_expired_revocations
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            async with async_session() as session:
+                deleted = await prune_expired_refresh_tokens(session, batch_size=batch_size)
+                revocations = await prune_expired_revocations(session, batch_size=batch_size)
+            if deleted or revocations:
+                logger.info(
+                    f"Pruned {deleted} expired refresh tokens and {revocations} expired revocations"
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Never let a transient DB error kill the loop
+            logger.warning(f"Refresh token pruning failed: {e}")
+
+
+async def sync_revocation_list_periodically(interval_seconds: int) -> None:
+    """Pull new revoked_tokens rows into this worker's in-memory list.
+
+    The initial load happens inline on the first authenticated request
+    (RevocationList.ensure_fresh), so this loop also sleeps first.
+
+    Args:
+        interval_seconds: Delay between syncs
+    """
+    from .database import async_session
+    from .revocation import revocation_list
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            async with async_session() as session:
+                await revocation_list.sync(session)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Revocation list sync failed: {e}")
+
+
+async def archive_conversations_periodically(interval_seconds: int, inactive_days: int, batch_size: int) -> None:
+    """Move inactive conversations' messages to messages_archive every `interval_seconds`.
+
+    Archives in batches of `batch_size` conversations until none are left.
+
+    Args:
+        interval_seconds: Delay between archiving runs
+        inactive_days: Days without messages before a conversation is archived
+        batch_size: Conversations archived per transaction
+    """
+    from .database import async_session
+    from .services.conversation import archive_inactive_conversations
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            archived = 0
+            async with async_session() as session:
+                while True:
+                    batch = await archive_inactive_conversations(session, inactive_days, batch_size=batch_size)
+                    archived += batch
+                    if batch < batch_size:
+                        break
+            if archived:
+                logger.info(f"Archived the messages of {archived} inactive conversations")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Message archiving failed: {e}")
+
+
+def start_background_tasks() -> List[asyncio.Task]:
+    """Start the enabled background jobs on the running event loop.
+
+    Returns:
+        List of started tasks (pass to stop_background_tasks on shutdown)
+    """
+    tasks: List[asyncio.Task] = []
+
+    if settings.REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(
+            prune_refresh_tokens_periodically(
+                settings.REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS,
+                settings.REFRESH_TOKEN_PRUNE_BATCH_SIZE,
+            ),
+            name="prune-refresh-tokens",
+        ))
+
+    if settings.REVOCATION_SYNC_SECONDS > 0:
+        tasks.append(asyncio.create_task(
+            sync_revocation_list_periodically(settings.REVOCATION_SYNC_SECONDS),
+            name="sync-revocation-list",
+        ))
+
+    if settings.MESSAGE_ARCHIVE_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(
+            archive_conversations_periodically(
+                settings.MESSAGE_ARCHIVE_INTERVAL_SECONDS,
+                settings.MESSAGE_ARCHIVE_AFTER_DAYS,
+                settings.MESSAGE_ARCHIVE_BATCH_SIZE,
+            ),
+            name="archive-conversations",
+        ))
+
+    if settings.CHAT_JOB_WORKERS > 0:
+        from .chat_jobs import start_chat_job_workers
+
+        tasks.extend(start_chat_job_workers(settings.CHAT_JOB_WORKERS))
+
+    return tasks
+
+
+async def stop_background_tasks(tasks: List[asyncio.Task]) -> None:
+    """Cancel background jobs and wait for them to finish.
+
+    Args:
+        tasks: Tasks returned by start_background_tasks
+    """
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
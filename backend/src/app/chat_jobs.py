@@ -0,0 +1,472 @@
+"""Queue and workers for chat turns run outside the HTTP request.
+
+POST /api/{user_id}/chat/jobs enqueues a turn and returns at once; a worker
+runs it with services.chat.run_chat_turn and stores the result, which the
+client polls (or long-polls) at GET /api/{user_id}/chat/jobs/{job_id}.
+
+Workers run inside the API process (CHAT_JOB_WORKERS, started from the
+lifespan) or as a separate process (`python -m app.chat_worker`). With the
+database queue both can share a Postgres table: each claim is a short
+SELECT ... FOR UPDATE SKIP LOCKED transaction, so concurrent workers never
+pick the same row and never wait on each other.
+
+Requests may carry an Idempotency-Key. The first one creates the job (for
+POST /api/{user_id}/chat a job that the request runs itself, see start());
+retries get that job back and wait for its result instead of running the
+turn again.
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+
+from .config import settings
+from .db.models import ChatJob, ChatJobStatus
+
+logger = logging.getLogger("app")
+
+FINISHED_STATUSES = (ChatJobStatus.SUCCEEDED, ChatJobStatus.FAILED)
+
+
+class IdempotencyConflictError(Exception):
+    """A request's Idempotency-Key cannot be answered with the original turn's result.
+
+    Attributes:
+        status_code: 422 if the key was used for a different request, 409 if
+            the original request failed or is still running
+        retry_after: Suggested seconds before retrying (409 only)
+    """
+
+    def __init__(self, message: str, status_code: int = 409, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def ensure_same_request(job: ChatJob, message: str, conversation_id: Optional[str]) -> None:
+    """Check that a retry with a job's idempotency key repeats the job's request.
+
+    Args:
+        job: Job found by idempotency key
+        message: Message of the retry
+        conversation_id: Conversation ID of the retry
+
+    Raises:
+        IdempotencyConflictError: 422 if the key was used for another message
+    """
+    if job.message != message or job.conversation_id != conversation_id:
+        raise IdempotencyConflictError(
+            "Idempotency-Key was already used for a different request", status_code=422
+        )
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class ChatJobQueue(ABC):
+    """Storage of chat jobs plus in-process wake-ups.
+
+    Wake-ups only reach workers and waiters in the same process; others
+    fall back to polling every CHAT_JOB_POLL_SECONDS.
+    """
+
+    def __init__(self, lease_seconds: float = 300, max_attempts: int = 1):
+        """Initialize queue.
+
+        Args:
+            lease_seconds: How long a claimed job stays reserved for its worker
+            max_attempts: Claims before a job whose worker vanished is failed
+                (1 = never re-run: a turn's tool calls are not idempotent)
+        """
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._work_available: Optional[asyncio.Event] = None
+        self._job_finished: Optional[asyncio.Event] = None
+
+    async def enqueue(
+        self,
+        user_id: UUID,
+        message: str,
+        conversation_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> ChatJob:
+        """Add a job.
+
+        Args:
+            user_id: ID of the user sending the message
+            message: User message
+            conversation_id: Conversation to continue
+            idempotency_key: Client key of the request
+
+        Returns:
+            The queued job, or the user's existing job with the same key
+        """
+        job, created = await self._add(ChatJob(
+            user_id=user_id, message=message, conversation_id=conversation_id, idempotency_key=idempotency_key,
+        ))
+        if created:
+            self.notify_work()
+        return job
+
+    async def start(
+        self,
+        user_id: UUID,
+        message: str,
+        conversation_id: Optional[str],
+        idempotency_key: str,
+    ) -> Tuple[ChatJob, bool]:
+        """Record a turn that the caller runs itself (POST /chat with an Idempotency-Key).
+
+        The job is created running, with a lease like a claimed one, so
+        workers leave it alone; the caller finishes it with complete() or fail().
+
+        Args:
+            user_id: ID of the user sending the message
+            message: User message
+            conversation_id: Conversation to continue
+            idempotency_key: Client key of the request
+
+        Returns:
+            (the new job, True), or (the user's existing job with the same key, False)
+        """
+        now = _utcnow()
+        return await self._add(ChatJob(
+            user_id=user_id, message=message, conversation_id=conversation_id, idempotency_key=idempotency_key,
+            status=ChatJobStatus.RUNNING, attempts=1, locked_until=now + timedelta(seconds=self.lease_seconds),
+        ))
+
+    @abstractmethod
+    async def _add(self, job: ChatJob) -> Tuple[ChatJob, bool]:
+        """Store a new job unless the user already has one with its idempotency key.
+
+        Returns:
+            (job, True), or (the existing job, False)
+        """
+
+    @abstractmethod
+    async def claim(self) -> Optional[ChatJob]:
+        """Reserve the oldest runnable job for this worker.
+
+        Returns:
+            The job (status running), or None if there is nothing to do
+        """
+
+    @abstractmethod
+    async def complete(self, job_id: UUID, result: Dict) -> None:
+        """Store the result of a running job."""
+
+    @abstractmethod
+    async def fail(self, job_id: UUID, error: str) -> None:
+        """Mark a running job as failed."""
+
+    @abstractmethod
+    async def get(self, job_id: UUID, user_id: UUID) -> Optional[ChatJob]:
+        """Return a user's job by ID, or None (also if it belongs to someone else)."""
+
+    def _event(self, name: str) -> asyncio.Event:
+        event = getattr(self, name)
+        if event is None:
+            event = asyncio.Event()
+            setattr(self, name, event)
+        return event
+
+    def notify_work(self) -> None:
+        """Wake idle workers in this process."""
+        self._event("_work_available").set()
+
+    def notify_finished(self) -> None:
+        """Wake waiters in this process (they re-read their job)."""
+        self._event("_job_finished").set()
+        self._job_finished = None
+
+    async def wait_for_work(self, timeout: float) -> None:
+        """Sleep until work is enqueued in this process or `timeout` passes."""
+        event = self._event("_work_available")
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        event.clear()
+
+    async def wait(self, job_id: UUID, user_id: UUID, timeout: float, poll_seconds: float) -> Optional[ChatJob]:
+        """Return the job once it has finished or `timeout` has passed.
+
+        Args:
+            job_id: Job to wait for
+            user_id: ID of the user who queued it
+            timeout: Maximum seconds to wait
+            poll_seconds: Re-read interval for jobs finished by other processes
+
+        Returns:
+            The job (possibly still unfinished), or None if the user has no such job
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            job = await self.get(job_id, user_id)
+            remaining = deadline - loop.time()
+            if job is None or job.status in FINISHED_STATUSES or remaining <= 0:
+                return job
+            try:
+                await asyncio.wait_for(self._event("_job_finished").wait(), min(remaining, poll_seconds))
+            except asyncio.TimeoutError:
+                pass
+
+
+class InMemoryChatJobQueue(ChatJobQueue):
+    """Per-process queue for tests and single-process development."""
+
+    def __init__(self, lease_seconds: float = 300, max_attempts: int = 1):
+        super().__init__(lease_seconds, max_attempts)
+        self._jobs: Dict[UUID, ChatJob] = {}
+        self._pending: Deque[UUID] = deque()
+        self._keys: Dict[Tuple[UUID, str], UUID] = {}
+
+    async def _add(self, job: ChatJob) -> Tuple[ChatJob, bool]:
+        if job.idempotency_key:
+            key = (job.user_id, job.idempotency_key)
+            if key in self._keys:
+                return self._jobs[self._keys[key]], False
+            self._keys[key] = job.id
+        self._jobs[job.id] = job
+        if job.status == ChatJobStatus.QUEUED:
+            self._pending.append(job.id)
+        return job, True
+
+    async def claim(self) -> Optional[ChatJob]:
+        while self._pending:
+            job = self._jobs[self._pending.popleft()]
+            if job.status == ChatJobStatus.QUEUED:
+                job.status = ChatJobStatus.RUNNING
+                job.attempts += 1
+                job.locked_until = _utcnow() + timedelta(seconds=self.lease_seconds)
+                job.updated_at = _utcnow()
+                return job
+        return None
+
+    async def complete(self, job_id: UUID, result: Dict) -> None:
+        self._finish(job_id, ChatJobStatus.SUCCEEDED, result=result)
+
+    async def fail(self, job_id: UUID, error: str) -> None:
+        self._finish(job_id, ChatJobStatus.FAILED, error=error)
+
+    def _finish(self, job_id: UUID, status: ChatJobStatus, result: Optional[Dict] = None, error: Optional[str] = None) -> None:
+        job = self._jobs.get(job_id)
+        if job is None or job.status != ChatJobStatus.RUNNING:
+            return
+        job.status = status
+        job.result = result
+        job.error = error
+        if status == ChatJobStatus.FAILED and job.idempotency_key:
+            # Let the client retry the request with the same key
+            self._keys.pop((job.user_id, job.idempotency_key), None)
+            job.idempotency_key = None
+        job.locked_until = None
+        job.finished_at = job.updated_at = _utcnow()
+        self.notify_finished()
+
+    async def get(self, job_id: UUID, user_id: UUID) -> Optional[ChatJob]:
+        job = self._jobs.get(job_id)
+        return job if job is not None and job.user_id == user_id else None
+
+
+class DatabaseChatJobQueue(ChatJobQueue):
+    """Queue in the chat_jobs table, claimed with FOR UPDATE SKIP LOCKED.
+
+    A job is claimable while queued, or while running with an expired lease
+    (its worker died). The claim UPDATE is also conditional on the row being
+    unchanged, which keeps claims exclusive on SQLite, where FOR UPDATE is
+    ignored.
+    """
+
+    async def _add(self, job: ChatJob) -> Tuple[ChatJob, bool]:
+        from .database import async_session
+
+        async with async_session() as session:
+            session.add(job)
+            try:
+                await session.commit()
+                return job, True
+            except IntegrityError as e:
+                # The unique (user_id, idempotency_key) index: a retry of an earlier request
+                await session.rollback()
+                if not job.idempotency_key:
+                    raise
+                error = e
+
+            result = await session.execute(
+                select(ChatJob).where(ChatJob.user_id == job.user_id, ChatJob.idempotency_key == job.idempotency_key)
+            )
+            existing = result.scalars().first()
+        if existing is None:
+            raise error
+        return existing, False
+
+    async def claim(self) -> Optional[ChatJob]:
+        from .database import async_session
+
+        now = _utcnow()
+        statement = (
+            select(ChatJob)
+            .where(or_(
+                ChatJob.status == ChatJobStatus.QUEUED,
+                (ChatJob.status == ChatJobStatus.RUNNING) & (ChatJob.locked_until < now),
+            ))
+            .order_by(ChatJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        async with async_session() as session:
+            while True:
+                job = (await session.execute(statement)).scalars().first()
+                if job is None:
+                    await session.commit()
+                    return None
+
+                if job.attempts >= self.max_attempts:
+                    # Its worker vanished mid-run; running it again could repeat tool calls
+                    values = dict(status=ChatJobStatus.FAILED, error="Worker stopped before the job finished",
+                                  locked_until=None, finished_at=now, updated_at=now, idempotency_key=None)
+                else:
+                    values = dict(status=ChatJobStatus.RUNNING, attempts=job.attempts + 1,
+                                  locked_until=now + timedelta(seconds=self.lease_seconds), updated_at=now)
+
+                # Compare-and-set: without row locks (SQLite) another worker may have read the same row
+                result = await session.execute(
+                    update(ChatJob)
+                    .where(ChatJob.id == job.id, ChatJob.status == job.status, ChatJob.attempts == job.attempts)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+                if result.rowcount != 1:
+                    continue
+                if values["status"] == ChatJobStatus.FAILED:
+                    self.notify_finished()
+                    continue
+
+                for key, value in values.items():
+                    setattr(job, key, value)
+                return job
+
+    async def complete(self, job_id: UUID, result: Dict) -> None:
+        await self._finish(job_id, ChatJobStatus.SUCCEEDED, result=result)
+
+    async def fail(self, job_id: UUID, error: str) -> None:
+        await self._finish(job_id, ChatJobStatus.FAILED, error=error)
+
+    async def _finish(self, job_id: UUID, status: ChatJobStatus, result: Optional[Dict] = None, error: Optional[str] = None) -> None:
+        from .database import async_session
+
+        now = _utcnow()
+        values = dict(status=status, result=result, error=error, locked_until=None, finished_at=now, updated_at=now)
+        if status == ChatJobStatus.FAILED:
+            # Let the client retry the request with the same key
+            values["idempotency_key"] = None
+        async with async_session() as session:
+            await session.execute(
+                update(ChatJob)
+                .where(ChatJob.id == job_id, ChatJob.status == ChatJobStatus.RUNNING)
+                .values(**values)
+            )
+            await session.commit()
+        self.notify_finished()
+
+    async def get(self, job_id: UUID, user_id: UUID) -> Optional[ChatJob]:
+        from .database import async_session
+
+        async with async_session() as session:
+            result = await session.exec(
+                select(ChatJob).where(ChatJob.id == job_id, ChatJob.user_id == user_id)
+            )
+            return result.first()
+
+
+async def run_chat_job(queue: ChatJobQueue, job: ChatJob) -> None:
+    """Run one claimed job and record its outcome.
+
+    Args:
+        queue: Queue the job was claimed from
+        job: Claimed job
+    """
+    from .database import async_session
+    from .services.chat import ChatTurnTimings, run_chat_turn
+
+    timings = ChatTurnTimings()
+    try:
+        async with async_session() as session:
+            response = await run_chat_turn(session, job.user_id, job.message, job.conversation_id, timings)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Chat job {job.id} failed: {type(e).__name__}: {e}")
+        await queue.fail(job.id, f"{type(e).__name__}: {e}")
+        return
+
+    logger.info(f"Chat job {job.id}: {timings}")
+    await queue.complete(job.id, response.model_dump())
+
+
+async def chat_job_worker(queue: ChatJobQueue, poll_seconds: float) -> None:
+    """Claim and run jobs until cancelled.
+
+    Args:
+        queue: Queue to consume
+        poll_seconds: Idle delay between claims when no wake-up arrives
+    """
+    # Like the other background jobs, touch the database only after a first
+    # sleep (or an enqueue in this process), so a cold start opens no connection
+    await queue.wait_for_work(poll_seconds)
+    while True:
+        try:
+            job = await queue.claim()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Never let a transient DB error kill the worker
+            logger.warning(f"Chat job claim failed: {e}")
+            job = None
+
+        if job is None:
+            await queue.wait_for_work(poll_seconds)
+            continue
+        await run_chat_job(queue, job)
+
+
+def start_chat_job_workers(count: int) -> List[asyncio.Task]:
+    """Start `count` workers on the running event loop.
+
+    Args:
+        count: Number of concurrent workers
+
+    Returns:
+        Started tasks
+    """
+    return [
+        asyncio.create_task(
+            chat_job_worker(chat_job_queue, settings.CHAT_JOB_POLL_SECONDS),
+            name=f"chat-job-worker-{i}",
+        )
+        for i in range(count)
+    ]
+
+
+def _build_queue() -> ChatJobQueue:
+    queue_class = InMemoryChatJobQueue if settings.CHAT_JOB_QUEUE == "memory" else DatabaseChatJobQueue
+    return queue_class(
+        lease_seconds=settings.CHAT_JOB_LEASE_SECONDS,
+        max_attempts=settings.CHAT_JOB_MAX_ATTEMPTS,
+    )
+
+
+# Global queue instance
+chat_job_queue = _build_queue()
@@ -0,0 +1,73 @@
+"""Standalone chat job worker process.
+
+Usage:
+    python -m app.chat_worker               # CHAT_JOB_WORKERS workers (at least 1)
+    python -m app.chat_worker --workers 8
+
+Consumes the database chat job queue shared with the API processes. API
+processes run no workers unless CHAT_JOB_WORKERS is set there, so without
+this process (or that setting) queued chat jobs are never run.
+"""
+
+import argparse
+import asyncio
+import logging
+import logging.config
+import signal
+import sys
+from typing import List, Optional
+
+from .config import settings
+from .logging_config import get_logger_config
+
+logger = logging.getLogger("app")
+
+
+async def run(workers: int) -> None:
+    """Run workers until SIGINT/SIGTERM.
+
+    Args:
+        workers: Number of concurrent workers
+    """
+    from .chat_jobs import start_chat_job_workers
+    from .database import get_engine
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    tasks = start_chat_job_workers(workers)
+    logger.info(f"Chat job worker started with {workers} workers")
+    await stop.wait()
+
+    logger.info("Chat job worker stopping...")
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await get_engine().dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the chat worker.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(prog="chat_worker", description="Run chat job workers")
+    parser.add_argument("--workers", type=int, default=max(1, settings.CHAT_JOB_WORKERS))
+    args = parser.parse_args(argv)
+
+    if settings.CHAT_JOB_QUEUE == "memory":
+        parser.error("CHAT_JOB_QUEUE=memory cannot be shared with another process")
+
+    logging.config.dictConfig(get_logger_config())
+    asyncio.run(run(args.workers))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
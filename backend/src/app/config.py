@@ -16,6 +16,8 @@ class Settings(BaseSettings):
     # Database
     # =======================
     DATABASE_URL: str = ""
+    AUTO_CREATE_TABLES: bool = False
+    """Run SQLModel.metadata.create_all at startup. Off by default: use `python -m app.migrate`."""
 
     # Gemini
     @property
@@ -29,11 +31,96 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_HOURS: int = 24
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    JWT_CACHE_SIZE: int = 10000
+    """Verified tokens kept per worker to skip repeat signature checks (0 disables)."""
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    """How long a worker may serve a cached user record (e.g. for /api/auth/verify)."""
+    REVOCATION_SYNC_SECONDS: int = 10
+    """How often each worker pulls new rows from revoked_tokens into memory."""
+    REVOCATION_FILTER_CAPACITY: int = 100000
+    REVOCATION_FILTER_FP_RATE: float = 0.001
+    REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS: int = 3600
+    """How often each worker deletes expired refresh tokens (0 disables pruning)."""
+    REFRESH_TOKEN_PRUNE_BATCH_SIZE: int = 1000
+
+    # =======================
+    # LLM provider calls
+    # =======================
+    LLM_MAX_CONCURRENCY: int = 8
+    """Concurrent Gemini calls per worker process; further calls queue."""
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 5
+    """Longest wait for a free slot before answering 503."""
+    LLM_CALL_TIMEOUT_SECONDS: float = 30
+    """Deadline of a single Gemini call."""
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    """Consecutive failed or timed-out calls that open the circuit breaker."""
+    LLM_BREAKER_RESET_SECONDS: float = 30
+    """How long the open breaker fails fast before letting a probe call through."""
+    CONTEXT_CACHE_ENABLED: bool = False
+    """Cache tool declarations and older history at the provider (needs a model version with explicit caching)."""
+    CONTEXT_CACHE_TTL_SECONDS: int = 600
+    """Lifetime of a conversation's cached prompt prefix."""
+    CONTEXT_CACHE_MIN_TOKENS: int = 4096
+    """Smallest prompt prefix worth caching (the provider rejects smaller ones)."""
+    CONTEXT_CACHE_REFRESH_TOKENS: int = 2048
+    """Uncached history size after which the prefix is re-cached."""
+
+    # =======================
+    # Chat
+    # =======================
+    CHAT_FAST_PATH_ENABLED: bool = True
+    """Answer plain task commands ("list my tasks", "complete task <id>") without the model."""
+    RESPONSE_CACHE_SIZE: int = 1000
+    """Cached chat answers per worker (0 disables the response cache)."""
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    """Lifetime of a cached answer (task changes invalidate answers in every worker sooner)."""
+    HISTORY_WINDOW_MESSAGES: int = 50
+    """Most recent messages of a conversation sent to the model as history."""
+    HISTORY_CACHE_SIZE: int = 1000
+    """Conversations whose prepared history is cached per worker (0 disables the history cache)."""
+    HISTORY_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    """Memory cap of the history cache (estimated); least recently used conversations are evicted."""
+    CONVERSATION_LOCK_TIMEOUT_SECONDS: float = 60
+    """Longest wait for another turn in the same conversation to finish before answering 409."""
+    CONVERSATION_ADVISORY_LOCKS: bool = True
+    """On PostgreSQL, also serialize a conversation's turns across nodes (one connection per running turn)."""
+    IDEMPOTENCY_WAIT_SECONDS: float = 60
+    """Longest wait of a retried request (same Idempotency-Key) for the original turn's result."""
+    MESSAGE_ARCHIVE_AFTER_DAYS: int = 90
+    """Days without messages after which a conversation's messages move to messages_archive."""
+    MESSAGE_ARCHIVE_INTERVAL_SECONDS: int = 3600
+    """How often each worker archives inactive conversations (0 disables archiving)."""
+    MESSAGE_ARCHIVE_BATCH_SIZE: int = 100
+    """Conversations archived per transaction."""
+
+    # =======================
+    # Chat jobs
+    # =======================
+    CHAT_JOB_QUEUE: str = "database"
+    """Chat job queue backend: "database" (chat_jobs table) or "memory" (tests, one process)."""
+    CHAT_JOB_WORKERS: int = 0
+    """Chat job workers per API process; 0 (idle ones poll the DB) needs `python -m app.chat_worker`."""
+    CHAT_JOB_POLL_SECONDS: float = 2.0
+    """How often idle workers and waiting clients re-check the queue."""
+    CHAT_JOB_LEASE_SECONDS: int = 300
+    """How long a claimed job stays reserved; must exceed the slowest chat turn."""
+    CHAT_JOB_MAX_ATTEMPTS: int = 1
+    CHAT_JOB_MAX_WAIT_SECONDS: int = 25
+    """Longest long-poll wait accepted by GET /chat/jobs/{job_id}?wait=."""
 
     # =======================
     # Security
     # =======================
     BCRYPT_ROUNDS: int = 10
+    LOGIN_FREE_ATTEMPTS_PER_EMAIL: int = 5
+    """Failed logins per email before exponential back-off starts."""
+    LOGIN_FREE_ATTEMPTS_PER_IP: int = 20
+    """Failed logins per client IP before exponential back-off starts."""
+    LOGIN_BACKOFF_BASE_SECONDS: float = 1
+    LOGIN_BACKOFF_MAX_SECONDS: float = 900
+    LOGIN_FAILURE_WINDOW_SECONDS: int = 900
+    """How long failed logins are remembered."""
 
     # =======================
     # CORS (VERY IMPORTANT)
@@ -47,6 +134,22 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     ENVIRONMENT: str = "production"
     LOG_LEVEL: str = "INFO"
+    LOOP_MONITOR_ENABLED: bool = False
+    """Measure event-loop lag (see /api/health/loop); with DEBUG, log the stack of blocking code."""
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 0.5
+    LOOP_LAG_THRESHOLD_MS: int = 100
+    """Lag logged as a stall."""
+    PROFILING_ENABLED: bool = False
+    """Allow admins to profile workers (/api/admin/profile and ?__profile=1)."""
+    PROFILING_SAMPLE_INTERVAL_MS: float = 5
+    ADMIN_EMAILS: str = ""
+    """Comma-separated emails of admin users."""
+    TRACING_ENABLED: bool = False
+    """Record request spans (handler, SQL, LLM, MCP tools) and export them as OTLP/JSON."""
+    TRACING_EXPORTER: str = "stdout"
+    """Where traces go: "stdout" or "file" (TRACING_FILE_PATH)."""
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_SERVICE_NAME: str = "hackathon-todo-backend"
 
     SERVER_HOST: str = "0.0.0.0"
     SERVER_PORT: int = 8000
@@ -72,6 +175,10 @@ class Settings(BaseSettings):
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
+    @property
+    def admin_emails_list(self) -> List[str]:
+        return [email.strip().lower() for email in self.ADMIN_EMAILS.split(",") if email.strip()]
+
     @property
     def is_production(self) -> bool:
         return self.ENVIRONMENT.lower() == "production"
@@ -0,0 +1,179 @@
+"""Per-conversation serialization of chat turns, within a worker and across nodes."""
+
+import asyncio
+import hashlib
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List
+from uuid import UUID
+
+from sqlalchemy import text
+
+from .config import settings
+
+logger = logging.getLogger("app")
+
+# Re-check interval while another node holds a conversation's advisory lock
+ADVISORY_LOCK_POLL_SECONDS = 0.1
+
+
+class ConversationBusyError(Exception):
+    """Another turn in the conversation did not finish within the lock timeout.
+
+    Attributes:
+        retry_after: Suggested seconds before retrying
+    """
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def lock_key(user_id: UUID, conversation_id: UUID) -> int:
+    """Signed 64-bit key of a conversation for pg_advisory_lock.
+
+    The owner is part of the key, so a request naming someone else's
+    conversation (which starts a new one) never waits on, or delays, the
+    owner's turns.
+
+    Args:
+        user_id: UUID of the user sending the message
+        conversation_id: UUID of the conversation
+
+    Returns:
+        Key in the bigint range
+    """
+    digest = hashlib.blake2b(f"{user_id}:{conversation_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class ConversationLocks:
+    """Lets one chat turn at a time run in a conversation.
+
+    Turns of a worker queue on an asyncio.Lock per conversation. On
+    PostgreSQL the holder also takes a session-level advisory lock, so turns
+    on other nodes wait too. The advisory lock is held on its own
+    connection, because the turn's session is closed while the model runs;
+    Postgres releases it if the worker dies.
+
+    Locks exist only while a turn holds or waits for them.
+    """
+
+    def __init__(self, timeout_seconds: float = 60, advisory: bool = True):
+        """Initialize locks.
+
+        Args:
+            timeout_seconds: Longest wait for a conversation's lock before
+                ConversationBusyError
+            advisory: Also lock across nodes with PostgreSQL advisory locks
+        """
+        self.timeout_seconds = timeout_seconds
+        self.advisory = advisory
+        self._locks: Dict[int, List[Any]] = {}
+        self.acquired = 0
+        self.waited = 0
+        self.timeouts = 0
+
+    @asynccontextmanager
+    async def hold(self, user_id: UUID, conversation_id: UUID) -> AsyncIterator[None]:
+        """Hold the conversation's lock for the duration of the block.
+
+        Args:
+            user_id: UUID of the user sending the message
+            conversation_id: UUID of the conversation
+
+        Raises:
+            ConversationBusyError: If the lock is not free within timeout_seconds
+        """
+        key = lock_key(user_id, conversation_id)
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        lock: asyncio.Lock = entry[0]
+        entry[1] += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout_seconds
+        try:
+            if entry[1] > 1:
+                # Another turn holds or waits for the lock
+                self.waited += 1
+            try:
+                await asyncio.wait_for(lock.acquire(), self.timeout_seconds)
+            except asyncio.TimeoutError:
+                self._busy(conversation_id)
+
+            try:
+                if self.advisory and _engine().dialect.name == "postgresql":
+                    async with self._advisory_lock(key, conversation_id, deadline):
+                        self.acquired += 1
+                        yield
+                else:
+                    self.acquired += 1
+                    yield
+            finally:
+                lock.release()
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+    @asynccontextmanager
+    async def _advisory_lock(self, key: int, conversation_id: UUID, deadline: float) -> AsyncIterator[None]:
+        loop = asyncio.get_running_loop()
+        async with _engine().connect() as conn:
+            attempts = 0
+            while True:
+                acquired = (await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})).scalar()
+                # Don't sit idle in a transaction while the turn runs
+                await conn.commit()
+                if acquired:
+                    break
+                if loop.time() >= deadline:
+                    self._busy(conversation_id)
+                attempts += 1
+                if attempts == 1:
+                    # Held by a turn on another node
+                    self.waited += 1
+                await asyncio.sleep(ADVISORY_LOCK_POLL_SECONDS)
+
+            try:
+                yield
+            finally:
+                try:
+                    await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                    await conn.commit()
+                except Exception as e:
+                    # Closing the connection for good releases the lock too
+                    logger.warning(f"Advisory unlock of conversation {conversation_id} failed: {e}")
+                    await conn.invalidate()
+
+    def _busy(self, conversation_id: UUID) -> None:
+        self.timeouts += 1
+        raise ConversationBusyError(
+            f"Conversation {conversation_id} is busy with another message; try again shortly"
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current locks and counters.
+
+        Returns:
+            Dict with conversations locked or waited on, turns run, turns that
+            had to wait and lock timeouts
+        """
+        return {
+            "conversations": len(self._locks),
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "timeouts": self.timeouts,
+        }
+
+
+def _engine() -> Any:
+    from .database import get_engine
+
+    return get_engine()
+
+
+# Global instance
+conversation_locks = ConversationLocks(
+    timeout_seconds=settings.CONVERSATION_LOCK_TIMEOUT_SECONDS,
+    advisory=settings.CONVERSATION_ADVISORY_LOCKS,
+)
@@ -1,7 +1,8 @@
 """Database configuration and session management."""
 
+import json
 import logging
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
@@ -10,10 +11,16 @@ from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .config import settings
+from .tracing import instrument_engine, tracer
 
 logger = logging.getLogger("app")
 
 
+def _compact_json(value: Any) -> str:
+    """Serialize JSON column values without the default ", " / ": " padding."""
+    return json.dumps(value, separators=(",", ":"))
+
+
 # Create async database engine lazily
 # This function is called when first needed, not at import time
 def _create_engine():
@@ -44,6 +51,7 @@ def _create_engine():
             return create_async_engine(
                 db_url,
                 echo=settings.DEBUG,
+                json_serializer=_compact_json,
                 connect_args={"check_same_thread": False},
             )
         else:
@@ -52,6 +60,7 @@ def _create_engine():
             return create_async_engine(
                 db_url,
                 echo=settings.DEBUG,
+                json_serializer=_compact_json,
                 poolclass=NullPool,  # Neon has connection limits, don't pool
                 connect_args={
                     "server_settings": {
@@ -65,12 +74,45 @@ def _create_engine():
         logger.error(f"Failed to create database engine: {e}")
         raise # Fail fast! Do not fallback to SQLite in production.
 
-engine = _create_engine()
+_engine = None
+_session_factory = None
+
+
+def get_engine():
+    """Return the shared async engine, creating it on first use.
+
+    Building the engine is deferred so that importing this module (e.g. on a
+    serverless cold start that only serves /health) does not touch drivers or
+    settings validation.
+    """
+    global _engine
+    if _engine is None:
+        _engine = _create_engine()
+        if tracer.enabled:
+            instrument_engine(_engine)
+    return _engine
+
+
+def async_session() -> AsyncSession:
+    """Create a new async session (the session factory is built on first use).
+
+    Usage:
+        async with async_session() as session:
+            ...
+    """
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = async_sessionmaker(
+            get_engine(), class_=AsyncSession, expire_on_commit=False
+        )
+    return _session_factory()
+
 
-# Create async session factory
-async_session = async_sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
+def __getattr__(name: str):
+    """Keep `from app.database import engine` working while staying lazy."""
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 async def create_db_and_tables() -> None:
@@ -80,7 +122,7 @@ async def create_db_and_tables() -> None:
     all required tables exist. In production, use Alembic migrations instead.
     """
     try:
-        async with engine.begin() as conn:
+        async with get_engine().begin() as conn:
             await conn.run_sync(SQLModel.metadata.create_all)
         logger.info("Database tables created/verified successfully")
     except SQLAlchemyError as e:
@@ -4,7 +4,9 @@ from .base import BaseModel
 from .user import User
 from .task import Task, TaskStatus, TaskPriority
 from .refresh_token import RefreshToken
-from .conversation import Conversation, Message
+from .revoked_token import RevokedToken
+from .conversation import Conversation, Message, MessageArchive
+from .chat_job import ChatJob, ChatJobStatus
 
 __all__ = [
     "BaseModel",
@@ -13,6 +15,10 @@ __all__ = [
     "TaskStatus",
     "TaskPriority",
     "RefreshToken",
+    "RevokedToken",
     "Conversation",
     "Message",
+    "MessageArchive",
+    "ChatJob",
+    "ChatJobStatus",
 ]
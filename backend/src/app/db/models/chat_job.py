@@ -0,0 +1,85 @@
+"""Chat job database model."""
+
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import JSON, Column, Index
+from sqlmodel import Field
+
+from .base import BaseModel
+
+
+class ChatJobStatus(str, Enum):
+    """Chat job status enumeration."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class ChatJob(BaseModel, table=True):
+    """Chat turn queued for a worker (see app/chat_jobs.py).
+
+    Workers claim the oldest queued row with SELECT ... FOR UPDATE SKIP
+    LOCKED and hold it through a lease (locked_until) rather than an open
+    transaction, so a worker that dies only delays its job until the lease
+    expires.
+
+    Requests with an Idempotency-Key also get a row (POST /chat runs it
+    inline, already running), so a retry of the same request attaches to
+    the original turn on any node instead of running it again. A failed
+    job gives its key up, so the request can be retried.
+
+    Attributes:
+        user_id: ID of the user who sent the message
+        conversation_id: Conversation to continue (None starts a new one)
+        message: User message
+        status: Current job status
+        attempts: Times a worker has claimed the job
+        locked_until: Lease expiry of the worker running the job
+        finished_at: When the job succeeded or failed
+        result: ChatResponse of a succeeded job
+        error: Failure reason of a failed job
+        idempotency_key: Client key of the request, unique per user
+    """
+
+    __tablename__ = "chat_jobs"
+    __table_args__ = (
+        Index("idx_chat_jobs_status_created_at", "status", "created_at"),
+        Index("uq_chat_jobs_user_idempotency_key", "user_id", "idempotency_key", unique=True),
+    )
+
+    user_id: UUID = Field(
+        foreign_key="users.id",
+        index=True,
+        description="ID of the message sender",
+    )
+    conversation_id: Optional[str] = Field(
+        default=None,
+        max_length=64,
+        description="Conversation to continue",
+    )
+    message: str = Field(description="User message")
+    status: ChatJobStatus = Field(
+        default=ChatJobStatus.QUEUED,
+        description="Current job status",
+    )
+    attempts: int = Field(default=0, description="Times the job was claimed")
+    locked_until: Optional[datetime] = Field(
+        default=None,
+        description="Lease expiry of the running worker",
+    )
+    finished_at: Optional[datetime] = Field(
+        default=None,
+        description="When the job finished",
+    )
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = Field(default=None, description="Failure reason")
+    idempotency_key: Optional[str] = Field(
+        default=None,
+        max_length=255,
+        description="Idempotency-Key header of the request",
+    )
@@ -1,35 +1,69 @@
+from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any
 from uuid import UUID
 
-from sqlalchemy import Column, JSON
+from sqlalchemy import Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, Relationship
 
 from .base import BaseModel
 
+# Binary JSONB on PostgreSQL (no whitespace or duplicate keys stored), JSON text elsewhere
+ToolCallsJSON = JSON().with_variant(JSONB(), "postgresql")
+
+
 class Conversation(BaseModel, table=True):
     """Conversation model for storing chat history."""
     
     __tablename__ = "conversations"
+    # GET /api/conversations: a user's conversations, most recently active first
+    __table_args__ = (Index("idx_conversations_user_last_message", "user_id", "last_message_at", "id"),)
     
     user_id: UUID = Field(foreign_key="users.id", index=True)
     title: Optional[str] = Field(default=None)
+    history_length: int = Field(default=0, description="Messages with content; bumped by every turn, versions cached history")
+    last_message_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        description="Creation time of the latest message (conversation list order)",
+    )
+    archived_at: Optional[datetime] = Field(default=None, description="When its messages were moved to messages_archive")
+
+    # Provider-side cache of the prompt prefix (tool declarations + older history)
+    context_cache_name: Optional[str] = Field(default=None, max_length=255, description="Provider cached-content resource name")
+    context_cache_expires_at: Optional[datetime] = Field(default=None, description="When the provider drops the cached prefix")
+    context_cache_messages: int = Field(default=0, description="History position (see history_length) the cached prefix reaches")
     
     # Relationships
     messages: List["Message"] = Relationship(back_populates="conversation", sa_relationship_kwargs={"cascade": "all, delete"})
     user: Optional["User"] = Relationship()
 
 
-class Message(BaseModel, table=True):
-    """Message model for storing individual chat messages."""
-    
-    __tablename__ = "messages"
-    
+class MessageBase(BaseModel):
+    """Columns shared by live and archived messages."""
+
     conversation_id: UUID = Field(foreign_key="conversations.id", index=True)
     user_id: UUID = Field(foreign_key="users.id")
     role: str = Field(description="Role of the message sender: user, assistant, system")
     content: str = Field(description="Content of the message")
-    tool_calls: Optional[List[Dict[str, Any]]] = Field(default=None, sa_column=Column(JSON))
+    tool_calls: Optional[List[Dict[str, Any]]] = Field(default=None, sa_type=ToolCallsJSON)
+
+
+class Message(MessageBase, table=True):
+    """Message model for storing individual chat messages."""
+    
+    __tablename__ = "messages"
     
     # Relationships
     conversation: Conversation = Relationship(back_populates="messages")
     user: Optional["User"] = Relationship()
+
+
+class MessageArchive(MessageBase, table=True):
+    """Messages of conversations inactive for MESSAGE_ARCHIVE_AFTER_DAYS.
+
+    Keeps the hot messages table (and its indexes) small. A conversation's
+    messages are all in one table: messages_archive while
+    Conversation.archived_at is set, messages otherwise.
+    """
+
+    __tablename__ = "messages_archive"
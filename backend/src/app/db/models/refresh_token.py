@@ -17,7 +17,7 @@ class RefreshToken(BaseModel, table=True):
 
     Attributes:
         user_id: ID of the user who owns this refresh token
-        token: The actual JWT refresh token (unique)
+        token_hash: SHA-256 hex digest of the JWT refresh token (unique)
         expires_at: When this refresh token expires
     """
 
@@ -28,12 +28,15 @@ class RefreshToken(BaseModel, table=True):
         index=True,
         description="ID of the token owner",
     )
-    token: str = Field(
+    token_hash: str = Field(
         unique=True,
         index=True,
-        description="JWT refresh token",
+        min_length=64,
+        max_length=64,
+        description="SHA-256 hex digest of the JWT refresh token",
     )
     expires_at: datetime = Field(
         default_factory=lambda: (datetime.now(timezone.utc) + timedelta(days=7)).replace(tzinfo=None),
+        index=True,
         description="Token expiration timestamp",
     )
@@ -0,0 +1,42 @@
+"""Revoked token database model."""
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import Index
+from sqlmodel import Field
+
+from .base import BaseModel
+
+
+class RevokedToken(BaseModel, table=True):
+    """Revoked JWT (access or refresh) that must be rejected until it expires.
+
+    Rows are mirrored into every worker's in-memory revocation list
+    (app/revocation.py); created_at doubles as the incremental-sync watermark.
+
+    Attributes:
+        user_id: ID of the user who owned the token
+        token_hash: SHA-256 hex digest of the revoked token (unique)
+        expires_at: The token's own expiry; the row can be pruned afterwards
+    """
+
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (Index("idx_revoked_tokens_created_at", "created_at"),)
+
+    user_id: UUID = Field(
+        foreign_key="users.id",
+        index=True,
+        description="ID of the token owner",
+    )
+    token_hash: str = Field(
+        unique=True,
+        index=True,
+        min_length=64,
+        max_length=64,
+        description="SHA-256 hex digest of the revoked token",
+    )
+    expires_at: datetime = Field(
+        index=True,
+        description="Expiry of the revoked token",
+    )
@@ -80,8 +80,9 @@ class Task(BaseModel, table=True):
 
     class Config:
         """Model configuration for composite indexes."""
-        # Composite indexes for common query patterns
-        # Format: {"index": ["col1", "col2"]} creates INDEX (col1, col2)
+        # Composite indexes for common query patterns.
+        # NOTE: SQLModel does not apply this list; the indexes are created by
+        # app/migrations/001_add_task_indexes.py and 002_add_query_shaped_indexes.py.
         indexes = [
             ("user_id", "status"),  # For: GET /tasks?status_filter=pending
             ("user_id", "priority"),  # For: GET /tasks?priority_filter=high
@@ -20,6 +20,7 @@ class User(BaseModel, table=True):
         full_name: User's full name
         avatar_url: Optional URL to user's profile picture
         is_active: Whether the user account is active
+        tasks_version: Bumped by every task change; versions cached chat answers
     """
 
     __tablename__ = "users"
@@ -46,3 +47,4 @@ class User(BaseModel, table=True):
         description="URL to user's profile picture",
     )
     is_active: bool = Field(default=True, description="Whether user account is active")
+    tasks_version: int = Field(default=0, description="Bumped by every task change; versions cached chat answers")
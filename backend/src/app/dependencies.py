@@ -9,7 +9,10 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .database import get_session
 from .db.models import User
-from .security import extract_user_id_from_token
+from .revocation import revocation_list
+from .schemas.user import UserRead
+from .security import extract_user_id_from_token, hash_token
+from .user_cache import get_active_user
 
 
 def _extract_token(
@@ -60,6 +63,57 @@ def _extract_token(
     return parts[1]
 
 
+async def _verified_user_id(token: str, session: Optional[AsyncSession] = None) -> UUID:
+    """Check a token's signature, expiry and revocation.
+
+    Args:
+        token: JWT token
+        session: Session for an inline revocation sync; one is opened only
+            when the revocation list is stale and none is given
+
+    Returns:
+        UUID of the token's user
+
+    Raises:
+        HTTPException: 401 if the token is missing, invalid, expired or revoked
+    """
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing authentication token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Extract user ID from token
+    user_id_str = extract_user_id_from_token(token)
+    if not user_id_str:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Validate UUID format
+    try:
+        user_id = UUID(user_id_str)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token format",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Reject logged-out tokens (in-memory check; syncs only when stale)
+    await revocation_list.ensure_fresh(session)
+    if revocation_list.is_revoked(hash_token(token)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user_id
+
+
 async def get_current_user(
     token: str = Depends(_extract_token),
     session: AsyncSession = Depends(get_session),
@@ -80,31 +134,7 @@ async def get_current_user(
         HTTPException: 401 if token is invalid/expired, 403 if user inactive, 404 if not found
     """
     try:
-        if not token:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Missing authentication token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        # Extract user ID from token
-        user_id_str = extract_user_id_from_token(token)
-        if not user_id_str:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        # Validate UUID format
-        try:
-            user_id = UUID(user_id_str)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token format",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        user_id = await _verified_user_id(token, session)
 
         # Query user from database
         print(f"[DEBUG] get_current_user: Querying user {user_id}")
@@ -138,4 +168,33 @@ async def get_current_user(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error",
-        ) from e
\ No newline at end of file
+        ) from e
+
+async def get_current_user_cached(token: str = Depends(_extract_token)) -> UserRead:
+    """Authenticate like get_current_user, without a request-scoped session.
+
+    For endpoints that wait a long time (long polls, profiling), where a
+    session from get_session would stay checked out, idle in a transaction,
+    until the response is sent. The user comes from the per-worker user
+    cache; a short session is opened only on a cache miss or a stale
+    revocation list.
+
+    Args:
+        token: JWT token from the access_token cookie or Authorization header
+
+    Returns:
+        The authenticated user (as cached)
+
+    Raises:
+        HTTPException: 401 if the token is missing, invalid, expired or
+            revoked, or its user does not exist or is inactive
+    """
+    user_id = await _verified_user_id(token)
+    user = await get_active_user(user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found or inactive",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
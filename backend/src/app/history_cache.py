@@ -0,0 +1,157 @@
+"""Per-worker cache of recently active conversations' prepared chat history."""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from .config import settings
+
+# Rough per-entry cost of the dict, list and string objects around the text
+ENTRY_OVERHEAD_BYTES = 300
+
+
+def history_entry(role: str, content: str) -> Dict[str, Any]:
+    """Gemini history entry for a stored message.
+
+    Args:
+        role: Message role ("user" or "assistant")
+        content: Message text
+
+    Returns:
+        {"role": "user" | "model", "parts": [content]}
+    """
+    return {"role": "user" if role == "user" else "model", "parts": [content]}
+
+
+def _entry_bytes(entry: Dict[str, Any]) -> int:
+    return ENTRY_OVERHEAD_BYTES + sum(len(part) for part in entry["parts"] if isinstance(part, str))
+
+
+class HistoryCache:
+    """LRU cache of Gemini-format history keyed by conversation ID.
+
+    Each entry holds the latest `window` history entries of a conversation
+    together with the conversation's `history_length` they correspond to.
+    That column is bumped in the same transaction as every turn's messages,
+    so a lookup with the value just read from the database only hits if no
+    worker has written to the conversation since this one cached it.
+
+    The cache is bounded by both entry count and estimated size; least
+    recently used conversations are evicted first.
+    """
+
+    def __init__(self, max_conversations: int = 1000, max_bytes: int = 32 * 1024 * 1024, window: int = 50):
+        """Initialize cache.
+
+        Args:
+            max_conversations: Maximum number of cached conversations (0 disables caching)
+            max_bytes: Maximum estimated size of all cached history
+            window: History entries kept per conversation (and loaded on a miss)
+        """
+        self.max_conversations = max_conversations
+        self.max_bytes = max_bytes
+        self.window = window
+        self._entries: "OrderedDict[UUID, Tuple[int, List[Dict[str, Any]], int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def get(self, conversation_id: UUID, version: int) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached history, or None if absent or outdated.
+
+        Args:
+            conversation_id: UUID of the conversation
+            version: The conversation's current history_length
+
+        Returns:
+            Copy of the cached history list or None
+        """
+        if self.max_conversations <= 0:
+            return None
+
+        entry = self._entries.get(conversation_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        cached_version, history, _ = entry
+        if cached_version != version:
+            # Another worker appended to the conversation
+            self._drop(conversation_id)
+            self.stale += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(conversation_id)
+        self.hits += 1
+        return list(history)
+
+    def put(self, conversation_id: UUID, version: int, history: List[Dict[str, Any]]) -> None:
+        """Cache a conversation's history, keeping only the latest window.
+
+        Args:
+            conversation_id: UUID of the conversation
+            version: history_length the history corresponds to
+            history: History in Gemini format, oldest first
+        """
+        if self.max_conversations <= 0:
+            return
+
+        history = history[-self.window:]
+        size = sum(_entry_bytes(e) for e in history)
+        self._drop(conversation_id)
+        self._entries[conversation_id] = (version, history, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_conversations or self._bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def invalidate(self, conversation_id: UUID) -> None:
+        """Drop a conversation whose cached history may be incomplete.
+
+        Args:
+            conversation_id: UUID of the conversation
+        """
+        self._drop(conversation_id)
+
+    def _drop(self, conversation_id: UUID) -> None:
+        entry = self._entries.pop(conversation_id, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current size and counters.
+
+        Returns:
+            Dict with cached conversations, estimated bytes, limits, hits,
+            misses (of which stale), hit rate and evictions
+        """
+        lookups = self.hits + self.misses
+        return {
+            "conversations": len(self._entries),
+            "max_conversations": self.max_conversations,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "window": self.window,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+# Global cache instance (per worker process)
+history_cache = HistoryCache(
+    max_conversations=settings.HISTORY_CACHE_SIZE,
+    max_bytes=settings.HISTORY_CACHE_MAX_BYTES,
+    window=settings.HISTORY_WINDOW_MESSAGES,
+)
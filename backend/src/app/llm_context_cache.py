@@ -0,0 +1,210 @@
+"""Provider-side caching of a conversation's prompt prefix.
+
+Every Gemini call carries the tool declarations and the full conversation
+history. Once that prefix is large enough, it is uploaded once as a
+cached-content resource (genai.caching.CachedContent) and later turns
+reference it by name, sending only the messages added since. Cached
+prompt tokens are billed at a reduced rate and do not have to be
+re-processed, which shortens time to first token on long conversations.
+
+The cache name, its expiry and the history position it reaches (counted
+like Conversation.history_length) are kept on the Conversation row, so any
+worker can reuse it.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Set, Tuple
+
+from .config import settings
+from .db.models import Conversation
+from .llm_guard import LLMUnavailableError, llm_guard
+
+logger = logging.getLogger("app")
+
+# Do not reuse a cache that is about to expire mid-turn
+EXPIRY_MARGIN_SECONDS = 30
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def estimate_tokens(history: List[Dict[str, Any]]) -> int:
+    """Rough token count of Gemini history entries (~4 characters per token)."""
+    return sum(len(part) for entry in history for part in entry["parts"] if isinstance(part, str)) // 4
+
+
+def estimate_tool_tokens(tools: List[Any], schemas: List[Dict[str, Any]]) -> int:
+    """Rough token count of MCP tool declarations as sent to the model.
+
+    Args:
+        tools: MCP tools (name, description)
+        schemas: Their cleaned parameter schemas
+
+    Returns:
+        Estimated tokens
+    """
+    chars = sum(len(t.name) + len(t.description or "") for t in tools)
+    chars += sum(len(json.dumps(schema)) for schema in schemas)
+    return chars // 4
+
+
+class ContextCache:
+    """Creates, reuses and refreshes a conversation's cached prompt prefix.
+
+    - A cache is created once tool declarations plus history reach
+      `min_tokens` (the provider rejects smaller ones).
+    - Later turns reuse it while it is unexpired and the history sent after
+      it stays under `refresh_tokens`; past that, a new cache covering the
+      current history window replaces it. Superseded caches expire on their own TTL.
+    - If the provider refuses caching for a model (HTTP 400, e.g. a model
+      alias without explicit caching support), that model is not tried
+      again in this process. Any other failure falls back to an uncached call.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        ttl_seconds: int = 600,
+        min_tokens: int = 4096,
+        refresh_tokens: int = 2048,
+    ):
+        """Initialize context cache.
+
+        Args:
+            enabled: Whether to use provider-side caching at all
+            ttl_seconds: Lifetime of a created cache
+            min_tokens: Smallest prefix worth caching
+            refresh_tokens: Uncached history size that triggers a new cache
+        """
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.refresh_tokens = refresh_tokens
+        self._unsupported_models: Set[str] = set()
+
+        self.created = 0
+        self.reused = 0
+        self.failures = 0
+
+    def _usable(self, conversation: Conversation, history: List[Dict[str, Any]], history_offset: int) -> bool:
+        return (
+            conversation.context_cache_name is not None
+            and conversation.context_cache_expires_at is not None
+            and conversation.context_cache_expires_at > _utcnow() + timedelta(seconds=EXPIRY_MARGIN_SECONDS)
+            # The history sent with the turn must continue exactly where the prefix ends
+            and history_offset <= conversation.context_cache_messages <= history_offset + len(history)
+        )
+
+    @staticmethod
+    def _forget(conversation: Conversation) -> None:
+        conversation.context_cache_name = None
+        conversation.context_cache_expires_at = None
+        conversation.context_cache_messages = 0
+
+    async def model_for_turn(
+        self,
+        genai: Any,
+        conversation: Conversation,
+        model_name: str,
+        tool: Any,
+        tool_tokens: int,
+        history: List[Dict[str, Any]],
+        history_offset: int = 0,
+    ) -> Tuple[Any, List[Dict[str, Any]]]:
+        """Build the model for one turn, on top of a cached prefix where possible.
+
+        Updates the conversation's context_cache_* fields when a cache is
+        created or found gone; the caller persists them with the turn.
+
+        Args:
+            genai: The google.generativeai module
+            conversation: Conversation of the turn
+            model_name: Model selected for the turn
+            tool: Tool declarations (genai.protos.Tool)
+            tool_tokens: Estimated size of the tool declarations
+            history: Conversation history in Gemini format (the latest window)
+            history_offset: Position of history[0] in the whole conversation
+
+        Returns:
+            (model, history to pass to start_chat)
+
+        Raises:
+            LLMUnavailableError: If the provider is degraded or saturated
+        """
+        if not self.enabled:
+            return genai.GenerativeModel(model_name=model_name, tools=[tool]), history
+
+        if self._usable(conversation, history, history_offset):
+            tail = history[conversation.context_cache_messages - history_offset:]
+            if estimate_tokens(tail) < self.refresh_tokens:
+                name = conversation.context_cache_name
+                try:
+                    # from_cached_content looks the cache up (a blocking call)
+                    model = await llm_guard.call(
+                        lambda: asyncio.to_thread(genai.GenerativeModel.from_cached_content, name)
+                    )
+                except LLMUnavailableError:
+                    raise
+                except Exception as e:
+                    logger.info(f"Context cache {name} unavailable, rebuilding: {e}")
+                    self._forget(conversation)
+                else:
+                    self.reused += 1
+                    return model, tail
+
+        if (
+            history
+            and model_name not in self._unsupported_models
+            and tool_tokens + estimate_tokens(history) >= self.min_tokens
+        ):
+            try:
+                cached = await llm_guard.call(lambda: asyncio.to_thread(
+                    genai.caching.CachedContent.create,
+                    model=model_name,
+                    contents=history,
+                    tools=[tool],
+                    ttl=timedelta(seconds=self.ttl_seconds),
+                ))
+            except LLMUnavailableError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                if getattr(e, "code", None) == 400:
+                    self._unsupported_models.add(model_name)
+                logger.warning(f"Context cache creation failed for {model_name}: {e}")
+            else:
+                self.created += 1
+                conversation.context_cache_name = cached.name
+                conversation.context_cache_expires_at = _utcnow() + timedelta(seconds=self.ttl_seconds)
+                conversation.context_cache_messages = history_offset + len(history)
+                return genai.GenerativeModel.from_cached_content(cached), []
+
+        return genai.GenerativeModel(model_name=model_name, tools=[tool]), history
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters.
+
+        Returns:
+            Dict with enabled flag, created/reused/failed counts and models
+            the provider refused to cache
+        """
+        return {
+            "enabled": self.enabled,
+            "created": self.created,
+            "reused": self.reused,
+            "failures": self.failures,
+            "unsupported_models": sorted(self._unsupported_models),
+        }
+
+
+# Global context cache instance
+context_cache = ContextCache(
+    enabled=settings.CONTEXT_CACHE_ENABLED,
+    ttl_seconds=settings.CONTEXT_CACHE_TTL_SECONDS,
+    min_tokens=settings.CONTEXT_CACHE_MIN_TOKENS,
+    refresh_tokens=settings.CONTEXT_CACHE_REFRESH_TOKENS,
+)
@@ -0,0 +1,238 @@
+"""Concurrency limit, deadlines and circuit breaker for outbound LLM calls."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from .config import settings
+
+logger = logging.getLogger("app")
+
+T = TypeVar("T")
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class LLMUnavailableError(Exception):
+    """The LLM provider cannot take the call now (breaker open, queue full or timed out).
+
+    Attributes:
+        retry_after: Suggested seconds before retrying
+    """
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_provider_failure(exc: Exception) -> bool:
+    """Whether an error suggests the provider is degraded.
+
+    google.api_core errors carry the HTTP status in `code`: 429 and 5xx count,
+    other 4xx are the caller's fault. Errors without a code (connection
+    resets, DNS failures) count as well.
+    """
+    code = getattr(exc, "code", None)
+    if not isinstance(code, int):
+        return True
+    return code == 429 or code >= 500
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets one probe through after a cool-down.
+
+    closed     calls pass; `failure_threshold` consecutive failures open it
+    open       calls fail fast until `reset_seconds` have passed
+    half_open  a single probe call passes; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        """Initialize breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_seconds: Time the breaker stays open before a probe
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_in_flight = False
+
+    def retry_after(self) -> int:
+        """Seconds until the breaker lets a probe through."""
+        return max(1, int(self.opened_at + self.reset_seconds - time.monotonic() + 0.999))
+
+    def allow(self) -> bool:
+        """Whether a call may start now (claims the probe slot when half-open)."""
+        if self.state == BREAKER_OPEN:
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self.state = BREAKER_HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == BREAKER_HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def release_probe(self) -> None:
+        """Give back the half-open probe slot of a call that never reached the provider."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self.state != BREAKER_CLOSED:
+            logger.info("LLM circuit breaker closed")
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == BREAKER_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != BREAKER_OPEN:
+                self.times_opened += 1
+                logger.warning(
+                    f"LLM circuit breaker open after {self.consecutive_failures} consecutive failures"
+                )
+            self.state = BREAKER_OPEN
+            self.opened_at = time.monotonic()
+
+
+class LLMGuard:
+    """Process-wide gate in front of every LLM provider call.
+
+    At most `max_concurrency` calls run at once; callers wait up to
+    `queue_timeout_seconds` for a slot. Each call gets `call_timeout_seconds`.
+    Failures and timeouts feed the circuit breaker, and while it is open
+    calls fail immediately with LLMUnavailableError (HTTP 503) instead of
+    piling up behind a degraded provider.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        queue_timeout_seconds: float = 5,
+        call_timeout_seconds: float = 30,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """Initialize guard.
+
+        Args:
+            max_concurrency: Concurrent provider calls per process
+            queue_timeout_seconds: Longest wait for a free slot
+            call_timeout_seconds: Deadline of a single call
+            breaker: Circuit breaker (a default one if omitted)
+        """
+        self.max_concurrency = max_concurrency
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.call_timeout_seconds = call_timeout_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rejected_queue_full = 0
+        self.rejected_breaker_open = 0
+
+    async def call(self, make_call: Callable[[], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        """Run one provider call under the concurrency limit, deadline and breaker.
+
+        Args:
+            make_call: Returns the awaitable to run (created only once a slot is free)
+            timeout: Deadline override in seconds
+
+        Returns:
+            The call's result
+
+        Raises:
+            LLMUnavailableError: Breaker open, no slot within the queue timeout,
+                or the call exceeded its deadline
+        """
+        if not self.breaker.allow():
+            self.rejected_breaker_open += 1
+            raise LLMUnavailableError(
+                "LLM provider is degraded; try again shortly",
+                retry_after=self.breaker.retry_after(),
+            )
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            self.rejected_queue_full += 1
+            # Nothing reached the provider; do not hold the half-open probe slot
+            self.breaker.release_probe()
+            raise LLMUnavailableError("Too many concurrent LLM requests; try again shortly")
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        self.calls += 1
+        try:
+            result = await asyncio.wait_for(make_call(), timeout or self.call_timeout_seconds)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.breaker.record_failure()
+            raise LLMUnavailableError("LLM provider timed out")
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+        except Exception as e:
+            if not is_provider_failure(e):
+                # The provider answered (e.g. 400 invalid argument); it is not degraded
+                self.breaker.record_success()
+                raise
+            self.failures += 1
+            self.breaker.record_failure()
+            raise
+        else:
+            self.breaker.record_success()
+            return result
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limiter and breaker metrics.
+
+        Returns:
+            Dict with queue depth, in-flight calls, breaker state and counters
+        """
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "breaker_state": self.breaker.state,
+            "breaker_consecutive_failures": self.breaker.consecutive_failures,
+            "breaker_times_opened": self.breaker.times_opened,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_breaker_open": self.rejected_breaker_open,
+        }
+
+
+# Global guard instance (one per worker process)
+llm_guard = LLMGuard(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    queue_timeout_seconds=settings.LLM_QUEUE_TIMEOUT_SECONDS,
+    call_timeout_seconds=settings.LLM_CALL_TIMEOUT_SECONDS,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+        reset_seconds=settings.LLM_BREAKER_RESET_SECONDS,
+    ),
+)
@@ -5,6 +5,15 @@ import sys
 from typing import Any, Dict
 
 from .config import settings
+from .tracing import current_request_id
+
+
+class RequestIdFilter(logging.Filter):
+    """Add the current request id (or "-") to log records as `request_id`."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = current_request_id() or "-"
+        return True
 
 
 def get_logger_config() -> Dict[str, Any]:
@@ -20,23 +29,28 @@ def get_logger_config() -> Dict[str, Any]:
         "disable_existing_loggers": False,
         "formatters": {
             "default": {
-                "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+                "format": "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s",
             },
             "detailed": {
-                "format": "%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
+                "format": "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(filename)s:%(lineno)d - %(message)s",
             },
         },
+        "filters": {
+            "request_id": {"()": RequestIdFilter},
+        },
         "handlers": {
             "default": {
                 "formatter": "default",
                 "class": "logging.StreamHandler",
                 "stream": sys.stdout,
+                "filters": ["request_id"],
             },
         },
         "loggers": {
             "fastapi": {
                 "handlers": ["default"],
                 "level": log_level,
+                "propagate": False,
             },
             "sqlalchemy.engine": {
                 "handlers": ["default"],
@@ -45,6 +59,7 @@ def get_logger_config() -> Dict[str, Any]:
             "app": {
                 "handlers": ["default"],
                 "level": log_level,
+                "propagate": False,
             },
         },
     }
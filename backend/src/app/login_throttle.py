@@ -0,0 +1,109 @@
+"""Progressive lockout of repeated failed logins per email and per client IP."""
+
+import math
+import time
+from typing import Optional
+
+from .config import settings
+from .rate_limit_store import RateLimitStore, rate_limit_store
+
+# Cap on the back-off exponent so the delay arithmetic stays small
+MAX_BACKOFF_EXPONENT = 32
+
+
+class LoginThrottle:
+    """Failure counters with exponential back-off for POST /api/auth/login.
+
+    After `free_attempts` failures within the failure window, the email (or
+    IP) is blocked for base_delay * 2**(extra failures), capped at max_delay.
+    Blocked attempts are rejected up front, before the user lookup and the
+    bcrypt check, and do not extend the block. A successful login clears the
+    email's counters; IP counters only expire, since one valid credential
+    says nothing about the rest of a stuffing list.
+    """
+
+    def __init__(
+        self,
+        store: Optional[RateLimitStore] = None,
+        free_attempts_per_email: int = 5,
+        free_attempts_per_ip: int = 20,
+        base_delay_seconds: float = 1,
+        max_delay_seconds: float = 900,
+        failure_window_seconds: float = 900,
+    ):
+        """Initialize throttle.
+
+        Args:
+            store: Counter storage (defaults to the shared per-worker store)
+            free_attempts_per_email: Failures per email before back-off starts
+            free_attempts_per_ip: Failures per client IP before back-off starts
+            base_delay_seconds: First block duration
+            max_delay_seconds: Longest block duration
+            failure_window_seconds: How long failures are remembered
+        """
+        self.store = store or rate_limit_store
+        self.free_attempts_per_email = free_attempts_per_email
+        self.free_attempts_per_ip = free_attempts_per_ip
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.failure_window_seconds = failure_window_seconds
+
+    @staticmethod
+    def _scopes(email: str, client_ip: str):
+        return (("email", email.strip().lower()), ("ip", client_ip))
+
+    async def retry_after(self, email: str, client_ip: str) -> int:
+        """Seconds until this email/IP may attempt a login (0 if allowed now).
+
+        Args:
+            email: Email from the login request
+            client_ip: Client IP address
+
+        Returns:
+            Whole seconds to wait, for the Retry-After header
+        """
+        now = time.time()
+        wait = 0.0
+        for scope, value in self._scopes(email, client_ip):
+            blocked_until = await self.store.get(f"login:block:{scope}:{value}")
+            if blocked_until is not None and blocked_until > now:
+                wait = max(wait, blocked_until - now)
+        return math.ceil(wait)
+
+    async def record_failure(self, email: str, client_ip: str) -> None:
+        """Count a failed login and start or extend the back-off.
+
+        Args:
+            email: Email from the login request
+            client_ip: Client IP address
+        """
+        now = time.time()
+        free_attempts = {"email": self.free_attempts_per_email, "ip": self.free_attempts_per_ip}
+        for scope, value in self._scopes(email, client_ip):
+            failures = await self.store.incr(
+                f"login:fail:{scope}:{value}", ttl_seconds=self.failure_window_seconds
+            )
+            if failures < free_attempts[scope]:
+                continue
+            exponent = min(failures - free_attempts[scope], MAX_BACKOFF_EXPONENT)
+            delay = min(self.max_delay_seconds, self.base_delay_seconds * 2 ** exponent)
+            await self.store.set(f"login:block:{scope}:{value}", now + delay, ttl_seconds=delay)
+
+    async def record_success(self, email: str) -> None:
+        """Clear the email's failure history after a successful login.
+
+        Args:
+            email: Email from the login request
+        """
+        value = email.strip().lower()
+        await self.store.delete(f"login:fail:email:{value}", f"login:block:email:{value}")
+
+
+# Global login throttle instance
+login_throttle = LoginThrottle(
+    free_attempts_per_email=settings.LOGIN_FREE_ATTEMPTS_PER_EMAIL,
+    free_attempts_per_ip=settings.LOGIN_FREE_ATTEMPTS_PER_IP,
+    base_delay_seconds=settings.LOGIN_BACKOFF_BASE_SECONDS,
+    max_delay_seconds=settings.LOGIN_BACKOFF_MAX_SECONDS,
+    failure_window_seconds=settings.LOGIN_FAILURE_WINDOW_SECONDS,
+)
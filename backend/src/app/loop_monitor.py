@@ -0,0 +1,156 @@
+"""Event-loop lag monitor and blocking-call detector."""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, Optional
+
+from .config import settings
+
+logger = logging.getLogger("app")
+
+
+class LoopMonitor:
+    """Measures how late the event loop wakes up a periodic heartbeat.
+
+    A heartbeat task sleeps for `interval_seconds`; any extra delay before it
+    runs again is time the loop spent on something that did not yield
+    (bcrypt, synchronous file I/O, CPU-heavy code). Lag above
+    `threshold_seconds` is logged and counted as a stall.
+
+    With `capture_stacks`, a watchdog thread notices a stall while it is
+    still happening and logs the loop thread's current stack, which points
+    at the blocking call rather than at the heartbeat.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = 0.5,
+        threshold_seconds: float = 0.1,
+        capture_stacks: bool = False,
+    ):
+        """Initialize monitor.
+
+        Args:
+            interval_seconds: Heartbeat period
+            threshold_seconds: Lag reported as a stall
+            capture_stacks: Capture the loop thread's stack during stalls
+        """
+        self.interval_seconds = interval_seconds
+        self.threshold_seconds = threshold_seconds
+        self.capture_stacks = capture_stacks
+
+        self.samples = 0
+        self.stalls = 0
+        self.lag_last = 0.0
+        self.lag_max = 0.0
+        self.lag_total = 0.0
+        self.last_stall_stack: Optional[str] = None
+
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._reported_beat = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the heartbeat (and watchdog thread) on the running loop."""
+        if self.running:
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat(), name="loop-monitor")
+
+        if self.capture_stacks:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True)
+            self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop the heartbeat and watchdog."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval_seconds)
+            self.record(max(0.0, loop.time() - started - self.interval_seconds))
+
+    def record(self, lag: float) -> None:
+        """Record one lag sample.
+
+        Args:
+            lag: Seconds the heartbeat ran late
+        """
+        self.samples += 1
+        self.lag_last = lag
+        self.lag_total += lag
+        self.lag_max = max(self.lag_max, lag)
+        if lag >= self.threshold_seconds:
+            self.stalls += 1
+            logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms")
+
+    def _watch(self) -> None:
+        """Watchdog thread: capture the loop thread's stack during a stall."""
+        while not self._stop.wait(self.threshold_seconds / 2):
+            beat = self._last_beat
+            overdue = time.monotonic() - beat - self.interval_seconds
+            if overdue < self.threshold_seconds or beat == self._reported_beat:
+                continue
+
+            self._reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>"
+            self.last_stall_stack = stack
+            logger.warning(
+                f"Event loop blocked for over {overdue * 1000:.0f} ms; loop thread stack:\n{stack}"
+            )
+
+    def snapshot(self, include_stack: bool = False) -> Dict[str, Any]:
+        """Current lag metrics.
+
+        Args:
+            include_stack: Add the stack captured during the last stall
+                (admins only: it exposes code paths and arguments)
+
+        Returns:
+            Dict with sample count, last/max/mean lag in ms and stall count
+        """
+        data: Dict[str, Any] = {
+            "enabled": self.running,
+            "samples": self.samples,
+            "lag_ms_last": round(self.lag_last * 1000, 3),
+            "lag_ms_max": round(self.lag_max * 1000, 3),
+            "lag_ms_mean": round(self.lag_total / self.samples * 1000, 3) if self.samples else 0.0,
+            "stalls": self.stalls,
+            "threshold_ms": round(self.threshold_seconds * 1000, 3),
+        }
+        if include_stack and self.capture_stacks:
+            data["last_stall_stack"] = self.last_stall_stack
+        return data
+
+
+# Global monitor instance (started from the lifespan when LOOP_MONITOR_ENABLED)
+loop_monitor = LoopMonitor(
+    interval_seconds=settings.LOOP_MONITOR_INTERVAL_SECONDS,
+    threshold_seconds=settings.LOOP_LAG_THRESHOLD_MS / 1000,
+    capture_stacks=settings.DEBUG,
+)
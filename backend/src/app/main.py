@@ -1,6 +1,7 @@
 """FastAPI application factory and configuration (Task 02-049)."""
 
 import logging
+import logging.config
 from contextlib import asynccontextmanager
 
 from fastapi import APIRouter, FastAPI, Request, status
@@ -9,15 +10,24 @@ from starlette.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import OperationalError
 
+from .api.v1.admin import router as admin_router
 from .api.v1.auth import router as auth_router
 from .api.v1.chat import router as chat_router
+from .api.v1.conversations import router as conversations_router
 from .api.v1.health import router as health_router
 from .api.v1.tasks import router as tasks_router
 from .api.v1.users import router as users_router
+from .background import start_background_tasks, stop_background_tasks
 from .config import settings
 from .database import create_db_and_tables
+from .logging_config import get_logger_config
+from .loop_monitor import loop_monitor
+from .middleware.profiling import ProfileRequestMiddleware
 from .middleware.rate_limit import rate_limit_middleware
+from .middleware.tracing import TracingMiddleware
+from .tracing import instrument_routes, tracer
 
+logging.config.dictConfig(get_logger_config())
 logger = logging.getLogger("app")
 
 
@@ -32,21 +42,32 @@ async def lifespan(app: FastAPI):
     
     # Startup
     logger.info("Starting up application...")
-    try:
-        # Try to create tables, but give up after 5 seconds so app can start
-        # The database might be waking up (Neon cold start takes ~3-5s)
-        await asyncio.wait_for(create_db_and_tables(), timeout=5.0)
-        logger.info("Database tables created/verified")
-    except asyncio.TimeoutError:
-         logger.warning("Database table creation timed out (continuing startup). Tables will be created on next run.")
-    except Exception as e:
-        # Catch ALL errors so the app never crashes during startup
-        logger.warning(f"Database initialization failed (safe to ignore on cold start): {e}")
+    if not settings.AUTO_CREATE_TABLES:
+        # Schema is managed by `python -m app.migrate`; skip per-boot inspection
+        logger.info("Skipping schema creation (AUTO_CREATE_TABLES is off)")
+    else:
+        try:
+            # Try to create tables, but give up after 5 seconds so app can start
+            # The database might be waking up (Neon cold start takes ~3-5s)
+            await asyncio.wait_for(create_db_and_tables(), timeout=5.0)
+            logger.info("Database tables created/verified")
+        except asyncio.TimeoutError:
+            logger.warning("Database table creation timed out (continuing startup). Tables will be created on next run.")
+        except Exception as e:
+            # Catch ALL errors so the app never crashes during startup
+            logger.warning(f"Database initialization failed (safe to ignore on cold start): {e}")
+
+    background_tasks = start_background_tasks()
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
 
     yield
 
     # Shutdown
     logger.info("Shutting down application...")
+    await loop_monitor.stop()
+    await stop_background_tasks(background_tasks)
+    await asyncio.to_thread(tracer.shutdown)
 
 
 def create_app() -> FastAPI:
@@ -135,6 +156,8 @@ def create_app() -> FastAPI:
     app.include_router(users_router, prefix="/api")
     app.include_router(tasks_router, prefix="/api")
     app.include_router(chat_router, prefix="/api")
+    app.include_router(conversations_router, prefix="/api")
+    app.include_router(admin_router, prefix="/api")
 
     @app.get("/api/diagnose")
     async def diagnose_system() -> dict:
@@ -236,6 +259,15 @@ def create_app() -> FastAPI:
         expose_headers=["*"],
     )
 
+    # 3. Profiling (`?__profile=1` profiles everything inside it)
+    app.add_middleware(ProfileRequestMiddleware)
+
+    # 4. Tracing (Outermost - request id and root span cover the whole request)
+    app.add_middleware(TracingMiddleware)
+
+    if tracer.enabled:
+        instrument_routes(app)
+
     return app
 
 
@@ -1,17 +1,35 @@
+from datetime import datetime
 from typing import Optional, List
 from uuid import UUID
 
 from mcp.server.fastmcp import FastMCP
+from sqlalchemy import and_, or_
 from sqlmodel import select, col
 from sqlalchemy.orm import selectinload
 
 from app.database import async_session
 from app.db.models import Task, TaskStatus, TaskPriority
+from app.pagination import decode_cursor, encode_cursor
+from app.services.task import bump_tasks_version
 
 # Create an MCP server instance
 # We can name it 'todo-server'
 mcp = FastMCP("todo-server")
 
+# list_tasks output is fed back into the model context, so keep it bounded
+LIST_TASKS_DEFAULT_LIMIT = 20
+LIST_TASKS_MAX_LIMIT = 100
+LIST_TASKS_TITLE_WIDTH = 80
+
+# Tools that never change task state; chat answers that only used these can be cached
+READ_ONLY_TOOLS = frozenset({"list_tasks"})
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough LLM token estimate (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
 @mcp.tool()
 async def add_task(user_id: str, title: str, description: Optional[str] = None) -> str:
     """Create a new task for the user."""
@@ -26,6 +44,7 @@ async def add_task(user_id: str, title: str, description: Optional[str] = None)
                 priority=TaskPriority.MEDIUM
             )
             session.add(task)
+            await bump_tasks_version(session, user_uuid)
             await session.commit()
             await session.refresh(task)
             return f"Task created with ID: {task.id}"
@@ -35,34 +54,82 @@ async def add_task(user_id: str, title: str, description: Optional[str] = None)
         return f"Error creating task: {str(e)}"
 
 @mcp.tool()
-async def list_tasks(user_id: str, status: str = "all") -> str:
-    """List tasks for a user. Status can be 'all', 'pending', or 'completed'."""
+async def list_tasks(
+    user_id: str,
+    status: str = "all",
+    priority: str = "all",
+    due_before: str = "",
+    due_after: str = "",
+    limit: int = LIST_TASKS_DEFAULT_LIMIT,
+    cursor: str = "",
+) -> str:
+    """List tasks for a user, newest first, as a compact table.
+
+    Status can be 'all', 'pending', or 'completed'. Priority can be 'all', 'low',
+    'medium', or 'high'. due_before/due_after take ISO dates (YYYY-MM-DD).
+    At most `limit` rows (max 100) are returned; pass the returned next_cursor
+    to fetch the following page.
+    """
     try:
         user_uuid = UUID(user_id)
+        limit = max(1, min(int(limit), LIST_TASKS_MAX_LIMIT))
+
+        # Only fetch the columns that end up in the table
+        query = select(
+            Task.id, Task.title, Task.status, Task.priority, Task.due_date, Task.created_at
+        ).where(Task.user_id == user_uuid)
+
+        if status.lower() == "pending":
+            query = query.where(Task.status == TaskStatus.PENDING)
+        elif status.lower() == "completed":
+            query = query.where(Task.status == TaskStatus.COMPLETED)
+
+        if priority.lower() != "all":
+            query = query.where(Task.priority == TaskPriority(priority.lower()))
+
+        if due_before:
+            query = query.where(Task.due_date < datetime.fromisoformat(due_before))
+        if due_after:
+            query = query.where(Task.due_date >= datetime.fromisoformat(due_after))
+
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            query = query.where(
+                or_(
+                    Task.created_at < cursor_created_at,
+                    and_(Task.created_at == cursor_created_at, Task.id < cursor_id),
+                )
+            )
+
+        # Keyset order; fetch one extra row to know whether another page exists
+        query = query.order_by(Task.created_at.desc(), Task.id.desc()).limit(limit + 1)
+
         async with async_session() as session:
-            query = select(Task).where(Task.user_id == user_uuid)
-            
-            if status.lower() == "pending":
-                query = query.where(Task.status == TaskStatus.PENDING)
-            elif status.lower() == "completed":
-                query = query.where(Task.status == TaskStatus.COMPLETED)
-                
-            # Order by created_at desc
-            query = query.order_by(Task.created_at.desc())
-            
             result = await session.execute(query)
-            tasks = result.scalars().all()
-            
-            if not tasks:
-                return "No tasks found."
-            
-            task_list = []
-            for t in tasks:
-                task_list.append(f"[{t.status.value}] {t.title} (ID: {t.id})")
-            
-            return "\n".join(task_list)
+            rows = result.all()
+
+        if not rows:
+            return "No tasks found."
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        lines = ["id|status|priority|due|title"]
+        for row in rows:
+            due = row.due_date.date().isoformat() if row.due_date else "-"
+            title = row.title.replace("|", "/").replace("\n", " ")
+            if len(title) > LIST_TASKS_TITLE_WIDTH:
+                title = title[: LIST_TASKS_TITLE_WIDTH - 3] + "..."
+            lines.append(f"{row.id}|{row.status.value}|{row.priority.value}|{due}|{title}")
+
+        if has_more:
+            last = rows[-1]
+            lines.append(f"next_cursor: {encode_cursor(last.created_at, last.id)}")
+
+        output = "\n".join(lines)
+        return f"{output}\n(rows: {len(rows)}, ~{_estimate_tokens(output)} tokens)"
     except ValueError:
-        return "Error: Invalid user_id format."
+        return "Error: Invalid user_id, priority, date or cursor format."
     except Exception as e:
         return f"Error listing tasks: {str(e)}"
 
@@ -84,6 +151,7 @@ async def complete_task(user_id: str, task_id: str) -> str:
             task.status = TaskStatus.COMPLETED
             # task.completed_at = datetime.utcnow() # If model has it
             session.add(task)
+            await bump_tasks_version(session, user_uuid)
             await session.commit()
             await session.refresh(task)
             
@@ -109,6 +177,7 @@ async def delete_task(user_id: str, task_id: str) -> str:
                 return f"Task with ID {task_id} not found."
             
             await session.delete(task)
+            await bump_tasks_version(session, user_uuid)
             await session.commit()
             
             return f"Task '{task.title}' deleted."
@@ -138,6 +207,7 @@ async def update_task(user_id: str, task_id: str, title: Optional[str] = None, d
                 task.description = description
                 
             session.add(task)
+            await bump_tasks_version(session, user_uuid)
             await session.commit()
             await session.refresh(task)
             
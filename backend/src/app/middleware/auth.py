@@ -4,9 +4,9 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import Request
-from jose import JWTError, jwt
 
-from ..config import settings
+from ..revocation import revocation_list
+from ..security import hash_token, verify_token
 
 
 async def verify_token_from_cookie(request: Request) -> Optional[dict]:
@@ -21,6 +21,7 @@ async def verify_token_from_cookie(request: Request) -> Optional[dict]:
     Security:
         - Validates JWT signature with SECRET_KEY
         - Checks token type is "access"
+        - Rejects tokens revoked by logout
         - Returns None on any verification failure (no exceptions)
     """
     # Extract access_token from cookies
@@ -29,17 +30,19 @@ async def verify_token_from_cookie(request: Request) -> Optional[dict]:
         return None
 
     try:
-        # Verify JWT signature and expiration
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
+        # Verify JWT signature and expiration (cached per token)
+        payload = verify_token(token)
 
         # Verify token type is "access" (not "refresh")
         if payload.get("type") != "access":
             return None
 
+        await revocation_list.ensure_fresh()
+        if revocation_list.is_revoked(hash_token(token)):
+            return None
+
         return payload
-    except JWTError:
+    except ValueError:
         # Invalid signature, expired, or malformed
         return None
     except Exception:
@@ -0,0 +1,68 @@
+"""Per-request profiling via `?__profile=1` (admins only, PROFILING_ENABLED)."""
+
+import threading
+
+from fastapi import Request
+from fastapi.responses import PlainTextResponse
+
+from ..config import settings
+from ..profiling import StackSampler, request_is_admin
+
+# Single requests are short; sample at least this often
+REQUEST_SAMPLE_INTERVAL_SECONDS = 0.001
+
+
+class ProfileRequestMiddleware:
+    """Replace the response with a collapsed-stack profile of the request.
+
+    Written as plain ASGI so requests without `__profile=` in the query
+    string pass through with a single byte-string check. The event loop
+    thread is sampled while the request runs; other requests served
+    concurrently by the same worker show up in the profile too.
+
+    The original status code is returned in the X-Profiled-Status header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.PROFILING_ENABLED
+            or b"__profile=" not in scope.get("query_string", b"")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        if request.query_params.get("__profile") != "1" or not await request_is_admin(request):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 0
+
+        async def discard(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        sampler = StackSampler(
+            interval_seconds=min(settings.PROFILING_SAMPLE_INTERVAL_MS / 1000, REQUEST_SAMPLE_INTERVAL_SECONDS),
+            thread_ids=[threading.get_ident()],
+        )
+        sampler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            sampler.stop()
+
+        response = PlainTextResponse(
+            sampler.collapsed(),
+            headers={
+                "X-Profiled-Status": str(status_code),
+                "X-Profile-Samples": str(sampler.samples),
+                "Cache-Control": "no-store",
+            },
+        )
+        await response(scope, receive, send)
@@ -1,26 +1,31 @@
 """Rate limiting middleware for FastAPI application."""
 
 import time
-from collections import defaultdict
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
 
+from ..rate_limit_store import RateLimitStore, rate_limit_store
+
+# Length of a rate limit window
+WINDOW_SECONDS = 60
+
 
 class RateLimiter:
-    """Simple in-memory rate limiter."""
+    """Fixed-window rate limiter backed by a RateLimitStore."""
 
-    def __init__(self, requests_per_minute: int = 60):
+    def __init__(self, requests_per_minute: int = 60, store: Optional[RateLimitStore] = None):
         """Initialize rate limiter.
 
         Args:
             requests_per_minute: Max requests allowed per minute per IP
+            store: Counter storage (defaults to the shared per-worker store)
         """
         self.requests_per_minute = requests_per_minute
-        self.requests: Dict[str, list[float]] = defaultdict(list)
+        self.store = store or rate_limit_store
 
-    def is_allowed(self, client_ip: str) -> Tuple[bool, Dict]:
+    async def is_allowed(self, client_ip: str) -> Tuple[bool, Dict]:
         """Check if request is allowed.
 
         Args:
@@ -29,28 +34,15 @@ class RateLimiter:
         Returns:
             Tuple of (allowed: bool, headers: dict with rate limit info)
         """
-        now = time.time()
-        minute_ago = now - 60
-
-        # Remove old requests outside the 1-minute window
-        self.requests[client_ip] = [
-            req_time for req_time in self.requests[client_ip]
-            if req_time > minute_ago
-        ]
-
-        # Get current count
-        current_count = len(self.requests[client_ip])
-        allowed = current_count < self.requests_per_minute
-
-        # Add current request if allowed
-        if allowed:
-            self.requests[client_ip].append(now)
+        window = int(time.time() // WINDOW_SECONDS)
+        count = await self.store.incr(f"rate:{client_ip}:{window}", ttl_seconds=WINDOW_SECONDS)
+        allowed = count <= self.requests_per_minute
 
         # Return headers for rate limit info
         headers = {
             "X-RateLimit-Limit": str(self.requests_per_minute),
-            "X-RateLimit-Remaining": str(max(0, self.requests_per_minute - current_count - 1)),
-            "X-RateLimit-Reset": str(int(now) + 60),
+            "X-RateLimit-Remaining": str(max(0, self.requests_per_minute - count)),
+            "X-RateLimit-Reset": str((window + 1) * WINDOW_SECONDS),
         }
 
         return allowed, headers
@@ -74,7 +66,7 @@ async def rate_limit_middleware(request: Request, call_next):
     client_ip = request.client.host if request.client else "unknown"
 
     # Check rate limit
-    allowed, headers = rate_limiter.is_allowed(client_ip)
+    allowed, headers = await rate_limiter.is_allowed(client_ip)
 
     if not allowed:
         return JSONResponse(
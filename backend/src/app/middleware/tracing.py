@@ -0,0 +1,68 @@
+"""Request id and root span for every HTTP request."""
+
+import re
+import uuid
+
+from ..tracing import SPAN_KIND_SERVER, parse_traceparent, request_id_var, tracer
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+# Accept caller-supplied ids only if they are short and log-safe
+_VALID_REQUEST_ID = re.compile(rb"^[A-Za-z0-9._:-]{1,128}$")
+
+
+class TracingMiddleware:
+    """Assign a request id and open the request's root span.
+
+    The id comes from an incoming X-Request-ID header (if well-formed) or
+    is generated, is echoed in the response's X-Request-ID header and is
+    available to logging through tracing.request_id_var. With tracing on,
+    a W3C traceparent header continues the caller's trace.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER and _VALID_REQUEST_ID.match(value):
+                request_id = value
+            elif name == b"traceparent":
+                traceparent = value
+        request_id = request_id or uuid.uuid4().hex.encode()
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER, request_id)]
+                span.set_attribute("http.status_code", message["status"])
+            await send(message)
+
+        trace_id = parent_span_id = None
+        if tracer.enabled and traceparent:
+            parsed = parse_traceparent(traceparent.decode("latin-1"))
+            if parsed:
+                trace_id, parent_span_id = parsed
+
+        token = request_id_var.set(request_id.decode())
+        span = tracer.start_trace(
+            f"{scope['method']} {scope['path']}",
+            SPAN_KIND_SERVER,
+            trace_id=trace_id,
+            parent_span_id=parent_span_id,
+            attributes={
+                "http.method": scope["method"],
+                "http.target": scope["path"],
+                "http.request_id": request_id.decode(),
+            },
+        )
+        try:
+            with span:
+                await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,117 @@
+"""Schema migration CLI wrapping Alembic and migrations/env.py.
+
+Usage:
+    python -m app.migrate                 # upgrade to head
+    python -m app.migrate upgrade head
+    python -m app.migrate downgrade -1
+    python -m app.migrate current
+    python -m app.migrate stamp head
+
+The application no longer creates tables at startup (see AUTO_CREATE_TABLES in
+config.py); run this once per deploy instead.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+logger = logging.getLogger("app")
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+# backend/alembic.ini when running from a source checkout; absent in the Docker image
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# First Alembic revision; databases created by the old create_all startup path
+# already contain its tables and are stamped at it before upgrading.
+BASELINE_REVISION = "e6de8159cce1"
+
+
+def get_alembic_config() -> Config:
+    """Build the Alembic config, pointing script_location at this package.
+
+    Returns:
+        Alembic Config instance
+    """
+    if ALEMBIC_INI.exists():
+        config = Config(str(ALEMBIC_INI))
+    else:
+        config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    return config
+
+
+async def _is_unversioned_legacy_schema() -> bool:
+    """Check for tables created by create_all without an alembic_version table."""
+    from .database import engine
+
+    def check(sync_conn) -> bool:
+        inspector = inspect(sync_conn)
+        return inspector.has_table("users") and not inspector.has_table("alembic_version")
+
+    try:
+        async with engine.connect() as conn:
+            return await conn.run_sync(check)
+    finally:
+        await engine.dispose()
+
+
+def upgrade(revision: str = "head") -> None:
+    """Apply Alembic revisions (including the task/message index migrations).
+
+    Args:
+        revision: Target revision (default: head)
+    """
+    config = get_alembic_config()
+    if asyncio.run(_is_unversioned_legacy_schema()):
+        logger.info(f"Existing schema without version table, stamping {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, revision)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the `migrate` console script.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(prog="migrate", description="Apply database migrations")
+    subparsers = parser.add_subparsers(dest="command")
+
+    upgrade_parser = subparsers.add_parser("upgrade", help="Upgrade to a revision")
+    upgrade_parser.add_argument("revision", nargs="?", default="head")
+
+    downgrade_parser = subparsers.add_parser("downgrade", help="Downgrade to a revision")
+    downgrade_parser.add_argument("revision")
+
+    stamp_parser = subparsers.add_parser("stamp", help="Set the revision without migrating")
+    stamp_parser.add_argument("revision")
+
+    subparsers.add_parser("current", help="Show the current revision")
+
+    args = parser.parse_args(argv)
+    config = get_alembic_config()
+
+    if args.command in (None, "upgrade"):
+        upgrade(getattr(args, "revision", "head"))
+    elif args.command == "downgrade":
+        command.downgrade(config, args.revision)
+    elif args.command == "stamp":
+        command.stamp(config, args.revision)
+    elif args.command == "current":
+        command.current(config)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
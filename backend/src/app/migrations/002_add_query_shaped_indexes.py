@@ -0,0 +1,58 @@
+"""Migration: Replace broad task indexes with indexes shaped like the real queries.
+
+Query shapes served:
+- GET /tasks and MCP list_tasks: WHERE user_id = ? [AND status/priority] ORDER BY created_at DESC
+  -> covering (user_id, created_at DESC) index; list_tasks can run as an index-only scan.
+- Pending lists and due-date filters: WHERE user_id = ? AND status = 'PENDING' ...
+  -> partial indexes that only contain pending rows (completed tasks never bloat them).
+- Chat history: WHERE conversation_id = ? ORDER BY created_at
+  -> messages(conversation_id, created_at).
+"""
+
+from sqlalchemy import text
+
+
+def upgrade(connection):
+    """Create query-shaped indexes on tasks and messages."""
+    # INCLUDE is PostgreSQL-only; other backends get the plain key columns
+    include = ""
+    if connection.dialect.name == "postgresql":
+        include = " INCLUDE (id, status, priority, due_date, title)"
+
+    # Covering index for list pages (newest first)
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_created_covering "
+        f"ON tasks(user_id, created_at DESC){include}"
+    ))
+
+    # Pending-only list ordered by creation date
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_pending_created "
+        "ON tasks(user_id, created_at DESC) WHERE status = 'PENDING'"
+    ))
+
+    # Pending-only due-date lookups (upcoming / overdue)
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_pending_due "
+        "ON tasks(user_id, due_date) WHERE status = 'PENDING'"
+    ))
+
+    # Chat history replay in order
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_messages_conversation_created "
+        "ON messages(conversation_id, created_at)"
+    ))
+
+    # Same key as the covering index above, so it is redundant
+    connection.execute(text("DROP INDEX IF EXISTS idx_tasks_user_created"))
+
+
+def downgrade(connection):
+    """Drop query-shaped indexes and restore the broad created_at index."""
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_created ON tasks(user_id, created_at DESC)"
+    ))
+    connection.execute(text("DROP INDEX IF EXISTS idx_messages_conversation_created"))
+    connection.execute(text("DROP INDEX IF EXISTS idx_tasks_user_pending_due"))
+    connection.execute(text("DROP INDEX IF EXISTS idx_tasks_user_pending_created"))
+    connection.execute(text("DROP INDEX IF EXISTS idx_tasks_user_created_covering"))
@@ -0,0 +1,46 @@
+"""apply_task_and_message_indexes
+
+Runs the hand-written index migrations (001_add_task_indexes.py,
+002_add_query_shaped_indexes.py) as part of the Alembic chain so that
+`python -m app.migrate` applies them together with the schema.
+
+Revision ID: 3f9a1c2b7d10
+Revises: e6de8159cce1
+Create Date: 2026-10-19 09:12:41.118204
+
+"""
+import importlib.util
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2b7d10'
+down_revision: Union[str, None] = 'e6de8159cce1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_MIGRATIONS = ["001_add_task_indexes.py", "002_add_query_shaped_indexes.py"]
+
+
+def _load(filename: str):
+    """Import a numbered migration module by file name."""
+    path = Path(__file__).resolve().parent.parent / filename
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    for filename in INDEX_MIGRATIONS:
+        _load(filename).upgrade(connection)
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    for filename in reversed(INDEX_MIGRATIONS):
+        _load(filename).downgrade(connection)
@@ -0,0 +1,62 @@
+"""store_refresh_token_digests
+
+Replaces refresh_tokens.token (full JWT text) with token_hash (SHA-256 hex
+digest) and indexes expires_at for batch pruning. Expired rows are deleted
+first; live tokens are backfilled so existing sessions keep working.
+
+Revision ID: 8b4e2d6f1a93
+Revises: 3f9a1c2b7d10
+Create Date: 2026-10-19 10:02:17.540391
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4e2d6f1a93'
+down_revision: Union[str, None] = '3f9a1c2b7d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    connection.execute(sa.text("DELETE FROM refresh_tokens WHERE expires_at < CURRENT_TIMESTAMP"))
+
+    op.add_column('refresh_tokens', sa.Column('token_hash', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True))
+
+    if connection.dialect.name == "postgresql":
+        connection.execute(sa.text(
+            "UPDATE refresh_tokens SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex')"
+        ))
+    else:
+        rows = connection.execute(sa.text("SELECT id, token FROM refresh_tokens")).fetchall()
+        for row_id, token in rows:
+            connection.execute(
+                sa.text("UPDATE refresh_tokens SET token_hash = :token_hash WHERE id = :id"),
+                {"token_hash": hashlib.sha256(token.encode("utf-8")).hexdigest(), "id": row_id},
+            )
+
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.drop_index('ix_refresh_tokens_token')
+        batch_op.drop_column('token')
+        batch_op.alter_column('token_hash', nullable=False)
+        batch_op.create_index(batch_op.f('ix_refresh_tokens_token_hash'), ['token_hash'], unique=True)
+        batch_op.create_index(batch_op.f('ix_refresh_tokens_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    # Digests cannot be turned back into tokens; affected users log in again
+    op.execute("DELETE FROM refresh_tokens")
+
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_refresh_tokens_expires_at'))
+        batch_op.drop_index(batch_op.f('ix_refresh_tokens_token_hash'))
+        batch_op.drop_column('token_hash')
+        batch_op.add_column(sa.Column('token', sqlmodel.sql.sqltypes.AutoString(), nullable=False))
+        batch_op.create_index(batch_op.f('ix_refresh_tokens_token'), ['token'], unique=True)
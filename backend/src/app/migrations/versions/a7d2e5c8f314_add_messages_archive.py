@@ -0,0 +1,81 @@
+"""add_messages_archive
+
+Adds messages_archive, the cold table that the messages of inactive
+conversations move to (conversations.archived_at marks them). On
+PostgreSQL, messages.tool_calls becomes JSONB, and from PostgreSQL 14 the
+large columns (content, tool_calls) are TOAST-compressed with lz4. Only
+values written afterwards are compressed with lz4; existing rows keep pglz
+until they are rewritten (e.g. archived or restored).
+
+Revision ID: a7d2e5c8f314
+Revises: f3c9a61d7e24
+Create Date: 2026-10-19 14:02:51.381644
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2e5c8f314'
+down_revision: Union[str, None] = 'f3c9a61d7e24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COMPRESSED_COLUMNS = ('content', 'tool_calls')
+
+
+def _supports_lz4() -> bool:
+    """Whether the server offers lz4 TOAST compression (PostgreSQL 14+ built with lz4)."""
+    result = op.get_bind().execute(
+        sa.text("SELECT enumvals FROM pg_settings WHERE name = 'default_toast_compression'")
+    ).scalar()
+    return bool(result) and 'lz4' in result
+
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('archived_at', sa.DateTime(), nullable=True))
+    op.create_table('messages_archive',
+    sa.Column('id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('conversation_id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+    sa.Column('user_id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+    sa.Column('role', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('content', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('tool_calls', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=True),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_messages_archive_conversation_id'), 'messages_archive', ['conversation_id'], unique=False)
+
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("ALTER TABLE messages ALTER COLUMN tool_calls TYPE JSONB USING tool_calls::jsonb")
+    if _supports_lz4():
+        for table in ('messages', 'messages_archive'):
+            for column in _COMPRESSED_COLUMNS:
+                op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION lz4")
+
+
+def downgrade() -> None:
+    # Archived conversations become live again
+    op.execute(
+        "INSERT INTO messages (id, created_at, updated_at, conversation_id, user_id, role, content, tool_calls) "
+        "SELECT id, created_at, updated_at, conversation_id, user_id, role, content, tool_calls "
+        "FROM messages_archive"
+    )
+    if op.get_bind().dialect.name == 'postgresql':
+        if _supports_lz4():
+            for column in _COMPRESSED_COLUMNS:
+                op.execute(f"ALTER TABLE messages ALTER COLUMN {column} SET COMPRESSION DEFAULT")
+        op.execute("ALTER TABLE messages ALTER COLUMN tool_calls TYPE JSON USING tool_calls::json")
+    op.drop_index(op.f('ix_messages_archive_conversation_id'), table_name='messages_archive')
+    op.drop_table('messages_archive')
+    with op.batch_alter_table('conversations') as batch_op:
+        batch_op.drop_column('archived_at')
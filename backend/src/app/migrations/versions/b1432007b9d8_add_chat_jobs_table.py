@@ -0,0 +1,48 @@
+"""add_chat_jobs_table
+
+Revision ID: b1432007b9d8
+Revises: c51d7e3a0b28
+Create Date: 2026-10-19 06:57:27.980587
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1432007b9d8'
+down_revision: Union[str, None] = 'c51d7e3a0b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('chat_jobs',
+    sa.Column('id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('user_id', sqlmodel.sql.sqltypes.GUID(), nullable=False),
+    sa.Column('conversation_id', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True),
+    sa.Column('message', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', name='chatjobstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('locked_until', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Workers claim the oldest claimable job
+    op.create_index('idx_chat_jobs_status_created_at', 'chat_jobs', ['status', 'created_at'], unique=False)
+    op.create_index(op.f('ix_chat_jobs_user_id'), 'chat_jobs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_chat_jobs_user_id'), table_name='chat_jobs')
+    op.drop_index('idx_chat_jobs_status_created_at', table_name='chat_jobs')
+    op.drop_table('chat_jobs')
+    sa.Enum(name='chatjobstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,35 @@
+"""add_chat_job_idempotency_key
+
+Records the Idempotency-Key of chat requests on chat_jobs, unique per user,
+so a retried request finds the turn it repeats.
+
+Revision ID: c8e1f4a92b57
+Revises: a7d2e5c8f314
+Create Date: 2026-10-19 15:26:40.118372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e1f4a92b57'
+down_revision: Union[str, None] = 'a7d2e5c8f314'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_jobs', sa.Column('idempotency_key', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True))
+    op.create_index(
+        'uq_chat_jobs_user_idempotency_key', 'chat_jobs', ['user_id', 'idempotency_key'], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_chat_jobs_user_idempotency_key', table_name='chat_jobs')
+    with op.batch_alter_table('chat_jobs') as batch_op:
+        batch_op.drop_column('idempotency_key')
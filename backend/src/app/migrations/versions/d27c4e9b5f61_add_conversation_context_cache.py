@@ -0,0 +1,34 @@
+"""add_conversation_context_cache
+
+Tracks the provider-side cached prompt prefix of each conversation.
+
+Revision ID: d27c4e9b5f61
+Revises: b1432007b9d8
+Create Date: 2026-10-19 07:30:12.418306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd27c4e9b5f61'
+down_revision: Union[str, None] = 'b1432007b9d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('context_cache_name', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True))
+    op.add_column('conversations', sa.Column('context_cache_expires_at', sa.DateTime(), nullable=True))
+    op.add_column('conversations', sa.Column('context_cache_messages', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('conversations') as batch_op:
+        batch_op.drop_column('context_cache_messages')
+        batch_op.drop_column('context_cache_expires_at')
+        batch_op.drop_column('context_cache_name')
@@ -0,0 +1,31 @@
+"""add_user_tasks_version
+
+Counts task changes per user. Every task write bumps it in the same
+transaction, so workers can tell whether their cached chat answers are
+current.
+
+Revision ID: d4b7a1e9c362
+Revises: c8e1f4a92b57
+Create Date: 2026-10-19 16:48:12.507219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b7a1e9c362'
+down_revision: Union[str, None] = 'c8e1f4a92b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('tasks_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('tasks_version')
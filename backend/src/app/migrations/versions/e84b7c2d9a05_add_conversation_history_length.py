@@ -0,0 +1,35 @@
+"""add_conversation_history_length
+
+Counts the messages with content in each conversation. Every chat turn
+bumps it, so workers can tell whether their cached history is current.
+
+Revision ID: e84b7c2d9a05
+Revises: d27c4e9b5f61
+Create Date: 2026-10-19 09:12:40.183527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e84b7c2d9a05'
+down_revision: Union[str, None] = 'd27c4e9b5f61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('history_length', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE conversations SET history_length = ("
+        "SELECT count(*) FROM messages "
+        "WHERE messages.conversation_id = conversations.id AND messages.content <> '')"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('conversations') as batch_op:
+        batch_op.drop_column('history_length')
@@ -0,0 +1,42 @@
+"""add_conversation_last_message_at
+
+Denormalizes the time of each conversation's latest message onto the
+conversation, indexed with its owner, so GET /api/conversations can list
+conversations by recent activity without touching messages.
+
+Revision ID: f3c9a61d7e24
+Revises: e84b7c2d9a05
+Create Date: 2026-10-19 10:41:07.552910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9a61d7e24'
+down_revision: Union[str, None] = 'e84b7c2d9a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('last_message_at', sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE conversations SET last_message_at = COALESCE("
+        "(SELECT max(messages.created_at) FROM messages WHERE messages.conversation_id = conversations.id), "
+        "conversations.created_at)"
+    )
+    with op.batch_alter_table('conversations') as batch_op:
+        batch_op.alter_column('last_message_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index(
+        'idx_conversations_user_last_message', 'conversations', ['user_id', 'last_message_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_conversations_user_last_message', table_name='conversations')
+    with op.batch_alter_table('conversations') as batch_op:
+        batch_op.drop_column('last_message_at')
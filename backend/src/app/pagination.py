@@ -0,0 +1,40 @@
+"""Opaque cursors for keyset pagination on (timestamp, id)."""
+
+import base64
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+
+def encode_cursor(position: datetime, row_id: UUID) -> str:
+    """Encode the (timestamp, id) keyset position of the last returned row.
+
+    Args:
+        position: Sort timestamp of the row
+        row_id: Row ID (breaks ties between equal timestamps)
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{position.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        (timestamp, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position, row_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return datetime.fromisoformat(position), UUID(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
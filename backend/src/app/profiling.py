@@ -0,0 +1,156 @@
+"""Sampling profiler producing flamegraph-compatible collapsed stacks.
+
+A background thread snapshots thread stacks with sys._current_frames()
+every few milliseconds and counts identical stacks. The output is the
+"collapsed" format read by flamegraph.pl, speedscope and inferno:
+
+    MainThread;main (server.py:12);handle (app.py:40) 17
+
+Only code holding the GIL shows up, so an idle event loop appears as its
+selector call and time spent waiting on I/O does not appear at all.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Iterable, Optional
+from uuid import UUID
+
+from fastapi import Request
+
+from .config import settings
+from .middleware.auth import verify_token_from_cookie
+from .user_cache import get_active_user
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return label.replace(";", ":")
+
+
+def collapse_stack(frame, prefix: str = "") -> str:
+    """Render a frame and its callers as one collapsed-stack line (root first).
+
+    Args:
+        frame: Innermost frame
+        prefix: Optional root label (e.g. thread name)
+
+    Returns:
+        Semicolon-separated stack
+    """
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    if prefix:
+        labels.append(prefix)
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """Samples thread stacks from a background thread."""
+
+    def __init__(self, interval_seconds: float = 0.005, thread_ids: Optional[Iterable[int]] = None):
+        """Initialize sampler.
+
+        Args:
+            interval_seconds: Time between samples
+            thread_ids: Threads to sample (default: all but the sampler)
+        """
+        self.interval_seconds = interval_seconds
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        """Stop sampling.
+
+        Returns:
+            Counter of collapsed stacks
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.counts
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if self.thread_ids is not None and thread_id not in self.thread_ids:
+                    continue
+                self.counts[collapse_stack(frame, names.get(thread_id, str(thread_id)))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Collapsed-stack text, most frequent stacks first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+# Only one worker-wide profile at a time: concurrent samplers skew each other
+_profile_lock = asyncio.Lock()
+
+
+async def profile_worker(seconds: float, interval_seconds: float) -> str:
+    """Sample every thread of this worker for `seconds`.
+
+    Args:
+        seconds: Profiling duration
+        interval_seconds: Time between samples
+
+    Returns:
+        Collapsed-stack text
+
+    Raises:
+        RuntimeError: If a profile is already running
+    """
+    if _profile_lock.locked():
+        raise RuntimeError("A profile is already running on this worker")
+
+    async with _profile_lock:
+        sampler = StackSampler(interval_seconds=interval_seconds)
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+        return sampler.collapsed()
+
+
+def is_admin_email(email: str) -> bool:
+    """Whether an email is listed in ADMIN_EMAILS."""
+    return email.strip().lower() in settings.admin_emails_list
+
+
+async def request_is_admin(request: Request) -> bool:
+    """Whether the request carries a valid access token of an admin user.
+
+    Args:
+        request: Incoming request (access_token cookie)
+
+    Returns:
+        True for admins
+    """
+    payload = await verify_token_from_cookie(request)
+    if not payload or not payload.get("sub"):
+        return False
+    try:
+        user = await get_active_user(UUID(payload["sub"]))
+    except ValueError:
+        return False
+    return user is not None and is_admin_email(user.email)
@@ -0,0 +1,110 @@
+"""Counter storage shared by the rate limiter and login throttling."""
+
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+# How often the in-memory store drops expired keys
+SWEEP_INTERVAL_SECONDS = 60
+
+
+class RateLimitStore(ABC):
+    """Key/value store of expiring numeric counters.
+
+    The operations map directly onto Redis (INCR + EXPIRE, GET, SET EX, DEL),
+    so a shared backend can replace the per-process default without touching
+    RateLimiter or LoginThrottle.
+    """
+
+    @abstractmethod
+    async def incr(self, key: str, ttl_seconds: float) -> int:
+        """Increment a counter, starting its TTL when the key is created.
+
+        Args:
+            key: Counter key
+            ttl_seconds: Lifetime of a newly created counter
+
+        Returns:
+            Counter value after the increment
+        """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[float]:
+        """Return the value of a live key, or None.
+
+        Args:
+            key: Key to read
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: float, ttl_seconds: float) -> None:
+        """Store a value with a TTL, replacing any existing one.
+
+        Args:
+            key: Key to write
+            value: Value to store
+            ttl_seconds: Lifetime of the key
+        """
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Remove keys (missing keys are ignored).
+
+        Args:
+            keys: Keys to remove
+        """
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """Per-process store: a dict of (value, expires_at) with periodic sweeps."""
+
+    def __init__(self):
+        """Initialize store."""
+        self._entries: Dict[str, Tuple[float, float]] = {}
+        self._next_sweep = time.monotonic() + SWEEP_INTERVAL_SECONDS
+
+    def _live(self, key: str, now: float) -> Optional[Tuple[float, float]]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] <= now:
+            del self._entries[key]
+            return None
+        return entry
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + SWEEP_INTERVAL_SECONDS
+        expired = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+
+    async def incr(self, key: str, ttl_seconds: float) -> int:
+        now = time.monotonic()
+        self._maybe_sweep(now)
+        entry = self._live(key, now)
+        if entry is None:
+            self._entries[key] = (1, now + ttl_seconds)
+            return 1
+        value = entry[0] + 1
+        self._entries[key] = (value, entry[1])
+        return int(value)
+
+    async def get(self, key: str) -> Optional[float]:
+        entry = self._live(key, time.monotonic())
+        return None if entry is None else entry[0]
+
+    async def set(self, key: str, value: float, ttl_seconds: float) -> None:
+        now = time.monotonic()
+        self._maybe_sweep(now)
+        self._entries[key] = (value, now + ttl_seconds)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global store instance (per worker process)
+rate_limit_store = InMemoryRateLimitStore()
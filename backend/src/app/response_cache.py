@@ -0,0 +1,139 @@
+"""Per-worker cache of chat answers to read-only questions."""
+
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from .config import settings
+from .schemas.chat import ChatResponse
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_prompt(message: str) -> str:
+    """Case, whitespace and punctuation-insensitive form of a chat message.
+
+    "What's due today?" and "what's due  today" share a key.
+
+    Args:
+        message: User message
+
+    Returns:
+        Normalized text
+    """
+    return _NON_WORD.sub(" ", message.lower()).strip()
+
+
+class ResponseCache:
+    """TTL + LRU cache of chat answers keyed by user, prompt and task-state version.
+
+    The version is `User.tasks_version`, which every task write (REST or MCP
+    tools, in any worker) bumps in its own transaction. run_chat_turn reads
+    it with the user on every turn, so a task change anywhere makes all of
+    that user's cached answers unreachable; they age out through LRU/TTL.
+    The key also carries the UTC date, so answers about "today" do not
+    survive midnight.
+
+    Only answers that needed no conversation history and ran nothing but
+    read-only tools are cached (see run_chat_turn).
+    """
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 300):
+        """Initialize cache.
+
+        Args:
+            max_size: Maximum number of cached answers (0 disables caching)
+            ttl_seconds: Lifetime of an entry
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[UUID, int, str, str], Tuple[float, ChatResponse]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, user_id: UUID, tasks_version: int, message: str) -> Tuple[UUID, int, str, str]:
+        """Cache key for a question asked now.
+
+        Args:
+            user_id: UUID of the asking user
+            tasks_version: The user's stored tasks_version, read in this turn
+            message: User message
+
+        Returns:
+            (user, task-state version, UTC date, normalized prompt)
+        """
+        today = datetime.now(timezone.utc).date().isoformat()
+        return user_id, tasks_version, today, normalize_prompt(message)
+
+    def get(self, key: Tuple[UUID, int, str, str]) -> Optional[ChatResponse]:
+        """Return the cached answer, or None if absent or stale.
+
+        Args:
+            key: Cache key from key_for()
+
+        Returns:
+            ChatResponse (without conversation_id) or None
+        """
+        if self.max_size <= 0:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key: Tuple[UUID, int, str, str], response: ChatResponse) -> None:
+        """Cache an answer.
+
+        Args:
+            key: Cache key from key_for() (taken before the model ran; if a
+                task changed meanwhile, the next lookup carries a newer
+                version and never reaches this entry)
+            response: Answer to store
+        """
+        if self.max_size <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response.model_copy(update={"conversation_id": ""}))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current size and counters.
+
+        Returns:
+            Dict with size, hits, misses and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Global cache instance (per worker process)
+response_cache = ResponseCache(
+    max_size=settings.RESPONSE_CACHE_SIZE,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
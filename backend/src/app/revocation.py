@@ -0,0 +1,310 @@
+"""In-memory mirror of the revoked_tokens table.
+
+Each worker keeps a Bloom filter plus an exact set of revoked token digests so
+that get_current_user can reject revoked tokens without a database query.
+The mirror is synced incrementally (rows created since the last watermark) by
+a lifespan background task, with an inline refresh as a fallback when no
+background task is running (e.g. on serverless). Each sync also drops the
+digests of tokens that have expired since, so the mirror only holds tokens
+that could still be presented.
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .config import settings
+from .db.models import RevokedToken
+
+logger = logging.getLogger("app")
+
+# Rows committed slightly out of created_at order are caught by re-reading this window
+SYNC_OVERLAP = timedelta(seconds=5)
+
+# Bytes of the SHA-256 digest kept in the exact set (128 bits)
+EXACT_KEY_BYTES = 16
+
+# Width of the expiry buckets; a digest is dropped at most this long after its token expired
+EXPIRY_BUCKET_SECONDS = 60
+
+
+class RevocationList:
+    """Bloom filter + exact set of revoked token digests.
+
+    The Bloom filter answers "definitely not revoked" for almost every request
+    with a few bit tests; only filter hits consult the exact set, which makes
+    the final answer exact (no false positives).
+
+    Digests are also filed in buckets by the expiry of their token, so
+    prune() drops expired ones without scanning the whole set. A Bloom
+    filter cannot forget, so once more digests were dropped than are still
+    held, compact() rebuilds it from the exact set, shrinking back towards
+    the initial capacity. sync() does both.
+    """
+
+    def __init__(self, capacity: int = 100000, false_positive_rate: float = 0.001):
+        """Initialize revocation list.
+
+        Args:
+            capacity: Expected number of revoked tokens before the filter is resized
+            false_positive_rate: Target Bloom filter false positive rate
+        """
+        self.false_positive_rate = false_positive_rate
+        self.initial_capacity = max(1, capacity)
+        self._revoked: Set[bytes] = set()
+        # Expiry bucket -> digests whose tokens expire in it; the heap orders the buckets
+        self._expiring: Dict[int, List[bytes]] = {}
+        self._buckets: List[int] = []
+        # Digests dropped since the filter was last built (their bits are still set)
+        self._dropped = 0
+        # Digests added while compact() builds a filter in a thread
+        self._added_while_building: Optional[List[bytes]] = None
+        self.pruned = 0
+        self.rebuilds = 0
+        self._watermark: Optional[datetime] = None
+        self._last_sync = 0.0
+        self._lock = asyncio.Lock()
+        self._init_filter(capacity)
+
+    def _init_filter(self, capacity: int) -> None:
+        """Allocate an empty Bloom filter sized for `capacity` entries."""
+        self.capacity, self._num_bits, self._num_hashes, self._bits = _empty_filter(
+            capacity, self.false_positive_rate
+        )
+
+    def _positions(self, digest: bytes) -> Iterable[int]:
+        """Bit positions for a digest (double hashing over two 64-bit slices)."""
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return ((h1 + i * h2) % self._num_bits for i in range(self._num_hashes))
+
+    def _set_bits(self, digest: bytes) -> None:
+        for position in self._positions(digest):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def _rebuild_filter(self, capacity: int) -> None:
+        """Rebuild the Bloom filter from the exact set."""
+        self._init_filter(capacity)
+        for existing in self._revoked:
+            self._set_bits(existing)
+        self._dropped = 0
+        self.rebuilds += 1
+
+    @property
+    def needs_rebuild(self) -> bool:
+        """Whether more digests were dropped than are still held (see compact())."""
+        return self._dropped > len(self._revoked)
+
+    def add(self, token_hash: str, expires_at: float) -> None:
+        """Mark a token digest as revoked.
+
+        Args:
+            token_hash: SHA-256 hex digest (see security.hash_token)
+            expires_at: Expiry of the token (Unix timestamp); the digest is
+                dropped by prune() afterwards
+        """
+        digest = bytes.fromhex(token_hash)
+        key = digest[:EXACT_KEY_BYTES]
+        if key in self._revoked or expires_at <= time.time():
+            return
+
+        self._revoked.add(key)
+        bucket = int(expires_at) // EXPIRY_BUCKET_SECONDS
+        keys = self._expiring.get(bucket)
+        if keys is None:
+            keys = self._expiring[bucket] = []
+            heapq.heappush(self._buckets, bucket)
+        keys.append(key)
+        if self._added_while_building is not None:
+            self._added_while_building.append(digest)
+
+        if len(self._revoked) > self.capacity:
+            # Keep the false positive rate: rebuild at double size from the exact set
+            self._rebuild_filter(self.capacity * 2)
+        else:
+            self._set_bits(digest)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop the digests of tokens that have expired.
+
+        Their bits stay set in the Bloom filter until compact() rebuilds it.
+
+        Args:
+            now: Current Unix time (defaults to time.time())
+
+        Returns:
+            Number of digests dropped
+        """
+        now = time.time() if now is None else now
+        # Buckets that end before now hold only expired tokens
+        current = int(now) // EXPIRY_BUCKET_SECONDS
+        dropped = 0
+        while self._buckets and self._buckets[0] < current:
+            for key in self._expiring.pop(heapq.heappop(self._buckets)):
+                self._revoked.discard(key)
+                dropped += 1
+
+        self._dropped += dropped
+        self.pruned += dropped
+        return dropped
+
+    async def compact(self) -> bool:
+        """Rebuild the Bloom filter without the dropped digests, if worthwhile.
+
+        Runs once more digests were dropped than are still held, at the
+        smallest doubling of the initial capacity that fits them. The new
+        filter is built in a thread from a snapshot of the exact set (a
+        rebuild of a million digests takes seconds) and swapped in on the
+        event loop together with the digests added meanwhile.
+
+        Returns:
+            True if the filter was rebuilt
+        """
+        if not self.needs_rebuild or self._added_while_building is not None:
+            return False
+
+        capacity = self.initial_capacity
+        while capacity < len(self._revoked):
+            capacity *= 2
+        snapshot = list(self._revoked)
+        dropped = self._dropped
+        self._added_while_building = []
+        try:
+            built = await asyncio.to_thread(_build_filter, snapshot, capacity, self.false_positive_rate)
+        finally:
+            added, self._added_while_building = self._added_while_building, None
+
+        self.capacity, self._num_bits, self._num_hashes, self._bits = built
+        for digest in added:
+            self._set_bits(digest)
+        self._dropped = max(0, self._dropped - dropped)
+        self.rebuilds += 1
+        return True
+
+    def is_revoked(self, token_hash: str) -> bool:
+        """Check whether a token digest has been revoked.
+
+        Args:
+            token_hash: SHA-256 hex digest (see security.hash_token)
+
+        Returns:
+            True if revoked
+        """
+        digest = bytes.fromhex(token_hash)
+        # Inlined _positions(): this runs on every authenticated request
+        bits, num_bits = self._bits, self._num_bits
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self._num_hashes):
+            position = (h1 + i * h2) % num_bits
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return digest[:EXACT_KEY_BYTES] in self._revoked
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    @property
+    def filter_bytes(self) -> int:
+        """Size of the Bloom filter bit array."""
+        return len(self._bits)
+
+    async def sync(self, session: AsyncSession) -> int:
+        """Load revocations created since the last sync and prune expired ones.
+
+        Args:
+            session: Database session
+
+        Returns:
+            Number of rows read
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        statement = select(RevokedToken.token_hash, RevokedToken.created_at, RevokedToken.expires_at).where(
+            RevokedToken.expires_at > now
+        )
+        if self._watermark is not None:
+            statement = statement.where(RevokedToken.created_at >= self._watermark - SYNC_OVERLAP)
+
+        result = await session.execute(statement)
+        rows = result.all()
+        for token_hash, created_at, expires_at in rows:
+            self.add(token_hash, expires_at.replace(tzinfo=timezone.utc).timestamp())
+            if self._watermark is None or created_at > self._watermark:
+                self._watermark = created_at
+
+        self.prune()
+        await self.compact()
+        self._last_sync = time.monotonic()
+        return len(rows)
+
+    async def ensure_fresh(self, session: Optional[AsyncSession] = None) -> None:
+        """Sync inline if the background sync has not run recently.
+
+        Runs at most once per staleness window per worker. Database errors are
+        logged and the current mirror is kept (fail open) so that an outage of
+        the revocation table does not lock every user out.
+
+        Args:
+            session: Optional session to reuse; a new one is opened otherwise
+        """
+        max_staleness = settings.REVOCATION_SYNC_SECONDS * 2
+        if time.monotonic() - self._last_sync < max_staleness:
+            return
+
+        async with self._lock:
+            if time.monotonic() - self._last_sync < max_staleness:
+                return
+            try:
+                if session is not None:
+                    await self.sync(session)
+                else:
+                    from .database import async_session
+
+                    async with async_session() as own_session:
+                        await self.sync(own_session)
+            except Exception as e:
+                if session is not None:
+                    # Leave the caller's session usable for its own queries
+                    await session.rollback()
+                self._last_sync = time.monotonic()
+                logger.warning(f"Revocation list sync failed (using cached list): {e}")
+
+
+def _empty_filter(capacity: int, false_positive_rate: float) -> Tuple[int, int, int, bytearray]:
+    """Size an empty Bloom filter for `capacity` entries.
+
+    Returns:
+        (capacity, number of bits, number of hashes, bit array)
+    """
+    capacity = max(1, capacity)
+    num_bits = max(8, math.ceil(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+    num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+    return capacity, num_bits, num_hashes, bytearray((num_bits + 7) // 8)
+
+
+def _build_filter(
+    keys: List[bytes], capacity: int, false_positive_rate: float
+) -> Tuple[int, int, int, bytearray]:
+    """Bloom filter holding `keys`, as _empty_filter() (safe to run in a thread)."""
+    capacity, num_bits, num_hashes, bits = _empty_filter(capacity, false_positive_rate)
+    for key in keys:
+        h1 = int.from_bytes(key[:8], "big")
+        h2 = int.from_bytes(key[8:16], "big") | 1
+        for i in range(num_hashes):
+            position = (h1 + i * h2) % num_bits
+            bits[position >> 3] |= 1 << (position & 7)
+    return capacity, num_bits, num_hashes, bits
+
+
+# Global revocation list instance (per worker process)
+revocation_list = RevocationList(
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+    false_positive_rate=settings.REVOCATION_FILTER_FP_RATE,
+)
@@ -1,6 +1,8 @@
 """Request/response schemas package."""
 
 from .auth import LoginRequest, RegisterRequest, RefreshTokenRequest, TokenResponse
+from .chat import ChatJobRead, ChatRequest, ChatResponse
+from .conversation import ConversationListResponse, ConversationRead, MessageListResponse, MessageRead
 from .task import TaskCreate, TaskRead, TaskUpdate, TaskListResponse
 from .user import UserCreate, UserRead, UserUpdate, UserProfile
 
@@ -17,4 +19,11 @@ __all__ = [
     "TaskRead",
     "TaskUpdate",
     "TaskListResponse",
+    "ChatRequest",
+    "ChatResponse",
+    "ChatJobRead",
+    "ConversationRead",
+    "ConversationListResponse",
+    "MessageRead",
+    "MessageListResponse",
 ]
@@ -0,0 +1,38 @@
+"""Chat request/response schemas."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from ..db.models import ChatJobStatus
+
+
+class ChatRequest(BaseModel):
+    conversation_id: Optional[str] = None
+    message: str
+
+
+class ChatResponse(BaseModel):
+    conversation_id: str
+    response: str
+    tool_calls: List[Dict[str, Any]] = []
+
+
+class ChatJobRead(BaseModel):
+    """Chat job status, with the result once the job has finished.
+
+    Attributes:
+        job_id: Job ID to poll
+        status: queued, running, succeeded or failed
+        result: Chat response (succeeded jobs)
+        error: Failure reason (failed jobs)
+    """
+
+    job_id: UUID
+    status: ChatJobStatus
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    result: Optional[ChatResponse] = None
+    error: Optional[str] = None
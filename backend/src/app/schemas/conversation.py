@@ -0,0 +1,79 @@
+"""Conversation and message listing schemas."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class ConversationRead(BaseModel):
+    """Conversation summary for chat history lists.
+
+    Attributes:
+        id: Conversation ID (pass as conversation_id to continue it)
+        title: Start of the first message
+        created_at: Creation timestamp
+        last_message_at: Time of the latest message
+    """
+
+    id: UUID = Field(..., description="Conversation ID")
+    title: Optional[str] = Field(None, description="Conversation title")
+    created_at: datetime = Field(..., description="Creation timestamp")
+    last_message_at: datetime = Field(..., description="Time of the latest message")
+
+    class Config:
+        """Pydantic config."""
+
+        from_attributes = True
+
+
+class ConversationListResponse(BaseModel):
+    """Page of conversations, most recently active first.
+
+    Attributes:
+        items: Conversations on this page
+        next_cursor: Cursor for the next page (None on the last page)
+        limit: Maximum items per page
+    """
+
+    items: List[ConversationRead] = Field(..., description="Conversations")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page")
+    limit: int = Field(..., description="Maximum items per page")
+
+
+class MessageRead(BaseModel):
+    """Stored chat message.
+
+    Attributes:
+        id: Message ID
+        role: user or assistant
+        content: Message text
+        tool_calls: Tools run for an assistant reply (results truncated)
+        created_at: Creation timestamp
+    """
+
+    id: UUID = Field(..., description="Message ID")
+    role: str = Field(..., description="Sender role")
+    content: str = Field(..., description="Message text")
+    tool_calls: Optional[List[Dict[str, Any]]] = Field(None, description="Tools run for the reply")
+    created_at: datetime = Field(..., description="Creation timestamp")
+
+    class Config:
+        """Pydantic config."""
+
+        from_attributes = True
+
+
+class MessageListResponse(BaseModel):
+    """Page of a conversation's messages, newest first.
+
+    Attributes:
+        items: Messages on this page
+        next_cursor: Cursor for the next (older) page (None on the last page)
+        limit: Maximum items per page
+    """
+
+    items: List[MessageRead] = Field(..., description="Messages")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page")
+    limit: int = Field(..., description="Maximum items per page")
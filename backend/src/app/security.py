@@ -1,13 +1,15 @@
 """Security utilities for password hashing and JWT token handling (Tasks 02-013, 02-014, 02-015)."""
 
+import hashlib
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from jose import JWTError, jwt
 import bcrypt
 
 from .config import settings
+from .token_cache import verified_token_cache
 
 
 def hash_password(password: str) -> str:
@@ -75,7 +77,9 @@ def create_access_token(data: Dict[str, Any]) -> str:
 
     # Add expiration time (24 hours from now)
     expire = datetime.now(timezone.utc) + timedelta(hours=settings.ACCESS_TOKEN_EXPIRE_HOURS)
+    # jti makes every token unique, so revoking one session never revokes another
     to_encode.update({"exp": expire, "type": "access"})
+    to_encode.setdefault("jti", uuid4().hex)
 
     try:
         encoded_jwt = jwt.encode(
@@ -106,6 +110,8 @@ def create_refresh_token(user_id: UUID) -> str:
     to_encode = {
         "sub": str(user_id),
         "type": "refresh",
+        # Unique ID so two tokens issued in the same second never collide
+        "jti": uuid4().hex,
     }
 
     # Add expiration time (7 days from now)
@@ -123,9 +129,27 @@ def create_refresh_token(user_id: UUID) -> str:
         raise ValueError(f"Failed to create refresh token: {e}") from e
 
 
+def hash_token(token: str) -> str:
+    """Return the fixed-size digest used to store a token server-side.
+
+    Refresh tokens are high-entropy JWTs, so a plain SHA-256 is sufficient;
+    the database never sees the token itself.
+
+    Args:
+        token: Token string to hash
+
+    Returns:
+        64-character hex SHA-256 digest
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 def verify_token(token: str) -> Dict[str, Any]:
     """Verify JWT token and return payload (Task 02-015).
 
+    Verified payloads are cached until their expiry (see token_cache.py), so
+    repeat presentations of the same token skip the signature check.
+
     Args:
         token: JWT token string to verify
 
@@ -138,18 +162,25 @@ def verify_token(token: str) -> Dict[str, Any]:
     if not token:
         raise ValueError("Token cannot be empty")
 
+    cache_key = verified_token_cache.key_for(token)
+    cached = verified_token_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
         payload = jwt.decode(
             token,
             settings.JWT_SECRET_KEY,
             algorithms=[settings.JWT_ALGORITHM],
         )
-        return payload
     except JWTError as e:
         raise ValueError(f"Invalid token: {e}") from e
     except Exception as e:
         raise ValueError(f"Token verification failed: {e}") from e
 
+    verified_token_cache.put(cache_key, payload)
+    return payload
+
 
 def extract_user_id_from_token(token: str) -> Optional[str]:
     """Extract user ID from JWT token payload.
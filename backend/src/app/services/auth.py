@@ -1,20 +1,94 @@
 """Authentication service with business logic (Task 02-031)."""
 
-from typing import Optional, Tuple
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple, Type, Union
 from uuid import UUID
 
+from sqlalchemy import delete, func, update
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..db.models import RefreshToken, User
+from ..config import settings
+from ..db.models import RefreshToken, RevokedToken, User
+from ..revocation import revocation_list
 from ..security import (
     create_access_token,
     create_refresh_token,
     hash_password,
+    hash_token,
     verify_password,
+    verify_token,
 )
 
 
+# Inserts attempted before giving up when concurrent registrations take the same username
+USERNAME_ALLOCATION_ATTEMPTS = 5
+
+# Existing usernames read per query when allocating a new one
+USERNAME_SCAN_PAGE_SIZE = 20
+
+# Username suffixes counted when allocating (str.isdigit() also accepts "²")
+_NUMERIC_SUFFIX = re.compile(r"[0-9]+")
+
+
+def _utcnow() -> datetime:
+    """Naive UTC timestamp, matching how BaseModel stores datetimes."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _refresh_token_expiry() -> datetime:
+    """Expiry for a refresh token issued now."""
+    return _utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+async def _allocate_username(session: AsyncSession, base_username: str) -> str:
+    """Pick a free username for `base_username`, normally with a single query.
+
+    Returns base_username if unused, otherwise base_username{n + 1} where n is
+    the highest numeric (ASCII digit) suffix in use. Candidates are read
+    longest first in pages of USERNAME_SCAN_PAGE_SIZE. Once a suffix without
+    a leading zero is seen, every later candidate is shorter or sorts lower
+    at the same length, so its number is smaller and the scan stops; longer
+    zero-padded suffixes ("007") read before it still count towards n.
+
+    Args:
+        session: Database session
+        base_username: Desired username (email local part)
+
+    Returns:
+        Username to insert (may still lose a race; the insert is retried)
+    """
+    statement = (
+        select(User.username)
+        .where(User.username.startswith(base_username, autoescape=True))
+        .order_by(func.length(User.username).desc(), User.username.desc())
+        .limit(USERNAME_SCAN_PAGE_SIZE)
+    )
+    base_taken = False
+    highest: Optional[int] = None
+    offset = 0
+    while True:
+        result = await session.execute(statement.offset(offset))
+        usernames = result.scalars().all()
+        for username in usernames:
+            suffix = username[len(base_username):]
+            if not suffix:
+                base_taken = True
+            elif _NUMERIC_SUFFIX.fullmatch(suffix):
+                highest = max(highest or 0, int(suffix))
+                if suffix == "0" or not suffix.startswith("0"):
+                    return f"{base_username}{highest + 1}"
+        if len(usernames) < USERNAME_SCAN_PAGE_SIZE:
+            break
+        offset += USERNAME_SCAN_PAGE_SIZE
+
+    if highest is not None:
+        return f"{base_username}{highest + 1}"
+    return f"{base_username}1" if base_taken else base_username
+
+
 async def register_user(
     session: AsyncSession,
     email: str,
@@ -38,41 +112,39 @@ async def register_user(
     if not email or not password or not full_name:
         raise ValueError("Email, password, and full name are required")
 
-    # Check if email already exists
-    result = await session.execute(select(User).where(User.email == email))
-    existing = result.scalars().first()
-    if existing:
-        raise ValueError(f"Email {email} is already registered")
-
     # Generate username from email
-    username = email.split("@")[0]
-    counter = 1
-    base_username = username
-    
-    while True:
-        result = await session.execute(select(User).where(User.username == username))
-        if not result.scalars().first():
-            break
-        username = f"{base_username}{counter}"
-        counter += 1
+    base_username = email.split("@")[0]
 
     # Hash password
     password_hash = hash_password(password)
 
-    # Create user
-    user = User(
-        email=email,
-        username=username,
-        password_hash=password_hash,
-        full_name=full_name,
-        is_active=True,
-    )
+    # Email uniqueness is enforced by the unique index; username races retry
+    for _ in range(USERNAME_ALLOCATION_ATTEMPTS):
+        username = await _allocate_username(session, base_username)
 
-    session.add(user)
-    await session.commit()
-    await session.refresh(user)
+        # Create user
+        user = User(
+            email=email,
+            username=username,
+            password_hash=password_hash,
+            full_name=full_name,
+            is_active=True,
+        )
 
-    return user
+        session.add(user)
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            result = await session.execute(select(User.id).where(User.email == email))
+            if result.first():
+                raise ValueError("Email already registered")
+            continue
+
+        await session.refresh(user)
+        return user
+
+    raise ValueError("Could not allocate a username, please try again")
 
 
 async def authenticate_user(
@@ -134,10 +206,11 @@ async def create_tokens(
     # Create refresh token
     refresh_token = create_refresh_token(user_id)
 
-    # Store refresh token in database
+    # Store only the digest of the refresh token
     db_refresh_token = RefreshToken(
         user_id=user_id,
-        token=refresh_token,
+        token_hash=hash_token(refresh_token),
+        expires_at=_refresh_token_expiry(),
     )
 
     session.add(db_refresh_token)
@@ -146,6 +219,165 @@ async def create_tokens(
     return access_token, refresh_token
 
 
+async def rotate_refresh_token(
+    session: AsyncSession,
+    user_id: UUID,
+    old_refresh_token: str,
+) -> Optional[Tuple[str, str]]:
+    """Exchange a stored refresh token for a new token pair.
+
+    The stored row is rewritten in a single UPDATE, so the previous token is
+    invalidated in the same statement that records the new one. A token that
+    was already rotated, pruned or never issued matches no row.
+
+    Args:
+        session: Database session
+        user_id: UUID of the token owner
+        old_refresh_token: Refresh token presented by the client
+
+    Returns:
+        Tuple of (access_token, refresh_token), or None if the old token is not
+        a live stored token for this user
+
+    Raises:
+        ValueError: If token creation fails
+    """
+    access_token = create_access_token({"sub": str(user_id)})
+    new_refresh_token = create_refresh_token(user_id)
+    now = _utcnow()
+
+    statement = (
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == hash_token(old_refresh_token),
+            RefreshToken.user_id == user_id,
+            RefreshToken.expires_at > now,
+        )
+        .values(
+            token_hash=hash_token(new_refresh_token),
+            expires_at=_refresh_token_expiry(),
+            updated_at=now,
+        )
+    )
+    result = await session.execute(statement)
+    await session.commit()
+
+    if result.rowcount != 1:
+        return None
+
+    return access_token, new_refresh_token
+
+
+async def revoke_tokens(
+    session: AsyncSession,
+    user_id: UUID,
+    access_token: Optional[str] = None,
+    refresh_token: Optional[str] = None,
+) -> None:
+    """Revoke a session's tokens (logout).
+
+    The access token is recorded in revoked_tokens until its own expiry and
+    added to this worker's in-memory revocation list immediately; other
+    workers pick it up on their next sync. The refresh token row is deleted
+    so it can no longer be rotated.
+
+    Args:
+        session: Database session
+        user_id: UUID of the token owner
+        access_token: Access token to revoke
+        refresh_token: Refresh token to invalidate
+    """
+    if refresh_token:
+        await session.execute(
+            delete(RefreshToken).where(
+                RefreshToken.token_hash == hash_token(refresh_token),
+                RefreshToken.user_id == user_id,
+            )
+        )
+        await session.commit()
+
+    if not access_token:
+        return
+
+    try:
+        payload = verify_token(access_token)
+    except ValueError:
+        # Already invalid or expired: nothing to revoke
+        return
+
+    token_hash = hash_token(access_token)
+    session.add(RevokedToken(
+        user_id=user_id,
+        token_hash=token_hash,
+        expires_at=datetime.fromtimestamp(payload["exp"], timezone.utc).replace(tzinfo=None),
+    ))
+    try:
+        await session.commit()
+    except IntegrityError:
+        # Concurrent logout already recorded it
+        await session.rollback()
+
+    revocation_list.add(token_hash, payload["exp"])
+
+
+async def _delete_expired_in_batches(
+    session: AsyncSession,
+    model: Union[Type[RefreshToken], Type[RevokedToken]],
+    batch_size: int,
+) -> int:
+    """Delete rows whose expires_at has passed, one short transaction per batch."""
+    total = 0
+    while True:
+        expired_ids = (
+            select(model.id)
+            .where(model.expires_at < _utcnow())
+            .limit(batch_size)
+        )
+        result = await session.execute(
+            delete(model).where(model.id.in_(expired_ids))
+        )
+        await session.commit()
+
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
+
+
+async def prune_expired_refresh_tokens(
+    session: AsyncSession,
+    batch_size: int = 1000,
+) -> int:
+    """Delete expired refresh tokens in batches.
+
+    Each batch is its own short transaction so pruning never holds locks on
+    a large part of the table.
+
+    Args:
+        session: Database session
+        batch_size: Maximum rows deleted per statement
+
+    Returns:
+        Number of rows deleted
+    """
+    return await _delete_expired_in_batches(session, RefreshToken, batch_size)
+
+
+async def prune_expired_revocations(
+    session: AsyncSession,
+    batch_size: int = 1000,
+) -> int:
+    """Delete revocations of tokens that have expired anyway.
+
+    Args:
+        session: Database session
+        batch_size: Maximum rows deleted per statement
+
+    Returns:
+        Number of rows deleted
+    """
+    return await _delete_expired_in_batches(session, RevokedToken, batch_size)
+
+
 async def validate_email_unique(session: AsyncSession, email: str) -> bool:
     """Check if email is unique (not already registered) (Task 02-031).
 
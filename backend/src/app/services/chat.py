@@ -0,0 +1,594 @@
+"""Chat turn execution shared by the chat endpoint and chat job workers."""
+
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..config import settings
+from ..conversation_locks import conversation_locks
+from ..db.models import Conversation, Message, User
+from ..history_cache import history_cache, history_entry
+from ..llm_context_cache import context_cache, estimate_tool_tokens
+from ..llm_guard import LLMUnavailableError, llm_guard
+from ..response_cache import response_cache
+from ..schemas.chat import ChatResponse
+from .conversation import message_model, restore_conversation
+from .intents import LocalIntent, format_reply, intent_stats, match_intent
+from ..tracing import SPAN_KIND_CLIENT, tracer
+
+# google.generativeai (and its protobufs) and the MCP server are imported inside
+# run_chat_turn: they take over a second to import and most cold starts never
+# serve a chat request.
+
+logger = logging.getLogger("app")
+
+# The provider's model list rarely changes; fetch it once per process and hour
+# rather than on every turn.
+MODEL_LIST_TTL_SECONDS = 3600
+_model_list_cache: Dict[str, Any] = {"models": None, "fetched_at": 0.0}
+
+# Characters of each tool result kept in Message.tool_calls
+TOOL_RESULT_PREVIEW_CHARS = 200
+
+
+class Stopwatch:
+    """Accumulates the time spent inside `with stopwatch:` blocks."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._started = 0.0
+
+    def __enter__(self) -> "Stopwatch":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.seconds += time.perf_counter() - self._started
+
+    @property
+    def ms(self) -> float:
+        return self.seconds * 1000
+
+
+class ChatTurnTimings:
+    """Time per turn spent on the database, the model and MCP tools."""
+
+    def __init__(self):
+        self.db = Stopwatch()
+        self.llm = Stopwatch()
+        self.tools = Stopwatch()
+        self.lock_wait = Stopwatch()
+        """Time spent waiting for another turn in the same conversation."""
+        self.intent: Optional[str] = None
+        """Tool run by the local fast path, if the model was skipped."""
+        self.cache_hit = False
+        """Whether the answer came from the response cache."""
+        self.history_cached = False
+        """Whether the conversation history came from the history cache."""
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        """Prompt tokens sent to the model, and how many of them came from a provider-side cache."""
+
+    def add_usage(self, response: Any) -> None:
+        """Add a model response's token usage (usage_metadata), if reported."""
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return
+        self.prompt_tokens += getattr(usage, "prompt_token_count", 0) or 0
+        self.cached_tokens += getattr(usage, "cached_content_token_count", 0) or 0
+
+    def server_timing(self) -> str:
+        """Value for a Server-Timing response header."""
+        value = f"db;dur={self.db.ms:.1f}, llm;dur={self.llm.ms:.1f}, tools;dur={self.tools.ms:.1f}"
+        if self.lock_wait.seconds:
+            value += f", lock;dur={self.lock_wait.ms:.1f}"
+        if self.intent:
+            value += f', intent;desc="{self.intent}"'
+        if self.cache_hit:
+            value += ', cache;desc="hit"'
+        if self.history_cached:
+            value += ', history;desc="cached"'
+        return value
+
+    def __str__(self) -> str:
+        text = f"db={self.db.ms:.1f} ms llm={self.llm.ms:.1f} ms tools={self.tools.ms:.1f} ms"
+        if self.lock_wait.seconds:
+            text += f" lock={self.lock_wait.ms:.1f} ms"
+        if self.intent:
+            text += f" intent={self.intent}"
+        if self.cache_hit:
+            text += " cache=hit"
+        if self.history_cached:
+            text += " history=cached"
+        if self.prompt_tokens:
+            text += f" prompt_tokens={self.prompt_tokens} cached_tokens={self.cached_tokens}"
+        return text
+
+
+def clean_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Clean JSON schema recursively for Gemini compatibility using an Allow-List.
+    Only keeps fields that are strictly supported by Gemini Function Declarations.
+    """
+    if not isinstance(schema, dict):
+        return schema
+        
+    cleaned = {}
+    
+    # Allowed fields for Gemini Schema
+    allowed_fields = {
+        'type', 'format', 'description', 'nullable', 
+        'enum', 'properties', 'required', 'items'
+    }
+    
+    for key, value in schema.items():
+        if key in allowed_fields:
+            # Special handling for 'type'
+            if key == 'type':
+                if isinstance(value, str):
+                    cleaned[key] = value.upper()
+                else:
+                    cleaned[key] = value
+            # Recursion for nested schemas
+            elif key == 'properties' and isinstance(value, dict):
+                cleaned[key] = {k: clean_schema(v) for k, v in value.items()}
+            elif key == 'items' and isinstance(value, dict):
+                cleaned[key] = clean_schema(value)
+            else:
+                cleaned[key] = value
+                
+    return cleaned
+
+
+def stored_tool_calls(executed_tool_calls: List[Dict[str, Any]], user_id: UUID) -> Optional[List[Dict[str, Any]]]:
+    """Compact form of a turn's tool calls for Message.tool_calls.
+
+    The model already saw the full results; the stored copy is for display.
+    Results are cut to TOOL_RESULT_PREVIEW_CHARS ("..." marks a cut) and the
+    user_id argument, which every tool takes and the message already
+    records, is dropped.
+
+    Args:
+        executed_tool_calls: Tool calls as returned in the chat response
+        user_id: Owner of the message
+
+    Returns:
+        List of {"tool", "args", "result"} dicts, or None without tool calls
+    """
+    if not executed_tool_calls:
+        return None
+
+    stored = []
+    for call in executed_tool_calls:
+        args = {k: v for k, v in call["args"].items() if not (k == "user_id" and v == str(user_id))}
+        result = call["result"]
+        if len(result) > TOOL_RESULT_PREVIEW_CHARS:
+            result = result[:TOOL_RESULT_PREVIEW_CHARS] + "..."
+        stored.append({"tool": call["tool"], "args": args, "result": result})
+    return stored
+
+
+async def load_history_window(session: AsyncSession, conversation: Conversation) -> List[Dict[str, Any]]:
+    """Load the latest HISTORY_WINDOW_MESSAGES messages of a conversation.
+
+    Args:
+        session: Database session
+        conversation: Conversation (live or archived)
+
+    Returns:
+        Gemini history entries, oldest first
+    """
+    model = message_model(conversation)
+    statement = (
+        select(model.role, model.content)
+        .where(model.conversation_id == conversation.id, model.content != "")
+        .order_by(model.created_at.desc())
+        .limit(history_cache.window)
+    )
+    result = await session.execute(statement)
+    return [history_entry(role, content) for role, content in reversed(result.all())]
+
+
+def _tool_result_text(result: Any) -> str:
+    """Text of an MCP call_tool result (content blocks, optionally with structured output)."""
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], list):
+        # FastMCP returns (content blocks, structured result)
+        result = result[0]
+    if hasattr(result, 'content') and isinstance(result.content, list):
+        result = result.content
+    if isinstance(result, str):
+        return result
+    if isinstance(result, list):
+        return "".join(getattr(c, 'text', str(c)) for c in result)
+    return str(result)
+
+
+async def _run_local_intent(intent: LocalIntent, tool_time: Stopwatch) -> Tuple[str, List[Dict[str, Any]]]:
+    """Execute a matched task command without the model.
+
+    Args:
+        intent: Tool call from match_intent
+        tool_time: Accumulates the tool time
+
+    Returns:
+        (reply text, executed tool calls)
+    """
+    from ..mcp.tools import mcp
+
+    try:
+        with tool_time, tracer.span("mcp.call_tool", attributes={"tool.name": intent.tool, "chat.fast_path": True}):
+            tool_result_str = _tool_result_text(await mcp.call_tool(intent.tool, arguments=intent.args))
+    except Exception as e:
+        tool_result_str = f"Error executing tool {intent.tool}: {str(e)}"
+
+    executed_tool_calls = [{"tool": intent.tool, "args": intent.args, "result": tool_result_str}]
+    return format_reply(intent, tool_result_str), executed_tool_calls
+
+
+async def _run_model(
+    conversation: Conversation,
+    current_msg_content: str,
+    gemini_history: List[Dict[str, Any]],
+    history_offset: int,
+    timings: ChatTurnTimings,
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """Send the message to Gemini and run the tool calls it asks for.
+
+    Args:
+        conversation: Conversation of the turn (its context cache fields may change)
+        current_msg_content: User message
+        gemini_history: Earlier turns in Gemini's history format (the latest window)
+        history_offset: Position of gemini_history[0] in the whole conversation
+        timings: Collects LLM/tool time and prompt token usage
+
+    Returns:
+        (reply text, executed tool calls)
+
+    Raises:
+        ValueError: If the model is not configured or unavailable
+        LLMUnavailableError: If the provider is degraded or saturated (see llm_guard)
+    """
+    llm_time, tool_time = timings.llm, timings.tools
+
+    if not settings.gemini_api_key:
+        raise ValueError("GEMINI_API_KEY is not set in environment variables.")
+
+    import google.generativeai as genai
+    from ..mcp.tools import mcp
+
+    genai.configure(api_key=settings.gemini_api_key)
+
+    # --- AUTO DETECT MODEL ---
+    # List available models and pick the best one
+    available_models = _model_list_cache["models"]
+
+    def list_generate_models():
+        return [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
+
+    if available_models is None or time.monotonic() - _model_list_cache["fetched_at"] > MODEL_LIST_TTL_SECONDS:
+        try:
+            # list_models is blocking: run it off the event loop
+            with llm_time, tracer.span("llm.list_models", SPAN_KIND_CLIENT):
+                available_models = await llm_guard.call(lambda: asyncio.to_thread(list_generate_models))
+            _model_list_cache.update(models=available_models, fetched_at=time.monotonic())
+        except LLMUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to list models: {e}")
+            # Fallback list if listing fails
+            available_models = ['models/gemini-1.5-flash', 'models/gemini-pro']
+
+    # Priority order
+    priorities = [
+        'models/gemini-1.5-flash', 
+        'models/gemini-1.5-pro',
+        'models/gemini-1.5-flash-001',
+        'models/gemini-1.0-pro', 
+        'models/gemini-pro'
+    ]
+
+    selected_model_name = None
+    for p in priorities:
+        if p in available_models:
+            selected_model_name = p
+            break
+
+    if not selected_model_name and available_models:
+        selected_model_name = available_models[0]
+
+    if not selected_model_name:
+        raise ValueError(f"No suitable Gemini models found. Available: {available_models}")
+
+    # Convert MCP tools to Gemini Tool Config
+    with tool_time, tracer.span("mcp.list_tools"):
+        mcp_tools_list = await mcp.list_tools()
+
+    schemas = [clean_schema(t.inputSchema) for t in mcp_tools_list]
+    tool = genai.protos.Tool(function_declarations=[
+        genai.protos.FunctionDeclaration(
+            name=t.name,
+            description=t.description,
+            parameters=schema
+        ) for t, schema in zip(mcp_tools_list, schemas)
+    ])
+
+    # Tool declarations and older history may already be cached at the provider
+    with llm_time, tracer.span("llm.context_cache", SPAN_KIND_CLIENT):
+        model, uncached_history = await context_cache.model_for_turn(
+            genai, conversation, selected_model_name, tool,
+            estimate_tool_tokens(mcp_tools_list, schemas), gemini_history, history_offset,
+        )
+
+    chat = model.start_chat(history=uncached_history)
+
+    # Send message
+    with llm_time, tracer.span("llm.send_message", SPAN_KIND_CLIENT, {"llm.model": selected_model_name}):
+        response = await llm_guard.call(lambda: chat.send_message_async(current_msg_content))
+    timings.add_usage(response)
+
+    final_text = ""
+    executed_tool_calls = []
+
+    # Loop max 5 times for multi-turn tool use
+    for _ in range(5):
+        if not response.candidates or not response.candidates[0].content.parts:
+             break
+
+        part = response.candidates[0].content.parts[0]
+
+        if part.function_call:
+            # Tool Call detected
+            fc = part.function_call
+            tool_name = fc.name
+            tool_args = dict(fc.args)
+
+            # Execute Tool (MCP)
+            tool_result_str = ""
+            try:
+                with tool_time, tracer.span("mcp.call_tool", attributes={"tool.name": tool_name}):
+                    result = await mcp.call_tool(tool_name, arguments=tool_args)
+                tool_result_str = _tool_result_text(result)
+
+            except Exception as e:
+                tool_result_str = f"Error executing tool {tool_name}: {str(e)}"
+
+            executed_tool_calls.append({
+                "tool": tool_name,
+                "args": tool_args,
+                "result": tool_result_str
+            })
+
+            # Send result back to Gemini
+            with llm_time, tracer.span("llm.send_message", SPAN_KIND_CLIENT, {"llm.model": selected_model_name, "tool.name": tool_name}):
+                function_response = genai.protos.Content(
+                    parts=[genai.protos.Part(
+                        function_response=genai.protos.FunctionResponse(
+                            name=tool_name,
+                            response={'result': tool_result_str}
+                        )
+                    )]
+                )
+                response = await llm_guard.call(lambda: chat.send_message_async(function_response))
+            timings.add_usage(response)
+        else:
+            # Text response
+            final_text = response.text
+            break
+
+    return final_text, executed_tool_calls
+
+
+async def run_chat_turn(
+    session: AsyncSession,
+    user_uuid: UUID,
+    message: str,
+    conversation_id: Optional[str] = None,
+    timings: Optional[ChatTurnTimings] = None,
+) -> ChatResponse:
+    """Run one chat turn: load history, call the model and tools, store the turn.
+
+    Turns in one conversation run one at a time (see conversation_locks), so
+    a double-submitted message sees the first one's reply in its history
+    instead of racing it. Plain task commands ("list my pending tasks",
+    "complete task <uuid>") are run directly against the MCP tools without
+    the model (CHAT_FAST_PATH_ENABLED). Read-only questions that open a
+    conversation are answered from the response cache while the user's tasks
+    are unchanged. Only the latest HISTORY_WINDOW_MESSAGES of a conversation
+    are sent to the model; they come from the history cache while no other
+    worker has written to it.
+
+    Args:
+        session: Database session (closed while the model runs)
+        user_uuid: ID of the user sending the message
+        message: User message
+        conversation_id: Conversation to continue (a new one is started if
+            missing, invalid or owned by another user)
+        timings: Collects DB/LLM/tool time if given
+
+    Returns:
+        The assistant reply and executed tool calls
+
+    Raises:
+        LookupError: If the user does not exist
+        ValueError: If the model is not configured or unavailable
+        LLMUnavailableError: If the provider is degraded or saturated (see llm_guard)
+        ConversationBusyError: If another turn in the conversation outlasts
+            CONVERSATION_LOCK_TIMEOUT_SECONDS
+    """
+    timings = timings or ChatTurnTimings()
+    try:
+        lock_id = UUID(conversation_id) if conversation_id else None
+    except ValueError:
+        lock_id = None
+    if lock_id is None:
+        # A new conversation has no other turns to wait for
+        return await _chat_turn(session, user_uuid, message, conversation_id, timings)
+
+    async with AsyncExitStack() as stack:
+        with timings.lock_wait:
+            await stack.enter_async_context(conversation_locks.hold(user_uuid, lock_id))
+        return await _chat_turn(session, user_uuid, message, conversation_id, timings)
+
+
+async def _chat_turn(
+    session: AsyncSession,
+    user_uuid: UUID,
+    message: str,
+    conversation_id: Optional[str],
+    timings: ChatTurnTimings,
+) -> ChatResponse:
+    """run_chat_turn without the conversation lock."""
+    db_time, llm_time, tool_time = timings.db, timings.llm, timings.tools
+
+    # 1. Validate User
+    with db_time:
+        user = await session.get(User, user_uuid)
+    if not user:
+        raise LookupError(f"User {user_uuid} not found")
+
+    # 2. Get/Create Conversation
+    conversation = None
+    if conversation_id:
+        try:
+            conv_id = UUID(conversation_id)
+            with db_time:
+                conversation = await session.get(Conversation, conv_id)
+            if conversation and conversation.user_id != user_uuid:
+                conversation = None
+        except ValueError: pass
+
+    # A new conversation is only written together with the turn's messages (step 7)
+    is_new_conversation = conversation is None
+    gemini_history: List[Dict[str, Any]] = []
+    if is_new_conversation:
+        conversation = Conversation(user_id=user_uuid, title=message[:50])
+    else:
+        # 3. History: this worker's copy while no turn was stored elsewhere since,
+        # otherwise only the latest window is loaded
+        cached_history = history_cache.get(conversation.id, conversation.history_length)
+        if cached_history is not None:
+            gemini_history = cached_history
+            timings.history_cached = True
+        else:
+            # 4. Prepare History for Gemini
+            with db_time:
+                gemini_history = await load_history_window(session, conversation)
+
+    base_version = conversation.history_length
+    history_offset = max(0, base_version - len(gemini_history))
+
+    # Release the connection while the model runs; nothing is written until step 7
+    with db_time:
+        await session.close()
+
+    # Append current user message (will be added to history by chat session)
+    current_msg_content = message
+
+    # 5. User Message (created now so it sorts before the reply)
+    user_message = Message(conversation_id=conversation.id, user_id=user_uuid, role="user", content=current_msg_content)
+
+    # 6. Obvious task commands skip the model (see services/intents.py)
+    intent = match_intent(message, user_uuid) if settings.CHAT_FAST_PATH_ENABLED else None
+    cache_key = cached = None
+    if intent:
+        final_text, executed_tool_calls = await _run_local_intent(intent, tool_time)
+        intent_stats.record(True, tool_time.seconds)
+        timings.intent = intent.tool
+    else:
+        if not gemini_history:
+            # Without history the answer depends only on the prompt and the task state
+            cache_key = response_cache.key_for(user_uuid, user.tasks_version, message)
+            cached = response_cache.get(cache_key)
+        if cached:
+            final_text, executed_tool_calls = cached.response, [dict(t) for t in cached.tool_calls]
+            timings.cache_hit = True
+        else:
+            final_text, executed_tool_calls = await _run_model(
+                conversation, current_msg_content, gemini_history, history_offset, timings
+            )
+            intent_stats.record(False, llm_time.seconds + tool_time.seconds)
+
+    # 7. Persist the turn: conversation, user and assistant messages in one transaction
+    new_messages = [user_message]
+    if final_text or executed_tool_calls:
+        new_messages.append(Message(
+            conversation_id=conversation.id,
+            user_id=user_uuid,
+            role="assistant",
+            content=final_text or "Processed tool calls.",
+            tool_calls=stored_tool_calls(executed_tool_calls, user_uuid),
+        ))
+    new_entries = [history_entry(m.role, m.content) for m in new_messages if m.content]
+    history_version = base_version + len(new_entries)
+    last_message_at = new_messages[-1].created_at
+    history_current = True
+
+    if is_new_conversation:
+        conversation.history_length = history_version
+        conversation.last_message_at = last_message_at
+        session.add(conversation)
+    session.add_all(new_messages)
+    if not is_new_conversation:
+        # Compare-and-set: if another turn was stored since step 2, this worker's
+        # history is incomplete and the other turn's context cache fields win
+        with db_time:
+            if conversation.archived_at:
+                # Continuing an archived conversation brings its messages back
+                await restore_conversation(session, conversation.id)
+            result = await session.execute(
+                update(Conversation)
+                .where(
+                    Conversation.id == conversation.id,
+                    Conversation.history_length == base_version,
+                    Conversation.archived_at.is_(None),
+                )
+                .values(
+                    history_length=history_version,
+                    last_message_at=last_message_at,
+                    context_cache_name=conversation.context_cache_name,
+                    context_cache_expires_at=conversation.context_cache_expires_at,
+                    context_cache_messages=conversation.context_cache_messages,
+                )
+            )
+            if result.rowcount != 1:
+                history_current = False
+                # Archived since step 2 (see archive_inactive_conversations)?
+                await restore_conversation(session, conversation.id)
+                await session.execute(
+                    update(Conversation)
+                    .where(Conversation.id == conversation.id)
+                    .values(
+                        history_length=Conversation.history_length + len(new_entries),
+                        last_message_at=last_message_at,
+                    )
+                )
+    with db_time, tracer.span("db.commit"):
+        await session.commit()
+
+    # Append the turn to the cached history (on write, so the next turn skips step 3's query)
+    if history_current:
+        history_cache.put(conversation.id, history_version, gemini_history + new_entries)
+    else:
+        history_cache.invalidate(conversation.id)
+
+    response = ChatResponse(
+        conversation_id=str(conversation.id),
+        response=final_text or "Completed actions.",
+        tool_calls=executed_tool_calls
+    )
+
+    # 8. Cache read-only answers (any mutating tool call changes the task state anyway)
+    if cache_key and not cached and final_text:
+        from ..mcp.tools import READ_ONLY_TOOLS
+
+        if all(t["tool"] in READ_ONLY_TOOLS and not t["result"].startswith("Error") for t in executed_tool_calls):
+            response_cache.put(cache_key, response)
+
+    return response
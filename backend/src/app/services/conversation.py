@@ -0,0 +1,200 @@
+"""Conversation and message listing with keyset pagination, and message archiving."""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple, Type, Union
+from uuid import UUID
+
+from sqlalchemy import and_, delete, insert, or_, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..db.models import Conversation, Message, MessageArchive
+from ..pagination import decode_cursor, encode_cursor
+
+# Columns copied between messages and messages_archive
+_MESSAGE_COLUMNS = [column.name for column in Message.__table__.columns]
+
+
+def message_model(conversation: Conversation) -> Type[Union[Message, MessageArchive]]:
+    """Table holding a conversation's messages.
+
+    Args:
+        conversation: Conversation (its archived_at decides)
+
+    Returns:
+        MessageArchive for archived conversations, Message otherwise
+    """
+    return MessageArchive if conversation.archived_at else Message
+
+
+async def list_conversations(
+    session: AsyncSession,
+    user_id: UUID,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Conversation], Optional[str]]:
+    """List a user's conversations, most recently active first.
+
+    Ordered by (last_message_at, id) descending, which
+    idx_conversations_user_last_message serves without a sort.
+
+    Args:
+        session: Database session
+        user_id: UUID of the conversations' owner
+        limit: Maximum conversations to return
+        cursor: next_cursor of the previous page
+
+    Returns:
+        (conversations, cursor for the next page or None)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    statement = select(Conversation).where(Conversation.user_id == user_id)
+    if cursor:
+        last_message_at, conversation_id = decode_cursor(cursor)
+        statement = statement.where(
+            or_(
+                Conversation.last_message_at < last_message_at,
+                and_(Conversation.last_message_at == last_message_at, Conversation.id < conversation_id),
+            )
+        )
+
+    # Fetch one extra row to know whether another page exists
+    statement = statement.order_by(Conversation.last_message_at.desc(), Conversation.id.desc()).limit(limit + 1)
+    result = await session.execute(statement)
+    conversations = list(result.scalars().all())
+
+    next_cursor = None
+    if len(conversations) > limit:
+        conversations = conversations[:limit]
+        last = conversations[-1]
+        next_cursor = encode_cursor(last.last_message_at, last.id)
+    return conversations, next_cursor
+
+
+async def list_messages(
+    session: AsyncSession,
+    conversation_id: UUID,
+    user_id: UUID,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Optional[Tuple[List[Union[Message, MessageArchive]], Optional[str]]]:
+    """List a conversation's messages, newest first.
+
+    Ordered by (created_at, id) descending, served by the
+    messages(conversation_id, created_at) index. Archived conversations are
+    read from messages_archive.
+
+    Args:
+        session: Database session
+        conversation_id: UUID of the conversation
+        user_id: UUID of user (for ownership check)
+        limit: Maximum messages to return
+        cursor: next_cursor of the previous page
+
+    Returns:
+        (Message or MessageArchive rows, cursor for the next, older page or
+        None), or None if the conversation does not exist or belongs to
+        another user
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    conversation = await session.get(Conversation, conversation_id)
+    if not conversation or conversation.user_id != user_id:
+        return None
+
+    model = message_model(conversation)
+    statement = select(model).where(model.conversation_id == conversation_id)
+    if cursor:
+        created_at, message_id = decode_cursor(cursor)
+        statement = statement.where(
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < message_id),
+            )
+        )
+
+    statement = statement.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    result = await session.execute(statement)
+    messages = list(result.scalars().all())
+
+    next_cursor = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        last = messages[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return messages, next_cursor
+
+
+async def archive_inactive_conversations(session: AsyncSession, inactive_days: int, batch_size: int = 100) -> int:
+    """Move the messages of conversations inactive for `inactive_days` to messages_archive.
+
+    The conversations are locked (FOR UPDATE SKIP LOCKED on PostgreSQL), so a
+    chat turn that is writing to one of them is skipped. A turn that starts
+    writing after the batch is committed brings the messages back
+    (restore_conversation). Commits once per batch.
+
+    Args:
+        session: Database session
+        inactive_days: Minimum days since a conversation's last message
+        batch_size: Maximum conversations archived by this call
+
+    Returns:
+        Number of conversations archived
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    result = await session.execute(
+        select(Conversation.id)
+        .where(Conversation.archived_at.is_(None), Conversation.last_message_at < now - timedelta(days=inactive_days))
+        .order_by(Conversation.last_message_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    conversation_ids = list(result.scalars().all())
+    if not conversation_ids:
+        await session.commit()
+        return 0
+
+    await session.execute(
+        insert(MessageArchive).from_select(
+            _MESSAGE_COLUMNS,
+            select(*[Message.__table__.c[name] for name in _MESSAGE_COLUMNS])
+            .where(Message.conversation_id.in_(conversation_ids)),
+        )
+    )
+    await session.execute(delete(Message).where(Message.conversation_id.in_(conversation_ids)))
+    await session.execute(
+        update(Conversation).where(Conversation.id.in_(conversation_ids)).values(archived_at=now)
+    )
+    await session.commit()
+    return len(conversation_ids)
+
+
+async def restore_conversation(session: AsyncSession, conversation_id: UUID) -> None:
+    """Move an archived conversation's messages back to the messages table.
+
+    Runs in the caller's transaction (the chat turn that continues the
+    conversation); does nothing if the conversation is not archived.
+
+    Args:
+        session: Database session
+        conversation_id: UUID of the conversation
+    """
+    result = await session.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id, Conversation.archived_at.is_not(None))
+        .values(archived_at=None)
+    )
+    if result.rowcount != 1:
+        return
+
+    await session.execute(
+        insert(Message).from_select(
+            _MESSAGE_COLUMNS,
+            select(*[MessageArchive.__table__.c[name] for name in _MESSAGE_COLUMNS])
+            .where(MessageArchive.conversation_id == conversation_id),
+        )
+    )
+    await session.execute(delete(MessageArchive).where(MessageArchive.conversation_id == conversation_id))
@@ -0,0 +1,195 @@
+"""Local fast path for chat messages that are plain task commands.
+
+"list my pending tasks" or "complete task <uuid>" need no language model:
+match_intent recognizes a small set of unambiguous phrasings and maps them
+to an MCP tool call, and format_reply turns the tool output into the
+assistant reply. Anything that does not match exactly (extra words, dates,
+priorities, references to earlier messages) goes to the model as before.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+_UUID = r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+_PLEASE = r"(?:please\s+)?"
+_TASKS = r"(?:tasks|todos|to-dos)"
+_STATUS_WORDS = r"pending|open|incomplete|unfinished|completed|done|finished|all"
+
+_LIST_PATTERN = re.compile(
+    rf"^{_PLEASE}(?:show|list|get|display|what are)(?:\s+me)?(?:\s+all)?(?:\s+(?:my|the))?"
+    rf"(?:\s+(?P<status>{_STATUS_WORDS}))?\s+{_TASKS}(?:\s+(?:that are\s+)?(?P<status_after>{_STATUS_WORDS}))?$",
+    re.IGNORECASE,
+)
+_COMPLETE_PATTERN = re.compile(
+    rf"^{_PLEASE}(?:(?:complete|finish)\s+(?:task\s+)?(?P<task_id>{_UUID})"
+    rf"|mark\s+(?:task\s+)?(?P<marked_id>{_UUID})\s+as\s+(?:done|complete|completed|finished))$",
+    re.IGNORECASE,
+)
+_DELETE_PATTERN = re.compile(
+    rf"^{_PLEASE}(?:delete|remove)\s+task\s+(?P<task_id>{_UUID})$",
+    re.IGNORECASE,
+)
+_ADD_PATTERN = re.compile(
+    rf"^{_PLEASE}(?:add|create)\s+(?:a\s+)?(?:new\s+)?task"
+    r"(?:\s*:\s*(?P<title>[^\"'\n]{1,200})|\s+(?:called\s+|named\s+|titled\s+)?[\"'](?P<quoted>[^\"'\n]{1,200})[\"'])$",
+    re.IGNORECASE,
+)
+
+_STATUS_FILTERS = {
+    "pending": "pending",
+    "open": "pending",
+    "incomplete": "pending",
+    "unfinished": "pending",
+    "completed": "completed",
+    "done": "completed",
+    "finished": "completed",
+    "all": "all",
+}
+
+
+class LocalIntent:
+    """A chat message resolved to one MCP tool call."""
+
+    def __init__(self, tool: str, args: Dict[str, Any]):
+        self.tool = tool
+        self.args = args
+
+    def __repr__(self) -> str:
+        return f"LocalIntent({self.tool!r}, {self.args!r})"
+
+
+def match_intent(message: str, user_id: UUID) -> Optional[LocalIntent]:
+    """Resolve a message to a tool call if it is an unambiguous task command.
+
+    Args:
+        message: User message
+        user_id: ID of the user sending it (passed to the tool)
+
+    Returns:
+        The tool call, or None if the model should handle the message
+    """
+    text = " ".join(message.split()).rstrip(".!?")
+    if not text or len(text) > 300:
+        return None
+    user = str(user_id)
+
+    match = _LIST_PATTERN.match(text)
+    if match:
+        status = match.group("status") or match.group("status_after") or "all"
+        return LocalIntent("list_tasks", {"user_id": user, "status": _STATUS_FILTERS[status.lower()]})
+
+    match = _COMPLETE_PATTERN.match(text)
+    if match:
+        task_id = match.group("task_id") or match.group("marked_id")
+        return LocalIntent("complete_task", {"user_id": user, "task_id": task_id.lower()})
+
+    match = _DELETE_PATTERN.match(text)
+    if match:
+        return LocalIntent("delete_task", {"user_id": user, "task_id": match.group("task_id").lower()})
+
+    match = _ADD_PATTERN.match(text)
+    if match:
+        title = (match.group("title") or match.group("quoted")).strip()
+        if title:
+            return LocalIntent("add_task", {"user_id": user, "title": title})
+
+    return None
+
+
+def _format_task_table(table: str, status: str) -> str:
+    """Turn list_tasks' compact table into a readable reply."""
+    label = "" if status == "all" else f"{status} "
+    if table.startswith("No tasks found"):
+        return f"You have no {label}tasks."
+
+    items: List[str] = []
+    has_more = False
+    for line in table.splitlines()[1:]:
+        if line.startswith("next_cursor:"):
+            has_more = True
+            continue
+        fields = line.split("|", 4)
+        if len(fields) != 5:
+            continue
+        task_id, task_status, priority, due, title = fields
+        details = [priority + " priority"]
+        if due != "-":
+            details.append(f"due {due}")
+        if status == "all":
+            details.insert(0, task_status)
+        items.append(f"- {title} ({', '.join(details)}) [id: {task_id}]")
+
+    noun = "task" if len(items) == 1 else "tasks"
+    header = f"Your {len(items)} most recent {label}{noun}:" if has_more else f"You have {len(items)} {label}{noun}:"
+    return "\n".join([header, *items])
+
+
+def format_reply(intent: LocalIntent, tool_result: str) -> str:
+    """Assistant reply for a fast-path tool call.
+
+    Args:
+        intent: Executed tool call
+        tool_result: Text returned by the tool
+
+    Returns:
+        Reply shown to the user (and stored in the conversation history)
+    """
+    if tool_result.startswith("Error"):
+        return tool_result
+    if intent.tool == "list_tasks":
+        return _format_task_table(tool_result, intent.args["status"])
+    if intent.tool == "add_task" and tool_result.startswith("Task created with ID: "):
+        task_id = tool_result[len("Task created with ID: "):]
+        return f"Added task '{intent.args['title']}' [id: {task_id}]."
+    return tool_result
+
+
+class IntentStats:
+    """Fast-path hit rate and the model time it avoided (per process)."""
+
+    def __init__(self):
+        self.turns = 0
+        self.hits = 0
+        self.fast_path_seconds = 0.0
+        self.model_turn_seconds = 0.0
+
+    def record(self, hit: bool, seconds: float) -> None:
+        """Count a turn.
+
+        Args:
+            hit: Whether the fast path answered it
+            seconds: Model + tool time of the turn (tool time for fast-path turns)
+        """
+        self.turns += 1
+        if hit:
+            self.hits += 1
+            self.fast_path_seconds += seconds
+        else:
+            self.model_turn_seconds += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters.
+
+        The saving is estimated as the mean model turn time minus the mean
+        fast-path time, times the number of hits.
+
+        Returns:
+            Dict with turns, hits, hit rate, mean times and estimated saving
+        """
+        misses = self.turns - self.hits
+        mean_fast_ms = self.fast_path_seconds * 1000 / self.hits if self.hits else 0.0
+        mean_model_ms = self.model_turn_seconds * 1000 / misses if misses else 0.0
+        saved_ms = max(0.0, mean_model_ms - mean_fast_ms) * self.hits if misses else 0.0
+        return {
+            "turns": self.turns,
+            "fast_path_hits": self.hits,
+            "hit_rate": round(self.hits / self.turns, 4) if self.turns else 0.0,
+            "mean_fast_path_ms": round(mean_fast_ms, 2),
+            "mean_model_turn_ms": round(mean_model_ms, 2),
+            "estimated_saved_ms": round(saved_ms, 1),
+        }
+
+
+# Global stats instance
+intent_stats = IntentStats()
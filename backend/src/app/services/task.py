@@ -4,11 +4,11 @@ from datetime import datetime, timezone
 from typing import List, Optional
 from uuid import UUID
 
-from sqlalchemy import func
+from sqlalchemy import func, update
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..db.models import Task, TaskPriority, TaskStatus
+from ..db.models import Task, TaskPriority, TaskStatus, User
 
 
 def _build_task_query(
@@ -37,6 +37,22 @@ def _build_task_query(
     return statement
 
 
+async def bump_tasks_version(session: AsyncSession, user_id: UUID) -> None:
+    """Mark a user's task state as changed, in the caller's transaction.
+
+    Cached chat answers (see ResponseCache) are keyed by User.tasks_version,
+    so committing this together with the task write invalidates them in
+    every worker.
+
+    Args:
+        session: Database session holding the task write
+        user_id: UUID of the task owner
+    """
+    await session.execute(
+        update(User).where(User.id == user_id).values(tasks_version=User.tasks_version + 1)
+    )
+
+
 async def create_task(
     session: AsyncSession,
     user_id: UUID,
@@ -74,6 +90,7 @@ async def create_task(
     )
 
     session.add(task)
+    await bump_tasks_version(session, user_id)
     await session.commit()
     await session.refresh(task)
 
@@ -215,6 +232,7 @@ async def update_task(
     task.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
 
     session.add(task)
+    await bump_tasks_version(session, user_id)
     await session.commit()
     await session.refresh(task)
 
@@ -244,6 +262,7 @@ async def delete_task(
         return False
 
     await session.delete(task)
+    await bump_tasks_version(session, user_id)
     await session.commit()
 
     return True
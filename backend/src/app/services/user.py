@@ -9,6 +9,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ..db.models import User
 from ..security import hash_password, verify_password
+from ..user_cache import user_cache
 
 
 async def get_user_by_id(session: AsyncSession, user_id: UUID) -> Optional[User]:
@@ -82,6 +83,7 @@ async def update_user(
     session.add(user)
     await session.commit()
     await session.refresh(user)
+    user_cache.invalidate(user.id)
 
     return user
 
@@ -130,5 +132,6 @@ async def change_password(
     session.add(user)
     await session.commit()
     await session.refresh(user)
+    user_cache.invalidate(user.id)
 
     return True
\ No newline at end of file
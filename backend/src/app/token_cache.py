@@ -0,0 +1,102 @@
+"""Bounded LRU cache of verified JWT claims."""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .config import settings
+
+
+class VerifiedTokenCache:
+    """LRU mapping of verified token digests to their decoded claims.
+
+    The same access token is presented on every request for up to 24 hours,
+    so re-running the HMAC check and JSON parse each time is wasted work.
+
+    - Keys are SHA-256 digests of (algorithm, signing key, token), so rotating
+      JWT_SECRET_KEY or JWT_ALGORITHM makes every existing entry unreachable.
+    - Entries expire at the token's own `exp` claim.
+    - Tokens without `exp` are never cached.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        """Initialize cache.
+
+        Args:
+            max_size: Maximum number of cached tokens (0 disables caching)
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(token: str) -> str:
+        """Digest a token together with the current signing configuration.
+
+        Args:
+            token: Raw JWT string
+
+        Returns:
+            Hex digest used as cache key
+        """
+        material = f"{settings.JWT_ALGORITHM}\0{settings.JWT_SECRET_KEY}\0{token}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached claims, or None if absent or expired.
+
+        Args:
+            key: Cache key from key_for()
+
+        Returns:
+            Claims dictionary or None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Callers may mutate the payload; never hand out the cached dict
+        return dict(claims)
+
+    def put(self, key: str, claims: Dict[str, Any]) -> None:
+        """Cache verified claims until their `exp`.
+
+        Args:
+            key: Cache key from key_for()
+            claims: Decoded, verified token payload
+        """
+        if self.max_size <= 0:
+            return
+
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+
+        self._entries[key] = (float(expires_at), dict(claims))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries and reset statistics."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global cache instance (per worker process)
+verified_token_cache = VerifiedTokenCache(max_size=settings.JWT_CACHE_SIZE)
@@ -0,0 +1,456 @@
+"""Lightweight request tracing with OpenTelemetry-compatible export.
+
+A trace starts when a request enters TracingMiddleware and collects child
+spans for the route handler, SQL statements, LLM calls and MCP tool
+executions. When the root span ends, the whole trace is queued and a
+background thread writes it as one OTLP/JSON line (the format of the
+OpenTelemetry Collector's file exporter and `otlpjsonfile` receiver) to
+stdout or a file, so the event loop never waits on serialization or I/O:
+
+    {"resourceSpans": [{"resource": {...}, "scopeSpans": [{"spans": [...]}]}]}
+
+Spans are only recorded inside a trace, so code that runs outside a
+request (background jobs, migrations) costs one context lookup.
+
+The request id lives here too: it is set for every request, tracing on or
+off, and logging_config adds it to each log line.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, TextIO
+
+from .config import settings
+
+logger = logging.getLogger("app")
+
+# OTLP SpanKind / StatusCode values
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_ERROR = 2
+
+# A request running away (e.g. thousands of queries) must not grow without bound
+MAX_SPANS_PER_TRACE = 1000
+
+# Traces waiting for the writer thread; beyond this (a stalled stream) new ones are dropped
+MAX_QUEUED_TRACES = 10000
+
+# Traces written per flush
+EXPORT_BATCH_SIZE = 256
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    """Request id of the request being handled, if any."""
+    return request_id_var.get()
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class Span:
+    """A timed operation within a trace.
+
+    Use as a context manager to make it the parent of spans started inside
+    the block, or call end() explicitly.
+    """
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        kind: int,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        trace_spans: List["Span"],
+        attributes: Optional[Dict[str, Any]] = None,
+        is_root: bool = False,
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_span_id = parent_span_id
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.status_code = 0
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.is_root = is_root
+        self._trace_spans = trace_spans
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        """Mark the span as failed."""
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"
+
+    def child(self, name: str, kind: int = SPAN_KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None) -> "Span":
+        """Start a child span (not made current)."""
+        return Span(self.tracer, name, kind, self.trace_id, self.span_id, self._trace_spans, attributes)
+
+    def end(self) -> None:
+        """Finish the span; ending the root span exports the trace."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if len(self._trace_spans) < MAX_SPANS_PER_TRACE:
+            self._trace_spans.append(self)
+        if self.is_root:
+            self.tracer.export(self._trace_spans)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.record_exception(exc)
+        _current_span.reset(self._token)
+        self.end()
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class _NoopSpan:
+    """Returned when tracing is off or no trace is active."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter:
+    """Writes finished traces as OTLP/JSON lines to a text stream.
+
+    export() only queues the trace. A daemon thread, started on the first
+    export, serializes queued traces and writes them in batches with one
+    flush per batch. When the queue is full (the stream stalls), new traces
+    are dropped and counted instead of blocking requests.
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        stream: Optional[TextIO] = None,
+        path: Optional[str] = None,
+        max_queued: int = MAX_QUEUED_TRACES,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ):
+        """Initialize exporter.
+
+        Args:
+            service_name: Value of the service.name resource attribute
+            stream: Stream to write to (e.g. sys.stdout)
+            path: File to append to, opened on first write (used if no stream)
+            max_queued: Traces waiting to be written before new ones are dropped
+            batch_size: Most traces written per flush
+        """
+        self.service_name = service_name
+        self.stream = stream
+        self.path = path
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Optional[List[Span]]]" = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.exported = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def _open(self) -> TextIO:
+        if self.stream is None:
+            self.stream = open(self.path, "a", encoding="utf-8")
+        return self.stream
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+                atexit.register(self.shutdown)
+
+    def export(self, spans: List[Span]) -> None:
+        """Queue one trace for writing."""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def _line(self, spans: List[Span]) -> str:
+        return json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "app.tracing"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }],
+        }, separators=(",", ":"))
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                # shutdown(): write what was queued before it, then stop
+                stopping = True
+                batch = batch[:batch.index(None)]
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[List[Span]]) -> None:
+        try:
+            lines = "".join(self._line(spans) + "\n" for spans in batch)
+            stream = self._open()
+            stream.write(lines)
+            stream.flush()
+            self.exported += len(batch)
+            self.batches += 1
+        except Exception as e:
+            # Tracing must never take the worker down
+            self.dropped += len(batch)
+            logger.warning(f"Trace export failed: {e}")
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Write the traces queued so far and stop the writer thread.
+
+        Args:
+            timeout: Longest wait for the queue to drain
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+
+class Tracer:
+    """Creates spans and hands finished traces to the exporter."""
+
+    def __init__(self, enabled: bool, exporter: Optional[SpanExporter] = None):
+        """Initialize tracer.
+
+        Args:
+            enabled: Record spans at all
+            exporter: Destination of finished traces
+        """
+        self.enabled = enabled and exporter is not None
+        self.exporter = exporter
+
+    def start_trace(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_SERVER,
+        trace_id: Optional[str] = None,
+        parent_span_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        """Start the root span of a trace in this process.
+
+        Args:
+            name: Span name
+            kind: OTLP span kind
+            trace_id: Continue an upstream trace (W3C traceparent)
+            parent_span_id: Upstream parent span
+            attributes: Initial attributes
+
+        Returns:
+            Span, or a no-op span when tracing is off
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, kind, trace_id or _new_id(16), parent_span_id, [], attributes, is_root=True)
+
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None):
+        """Start a child of the current span.
+
+        Returns:
+            Span, or a no-op span outside a trace
+        """
+        parent = _current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        return parent.child(name, kind, attributes)
+
+    def export(self, spans: List[Span]) -> None:
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            # Tracing must never fail a request
+            logger.warning(f"Trace export failed: {e}")
+
+    def shutdown(self) -> None:
+        """Write out the queued traces (application shutdown)."""
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+def current_span() -> Optional[Span]:
+    """The innermost active span, if any."""
+    return _current_span.get()
+
+
+def parse_traceparent(header: str) -> Optional[tuple]:
+    """Parse a W3C traceparent header.
+
+    Args:
+        header: e.g. "00-<32 hex trace id>-<16 hex span id>-01"
+
+    Returns:
+        (trace_id, parent_span_id), or None if malformed
+    """
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2]
+
+
+def instrument_engine(engine) -> None:
+    """Record a CLIENT span for every SQL statement run by `engine`.
+
+    Args:
+        engine: AsyncEngine (or sync Engine)
+    """
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        span = tracer.span(
+            statement.split(None, 1)[0].upper() if statement else "SQL",
+            SPAN_KIND_CLIENT,
+            {"db.system": sync_engine.dialect.name, "db.statement": statement[:1000]},
+        )
+        if span is not NOOP_SPAN:
+            context._trace_span = span
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            if cursor is not None and cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set_attribute("db.rowcount", cursor.rowcount)
+            span.end()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        span = getattr(exception_context.execution_context, "_trace_span", None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.end()
+
+
+def instrument_routes(app) -> None:
+    """Wrap each API route in a span named after its path template.
+
+    Also renames the root span to "METHOD /path/{template}" so traces of
+    the same endpoint group together.
+
+    Args:
+        app: FastAPI application (call after all routers are included)
+    """
+    from fastapi.routing import APIRoute
+
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            route.app = _traced_route(route.app, route.path, route.endpoint.__name__)
+
+
+def _traced_route(route_app, path: str, endpoint_name: str):
+    async def traced(scope, receive, send):
+        root = _current_span.get()
+        if root is not None:
+            root.name = f"{scope['method']} {path}"
+            root.set_attribute("http.route", path)
+        with tracer.span(f"handler {endpoint_name}", attributes={"code.function": endpoint_name}):
+            await route_app(scope, receive, send)
+
+    return traced
+
+
+def _build_exporter() -> Optional[SpanExporter]:
+    if settings.TRACING_EXPORTER == "stdout":
+        return SpanExporter(settings.TRACING_SERVICE_NAME, stream=sys.stdout)
+    if settings.TRACING_EXPORTER == "file":
+        return SpanExporter(settings.TRACING_SERVICE_NAME, path=settings.TRACING_FILE_PATH)
+    return None
+
+
+# Global tracer instance
+tracer = Tracer(enabled=settings.TRACING_ENABLED, exporter=_build_exporter())
@@ -0,0 +1,109 @@
+"""Short-lived per-worker cache of public user records."""
+
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from uuid import UUID
+
+from .config import settings
+from .schemas import UserRead
+
+
+class UserCache:
+    """TTL + LRU cache of UserRead objects keyed by user ID.
+
+    Lets session checks such as GET /api/auth/verify answer without a
+    database round trip. Entries are dropped on profile updates in this
+    worker; other workers see changes (including deactivation) within
+    `ttl_seconds`.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 60):
+        """Initialize cache.
+
+        Args:
+            max_size: Maximum number of cached users (0 disables caching)
+            ttl_seconds: Lifetime of an entry
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[UUID, Tuple[float, UserRead]]" = OrderedDict()
+
+    def get(self, user_id: UUID) -> Optional[UserRead]:
+        """Return the cached user, or None if absent or stale.
+
+        Args:
+            user_id: UUID of the user
+
+        Returns:
+            UserRead or None
+        """
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            return None
+
+        self._entries.move_to_end(user_id)
+        return user
+
+    def put(self, user: UserRead) -> None:
+        """Cache an active user.
+
+        Args:
+            user: UserRead to cache
+        """
+        if self.max_size <= 0:
+            return
+
+        self._entries[user.id] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID) -> None:
+        """Drop a user after it changed.
+
+        Args:
+            user_id: UUID of the user
+        """
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+
+# Global cache instance (per worker process)
+user_cache = UserCache(max_size=settings.USER_CACHE_SIZE, ttl_seconds=settings.USER_CACHE_TTL_SECONDS)
+
+
+async def get_active_user(user_id: UUID) -> Optional[UserRead]:
+    """Return an active user from the cache, loading it on a miss.
+
+    A database session is opened only on a cache miss.
+
+    Args:
+        user_id: UUID of the user
+
+    Returns:
+        UserRead, or None if the user does not exist or is inactive
+    """
+    user_read = user_cache.get(user_id)
+    if user_read is not None:
+        return user_read
+
+    from .database import async_session
+    from .db.models import User
+
+    async with async_session() as session:
+        user = await session.get(User, user_id)
+    if not user or not user.is_active:
+        return None
+
+    user_read = UserRead.model_validate(user)
+    user_cache.put(user_read)
+    return user_read
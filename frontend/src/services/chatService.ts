@@ -1,4 +1,4 @@
-import apiClient from '@/utils/api'
+import apiClient, { APIErrorResponse } from '@/utils/api'
 
 export interface ChatRequest {
   conversation_id?: string
@@ -17,10 +17,24 @@ export interface ChatResponse {
   tool_calls: ToolCall[]
 }
 
+// Errors after which the turn may still be running on the server
+const RETRYABLE_ERRORS = ['REQUEST_TIMEOUT', 'NETWORK_ERROR']
+
 const chatService = {
   async sendMessage(userId: string, data: ChatRequest): Promise<ChatResponse> {
-    const response = await apiClient.post<ChatResponse>(`/${userId}/chat`, data)
-    return response.data
+    // Same key on the retry: the backend answers it with the original turn
+    // instead of running the message twice
+    const options = { headers: { 'Idempotency-Key': crypto.randomUUID() } }
+    try {
+      const response = await apiClient.post<ChatResponse>(`/${userId}/chat`, data, options)
+      return response.data
+    } catch (error) {
+      if (!(error instanceof APIErrorResponse) || !RETRYABLE_ERRORS.includes(error.code)) {
+        throw error
+      }
+      const response = await apiClient.post<ChatResponse>(`/${userId}/chat`, data, options)
+      return response.data
+    }
   }
 }
 
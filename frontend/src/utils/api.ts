@@ -23,9 +23,10 @@ class APIClient {
     this.baseURL = baseURL
   }
 
-  private getHeaders(): HeadersInit {
+  private getHeaders(extra?: HeadersInit): HeadersInit {
     return {
       'Content-Type': 'application/json',
+      ...(extra as Record<string, string> | undefined),
     }
   }
 
@@ -61,7 +62,7 @@ class APIClient {
     const url = `${this.baseURL}${endpoint}`
     const fetchOptions: RequestInit = {
       ...options,
-      headers: this.getHeaders(),
+      headers: this.getHeaders(options.headers),
       credentials: 'include', // CRITICAL: Send cookies with every request
       signal: AbortSignal.timeout(30000), // 30 second timeout
     }
@@ -74,7 +75,7 @@ class APIClient {
         try {
           await this.refreshAccessToken()
           // Retry the original request with new token (in cookie)
-          fetchOptions.headers = this.getHeaders()
+          fetchOptions.headers = this.getHeaders(options.headers)
           const retryResponse = await fetch(url, fetchOptions)
 
           if (!retryResponse.ok) {